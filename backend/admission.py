@@ -0,0 +1,204 @@
+import asyncio
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from fastapi.responses import JSONResponse
+
+# ------
+# Admission control for the expensive routes
+# Each limited route prefix gets a fixed number of concurrent requests and a short FIFO queue behind them.
+# A full queue (or a request that waited too long) is answered right away with 503 + Retry-After (and, if
+# ALGORITHM_PER_CLIENT_LIMIT is set, a single client holding too many slots gets 429), so algorithm traffic can
+# never take every threadpool slot and cheap endpoints (login, schedules, group lists) keep their latency during
+# spikes. Admitted requests also get a deadline: computations that support it stop when it runs out and return
+# partial results (marked with the X-Gatherly-Partial response header)
+# ------
+
+# concurrent /algorithm requests per worker (the threadpool has 40 slots, the rest stay free for other routes)
+ALGORITHM_MAX_CONCURRENT = int(os.getenv("ALGORITHM_MAX_CONCURRENT", "8"))
+
+# /algorithm requests that may wait for a slot; further ones are rejected with 503
+ALGORITHM_MAX_QUEUE = int(os.getenv("ALGORITHM_MAX_QUEUE", "32"))
+
+# longest wait for a slot before a queued request is rejected with 503, in seconds
+ALGORITHM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ALGORITHM_QUEUE_TIMEOUT_SECONDS", "5"))
+
+# concurrent /algorithm requests per client address (0 = no per-client limit, the default), further ones get 429
+# the address is the ASGI client address: behind a reverse proxy or load balancer every user shares the proxy's
+# address, so only enable this when the server is run with trusted proxy headers
+# (uvicorn --proxy-headers --forwarded-allow-ips=<proxy ips>) so the client address is the real user's
+ALGORITHM_PER_CLIENT_LIMIT = int(os.getenv("ALGORITHM_PER_CLIENT_LIMIT", "0"))
+
+# time budget of an /algorithm request from arrival (queueing included), in seconds (0 = no deadline)
+ALGORITHM_DEADLINE_SECONDS = float(os.getenv("ALGORITHM_DEADLINE_SECONDS", "10"))
+
+# Retry-After sent with 429/503 rejections, in seconds
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "2"))
+
+# response header set by routes that ran out of time and returned partial results
+PARTIAL_HEADER = "X-Gatherly-Partial"
+
+# monotonic deadline of the request being handled (None outside limited routes)
+_request_deadline: ContextVar = ContextVar("request_deadline", default=None)
+
+
+def request_deadline():
+    """The current request's deadline as a time.time() timestamp (usable in worker processes), or None if it has none."""
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return None
+    return time.time() + (deadline - time.monotonic())
+
+
+class AdmissionRejected(Exception):
+    """Raised by AdmissionLimit.acquire when a request is not admitted."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class AdmissionLimit:
+
+    # ------
+    # Concurrency limit with a bounded FIFO queue for one group of routes
+    # Only used from the event loop, so the counters need no lock
+    # ------
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float,
+                 per_client: int = 0, deadline_seconds: float = 0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.per_client = per_client
+        self.deadline_seconds = deadline_seconds
+        self._in_flight = 0
+        self._waiters = deque()
+        self._by_client = {}
+        self._admitted = 0
+        self._rejected = {"queue_full": 0, "queue_timeout": 0, "per_client": 0}
+        self._partial = 0
+        self._queue_wait_total = 0.0
+
+    async def acquire(self, client: str):
+        """Waits for a slot (FIFO) or raises AdmissionRejected; every successful acquire needs a release(client)."""
+        if self.per_client and self._by_client.get(client, 0) >= self.per_client:
+            self._rejected["per_client"] += 1
+            raise AdmissionRejected(429, "Too many concurrent requests from this client, please retry shortly")
+
+        started = time.monotonic()
+        if self._in_flight < self.max_concurrent and not self._waiters:
+            self._in_flight += 1
+        elif len(self._waiters) >= self.max_queue:
+            self._rejected["queue_full"] += 1
+            raise AdmissionRejected(503, "Server is busy, please retry shortly")
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._rejected["queue_timeout"] += 1
+                raise AdmissionRejected(503, "Server is busy, please retry shortly")
+            except BaseException:
+                # cancelled while waiting (client went away): pass on a slot that was already handed over
+                if waiter.done() and not waiter.cancelled():
+                    self._release_slot()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            # the releasing request handed its slot straight to this one, so _in_flight is unchanged
+
+        self._by_client[client] = self._by_client.get(client, 0) + 1
+        self._admitted += 1
+        self._queue_wait_total += time.monotonic() - started
+
+    def release(self, client: str):
+        count = self._by_client.get(client, 0) - 1
+        if count > 0:
+            self._by_client[client] = count
+        else:
+            self._by_client.pop(client, None)
+        self._release_slot()
+
+    def _release_slot(self):
+        # hand the slot to the oldest waiter that is still waiting, otherwise free it
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "admitted": self._admitted,
+            "rejected": dict(self._rejected),
+            "partial_responses": self._partial,
+            "avg_queue_wait_ms": round(self._queue_wait_total / self._admitted * 1000, 3) if self._admitted else 0.0,
+        }
+
+
+class AdmissionControl:
+
+    # ------
+    # ASGI middleware applying an AdmissionLimit to every HTTP request under its path prefixes
+    # The slot is held until the response has been sent completely (streamed responses included)
+    # ------
+    def __init__(self, app, limits: list = None, retry_after: int = ADMISSION_RETRY_AFTER_SECONDS):
+        self.app = app
+        self.limits = admission_limits if limits is None else limits
+        self.retry_after = retry_after
+
+    def _limit_for(self, path: str):
+        for prefix, limit in self.limits:
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limit = self._limit_for(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.monotonic()
+        client = scope["client"][0] if scope.get("client") else ""
+        try:
+            await limit.acquire(client)
+        except AdmissionRejected as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers={"Retry-After": str(self.retry_after)})
+            await response(scope, receive, send)
+            return
+
+        async def send_and_count_partial(message):
+            if message["type"] == "http.response.start":
+                if any(name.lower() == PARTIAL_HEADER.lower().encode() for name, _value in message.get("headers", [])):
+                    limit._partial += 1
+            await send(message)
+
+        token = _request_deadline.set(arrived + limit.deadline_seconds if limit.deadline_seconds > 0 else None)
+        try:
+            await self.app(scope, receive, send_and_count_partial)
+        finally:
+            _request_deadline.reset(token)
+            limit.release(client)
+
+
+# limits per route prefix, checked in order (WebSockets are not limited here)
+algorithm_limit = AdmissionLimit(
+    "algorithm", ALGORITHM_MAX_CONCURRENT, ALGORITHM_MAX_QUEUE, ALGORITHM_QUEUE_TIMEOUT_SECONDS,
+    per_client=ALGORITHM_PER_CLIENT_LIMIT, deadline_seconds=ALGORITHM_DEADLINE_SECONDS,
+)
+admission_limits = [("/algorithm/", algorithm_limit)]
+
+
+def admission_stats() -> dict:
+    return {limit.name: limit.stats() for _prefix, limit in admission_limits}
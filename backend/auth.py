@@ -1,13 +1,200 @@
-from passlib.context import CryptContext
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Create a password context for hashing and verifying passwords using Argon2
+# Password context for hashing and verifying passwords using Argon2
 # Argon2 is more secure than bcrypt and doesn't have the 72-byte password limit
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# passlib is imported on first use so it doesn't slow down worker startup
+_pwd_context = None
+
+# ------
+# Argon2 cost parameters (unset = passlib defaults: time cost 3, 64 MiB memory, parallelism 4)
+# Pick values for the deployment hardware with `python auth.py --calibrate`
+# Existing hashes made with other parameters are upgraded transparently on the user's next login
+# ------
+ARGON2_TIME_COST = os.getenv("ARGON2_TIME_COST")  # number of passes ("rounds" in passlib)
+ARGON2_MEMORY_COST = os.getenv("ARGON2_MEMORY_COST")  # in KiB
+ARGON2_PARALLELISM = os.getenv("ARGON2_PARALLELISM")
+
+# ------
+# Dedicated executor for password hashing
+# Argon2 is memory-hard and slow on purpose; running it in the shared request threadpool lets a burst of
+# logins starve every other endpoint. Hashing runs on a few dedicated threads instead (argon2-cffi releases
+# the GIL), and at most PASSWORD_HASH_QUEUE requests may wait for them before new ones are rejected
+# ------
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+
+# suggested Retry-After (seconds) when the hasher is saturated
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "2"))
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full; callers should answer 503 with Retry-After."""
+
+
+def get_pwd_context():
+    """Returns the shared CryptContext, creating it on first use."""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        settings = {}
+        if ARGON2_TIME_COST:
+            settings["argon2__rounds"] = int(ARGON2_TIME_COST)
+        if ARGON2_MEMORY_COST:
+            settings["argon2__memory_cost"] = int(ARGON2_MEMORY_COST)
+        if ARGON2_PARALLELISM:
+            settings["argon2__parallelism"] = int(ARGON2_PARALLELISM)
+        _pwd_context = CryptContext(schemes=["argon2"], deprecated="auto", **settings)
+    return _pwd_context
 
 def hash_password(password: str) -> str:
     """Hash a password using Argon2."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str]:
+    """
+    Verify a password and, if it is correct but was hashed with outdated Argon2 parameters
+    (passlib's needs_update), return a new hash to store. Returns (verified, new_hash_or_None).
+    """
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+
+    # ------
+    # Size-limited executor for password hashing with queueing, backpressure and timing stats
+    # ------
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_limit: int = PASSWORD_HASH_QUEUE):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._in_flight = 0  # running + queued
+        self._stats = {"completed": 0, "rejected": 0, "queue_wait_seconds": 0.0, "hash_seconds": 0.0, "max_queue_wait_seconds": 0.0}
+
+    async def run(self, fn, *args):
+        """
+        Runs fn(*args) on the hashing executor and awaits the result without blocking the event loop.
+        Raises PasswordHasherBusy right away if workers + queue are all taken.
+        """
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_limit:
+                self._stats["rejected"] += 1
+                raise PasswordHasherBusy()
+            self._in_flight += 1
+
+        submitted = time.perf_counter()
+
+        def _timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    wait = started - submitted
+                    self._stats["completed"] += 1
+                    self._stats["queue_wait_seconds"] += wait
+                    self._stats["hash_seconds"] += finished - started
+                    self._stats["max_queue_wait_seconds"] = max(self._stats["max_queue_wait_seconds"], wait)
+                    # the slot is freed when the hash is done, not when the caller stops waiting: a cancelled
+                    # request (client gone, deadline) leaves the hash running and it still counts against the bound
+                    self._in_flight -= 1
+
+        def _release_if_cancelled(future):
+            # cancelled while still queued: _timed never runs, so free the slot here
+            if future.cancelled():
+                with self._lock:
+                    self._in_flight -= 1
+
+        try:
+            future = self._executor.submit(_timed)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(_release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str]:
+        return await self.run(verify_and_update_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        """Counters for measuring login throughput and hashing latency."""
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self._in_flight,
+                "completed": completed,
+                "rejected": self._stats["rejected"],
+                "avg_queue_wait_ms": round(1000 * self._stats["queue_wait_seconds"] / completed, 2) if completed else None,
+                "max_queue_wait_ms": round(1000 * self._stats["max_queue_wait_seconds"], 2),
+                "avg_hash_ms": round(1000 * self._stats["hash_seconds"] / completed, 2) if completed else None,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# shared hasher used by the user routes
+password_hasher = PasswordHasher()
+
+
+# ------
+# Calibration: find Argon2 parameters that take about target_ms per hash on this machine
+# Usage: python auth.py --calibrate [--target-ms 250] [--memory-mib 64] [--parallelism 4]
+# ------
+def calibrate_argon2(target_ms: float = 250, memory_mib: int = 64, parallelism: int = 4, max_time_cost: int = 20) -> dict:
+    """
+    Benchmarks Argon2id with the given memory and parallelism and increases the time cost until a
+    hash takes at least target_ms. Returns the chosen parameters and the measured time per hash.
+    """
+    from passlib.hash import argon2
+
+    result = None
+    for time_cost in range(1, max_time_cost + 1):
+        hasher = argon2.using(rounds=time_cost, memory_cost=memory_mib * 1024, parallelism=parallelism)
+        hasher.hash("calibration")  # warm up
+        runs = 3
+        started = time.perf_counter()
+        for _ in range(runs):
+            hasher.hash("calibration")
+        elapsed_ms = 1000 * (time.perf_counter() - started) / runs
+        result = {"time_cost": time_cost, "memory_cost": memory_mib * 1024, "parallelism": parallelism, "ms_per_hash": round(elapsed_ms, 1)}
+        print(f"time_cost={time_cost}: {elapsed_ms:.1f} ms per hash")
+        if elapsed_ms >= target_ms:
+            break
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Argon2 parameter calibration for password hashing")
+    parser.add_argument("--calibrate", action="store_true", help="benchmark Argon2 and print suggested settings")
+    parser.add_argument("--target-ms", type=float, default=250, help="target time per hash in milliseconds")
+    parser.add_argument("--memory-mib", type=int, default=64, help="memory cost in MiB")
+    parser.add_argument("--parallelism", type=int, default=4, help="Argon2 lanes")
+    args = parser.parse_args()
+
+    if not args.calibrate:
+        parser.print_help()
+    else:
+        chosen = calibrate_argon2(args.target_ms, args.memory_mib, args.parallelism)
+        print("\nSuggested environment settings:")
+        print(f"ARGON2_TIME_COST={chosen['time_cost']}")
+        print(f"ARGON2_MEMORY_COST={chosen['memory_cost']}")
+        print(f"ARGON2_PARALLELISM={chosen['parallelism']}")
+        print(f"(about {chosen['ms_per_hash']} ms per hash; with PASSWORD_HASH_WORKERS={PASSWORD_HASH_WORKERS} "
+              f"that is roughly {PASSWORD_HASH_WORKERS * 1000 / max(chosen['ms_per_hash'], 1):.1f} logins per second)")
@@ -0,0 +1,4 @@
+# ------
+# Benchmark and load-testing tools for the backend (not imported by the app)
+# Run from the backend directory, e.g. `python -m bench.run --help`
+# ------
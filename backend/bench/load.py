@@ -0,0 +1,394 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+
+# ------
+# HTTP load generator for the Gatherly API
+# Drives the app with a weighted mix of operations from many concurrent virtual users and reports throughput,
+# p50/p95/p99 latency and error rate per route. Targets:
+#   python -m bench.load                                  # app in this process (httpx ASGI transport) on a local SQLite database
+#   python -m bench.load --serve --server-workers 2       # starts uvicorn on a local SQLite database and drives it over HTTP
+#   python -m bench.load --url http://localhost:8000      # any running server (seeded through its own API)
+# Examples:
+#   python -m bench.load --concurrency 8,16,32,64 --duration 20      # step up the load to find the saturation point
+#   python -m bench.load --mix login=5,list_groups=1 --output login.json
+# Test data (users with schedules, groups) is created through the API before the run, so the numbers include
+# the real routes, the real campus graph and a seeded database
+# ------
+
+# operation -> relative weight
+DEFAULT_MIX = "login=1,signup=0.2,schedule_read=3,schedule_edit=1,list_groups=4,group_info=1,meeting=2"
+
+# password of every seeded user
+SEED_PASSWORD = "loadtest-password"
+
+# latency histogram bucket upper bounds in milliseconds
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+
+# status codes that mean "overloaded, try later" rather than a failure of the request itself
+REJECTED_STATUSES = (429, 503)
+
+# every virtual user comes from the same address, so the app's per-client algorithm limit is off for
+# in-process and --serve runs unless ALGORITHM_PER_CLIENT_LIMIT is set explicitly
+PER_CLIENT_LIMIT_DEFAULT = "0"
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+class LatencyRecorder:
+
+    # ------
+    # Latency samples and status codes per route label (e.g. "GET /users/{id}/list-groups")
+    # ------
+    def __init__(self):
+        self.latencies_ms = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, route: str, seconds: float, status):
+        """status is the HTTP status code, or the exception class name if the request failed without one."""
+        self.latencies_ms[route].append(seconds * 1000)
+        self.statuses[route][status] += 1
+
+    def summary(self, elapsed_seconds: float) -> dict:
+        routes = {}
+        for route in sorted(self.latencies_ms):
+            latencies = sorted(self.latencies_ms[route])
+            statuses = self.statuses[route]
+            count = len(latencies)
+            rejected = sum(n for status, n in statuses.items() if status in REJECTED_STATUSES)
+            errors = sum(n for status, n in statuses.items() if not isinstance(status, int) or status >= 400) - rejected
+            histogram, lower = {}, 0
+            for bucket in HISTOGRAM_BUCKETS_MS:
+                label = f"<={bucket:g}ms" if bucket != float("inf") else f">{lower:g}ms"
+                histogram[label] = sum(1 for value in latencies if lower < value <= bucket or (lower == 0 and value == 0))
+                lower = bucket
+            routes[route] = {
+                "count": count,
+                "throughput_rps": round(count / elapsed_seconds, 2),
+                "errors": errors,
+                "rejected": rejected,
+                "error_rate": round(errors / count, 4) if count else 0.0,
+                "p50_ms": round(percentile(latencies, 0.50), 2),
+                "p95_ms": round(percentile(latencies, 0.95), 2),
+                "p99_ms": round(percentile(latencies, 0.99), 2),
+                "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+                "mean_ms": round(sum(latencies) / count, 2) if count else 0.0,
+                "status_counts": {str(status): n for status, n in sorted(statuses.items(), key=lambda item: str(item[0]))},
+                "histogram": histogram,
+            }
+        total = sum(route["count"] for route in routes.values())
+        all_latencies = sorted(value for values in self.latencies_ms.values() for value in values)
+        return {
+            "duration_seconds": round(elapsed_seconds, 2),
+            "requests": total,
+            "throughput_rps": round(total / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+            "error_rate": round(sum(route["errors"] for route in routes.values()) / total, 4) if total else 0.0,
+            "p50_ms": round(percentile(all_latencies, 0.50), 2),
+            "p95_ms": round(percentile(all_latencies, 0.95), 2),
+            "p99_ms": round(percentile(all_latencies, 0.99), 2),
+            "routes": routes,
+        }
+
+
+async def timed_request(client, recorder: LatencyRecorder, route: str, method: str, url: str, **kwargs):
+    """Sends one request and records its latency under route. Returns the response, or None if it failed."""
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except Exception as e:
+        recorder.record(route, time.perf_counter() - started, type(e).__name__)
+        return None
+    recorder.record(route, time.perf_counter() - started, response.status_code)
+    return response
+
+
+def auth_headers(user: dict) -> dict:
+    return {"Authorization": f"Bearer {user['token']}"} if user.get("token") else {}
+
+
+# --------
+# Seeding: users with weekly schedules and groups, created through the API
+# --------
+async def seed(client, group_count: int, group_size: int, seed_value: int, run_id: str) -> dict:
+    from bench.synthetic import generate_group
+
+    response = await client.get("/graph/all_locations")
+    response.raise_for_status()
+    locations = response.json()["locations"]
+
+    limit = asyncio.Semaphore(16)
+    users, groups = [], []
+
+    async def create_member(member: dict) -> dict:
+        async with limit:
+            response = await client.post("/users/signup", json={
+                "name": member["name"], "email": member["email"], "password": SEED_PASSWORD, "home_location": member["home_location"],
+            })
+            response.raise_for_status()
+            body = response.json()
+            user = {"user_id": int(body["user_id"]), "email": member["email"], "token": body.get("token")}
+            for day, start, end, location in member["slots"]:
+                response = await client.post(f"/schedule/{user['user_id']}/addTimeSlot", json={
+                    "day_of_week": day, "start_seconds": start, "end_seconds": end, "location": location, "purpose": "class",
+                })
+                response.raise_for_status()
+            return user
+
+    for group_index in range(group_count):
+        members = generate_group(locations, group_size, seed=seed_value + group_index, label=f"{run_id}-{group_index}")
+        group_users = await asyncio.gather(*(create_member(member) for member in members))
+        creator = group_users[0]
+        response = await client.post("/groups/create", params={"group_name": f"Load test {group_index}", "creator_user_id": creator["user_id"]}, headers=auth_headers(creator))
+        response.raise_for_status()
+        group = response.json()
+        for user in group_users[1:]:
+            response = await client.post(f"/groups/{group['group_id']}/join", params={"group_code": group["code"], "user_id": user["user_id"]}, headers=auth_headers(user))
+            response.raise_for_status()
+        users.extend(group_users)
+        groups.append({"group_id": int(group["group_id"]), "user_ids": [user["user_id"] for user in group_users]})
+        print(f"[INFO] Seeded group {group_index + 1}/{group_count} ({len(group_users)} members)")
+
+    return {"users": users, "groups": groups, "locations": locations, "run_id": run_id}
+
+
+# --------
+# Operations a virtual user can perform; each records one or more requests
+# --------
+async def op_signup(client, state, rng, recorder, vu_index):
+    email = f"signup-{state['run_id']}-{uuid.uuid4().hex[:12]}@example.edu"
+    await timed_request(client, recorder, "POST /users/signup", "POST", "/users/signup", json={
+        "name": "Load Test", "email": email, "password": SEED_PASSWORD, "home_location": rng.choice(state["locations"]),
+    })
+
+async def op_login(client, state, rng, recorder, vu_index):
+    user = rng.choice(state["users"])
+    await timed_request(client, recorder, "POST /users/login", "POST", "/users/login", json={"email": user["email"], "password": SEED_PASSWORD})
+
+async def op_schedule_read(client, state, rng, recorder, vu_index):
+    user = rng.choice(state["users"])
+    await timed_request(client, recorder, "GET /schedule/{id}", "GET", f"/schedule/{user['user_id']}")
+
+async def op_schedule_edit(client, state, rng, recorder, vu_index):
+    # seeded schedules keep 7-8 AM free; each virtual user edits its own 5 minute window in it
+    user = rng.choice(state["users"])
+    start = (vu_index % 12) * 300
+    response = await timed_request(client, recorder, "POST /schedule/{id}/addTimeSlot", "POST", f"/schedule/{user['user_id']}/addTimeSlot", json={
+        "day_of_week": rng.randint(1, 5), "start_seconds": start, "end_seconds": start + 300,
+        "location": rng.choice(state["locations"]), "purpose": "load test",
+    })
+    if response is not None and response.status_code == 200:
+        availability_id = response.json()["availability_id"]
+        await timed_request(client, recorder, "DELETE /schedule/{id}", "DELETE", f"/schedule/{availability_id}")
+
+async def op_list_groups(client, state, rng, recorder, vu_index):
+    user = rng.choice(state["users"])
+    await timed_request(client, recorder, "GET /users/{id}/list-groups", "GET", f"/users/{user['user_id']}/list-groups")
+
+async def op_group_info(client, state, rng, recorder, vu_index):
+    group = rng.choice(state["groups"])
+    user = next(u for u in state["users"] if u["user_id"] == group["user_ids"][0])
+    await timed_request(client, recorder, "GET /groups/{id}/displayInfo", "GET", f"/groups/{group['group_id']}/displayInfo", headers=auth_headers(user))
+
+async def op_meeting(client, state, rng, recorder, vu_index):
+    group = rng.choice(state["groups"])
+    await timed_request(client, recorder, "GET /algorithm/group/{id}/best_meeting_times", "GET",
+                        f"/algorithm/group/{group['group_id']}/best_meeting_times",
+                        params={"day_of_week": rng.randint(1, 5), "meeting_duration": rng.choice((30, 60))})
+
+OPERATIONS = {
+    "signup": op_signup,
+    "login": op_login,
+    "schedule_read": op_schedule_read,
+    "schedule_edit": op_schedule_edit,
+    "list_groups": op_list_groups,
+    "group_info": op_group_info,
+    "meeting": op_meeting,
+}
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r} (known: {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("the request mix needs at least one operation with a positive weight")
+    return mix
+
+
+async def run_step(client, state: dict, mix: dict, concurrency: int, duration: float, seed_value: int) -> dict:
+    """Runs concurrency virtual users for duration seconds and returns the latency summary."""
+    recorder = LatencyRecorder()
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    async def virtual_user(index: int):
+        rng = random.Random(seed_value * 1000 + index)
+        while time.perf_counter() < deadline:
+            operation = rng.choices(names, weights)[0]
+            await OPERATIONS[operation](client, state, rng, recorder, index)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i) for i in range(concurrency)))
+    return {"concurrency": concurrency, **recorder.summary(time.perf_counter() - started)}
+
+
+def print_step(step: dict):
+    print(f"\n=== concurrency {step['concurrency']}: {step['requests']} requests in {step['duration_seconds']}s, "
+          f"{step['throughput_rps']} req/s, p95 {step['p95_ms']} ms, error rate {step['error_rate']:.2%}")
+    print(f"{'route':<48} {'count':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'rejected':>9}")
+    for route, stats in step["routes"].items():
+        print(f"{route:<48} {stats['count']:>7} {stats['throughput_rps']:>8} {stats['p50_ms']:>9} {stats['p95_ms']:>9} "
+              f"{stats['p99_ms']:>9} {stats['errors']:>7} {stats['rejected']:>9}")
+
+
+async def wait_until_ready(client, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = await client.get("/readyz")
+            if response.status_code == 200:
+                return
+        except Exception:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("server did not become ready in time")
+        await asyncio.sleep(0.5)
+
+
+async def run_load(args, client) -> dict:
+    await wait_until_ready(client)
+    run_id = uuid.uuid4().hex[:8]
+    print(f"[INFO] Seeding {args.groups} groups of {args.group_size} users (run {run_id})")
+    state = await seed(client, args.groups, args.group_size, args.seed, run_id)
+
+    mix = parse_mix(args.mix)
+    steps = []
+    for concurrency in [int(c) for c in str(args.concurrency).split(",") if c.strip()]:
+        step = await run_step(client, state, mix, concurrency, args.duration, args.seed)
+        print_step(step)
+        steps.append(step)
+
+    best = max(steps, key=lambda step: step["throughput_rps"])
+    print(f"\n[INFO] Highest throughput {best['throughput_rps']} req/s at concurrency {best['concurrency']} (p95 {best['p95_ms']} ms)")
+    return {"mix": mix, "steps": steps}
+
+
+async def run_in_process(args) -> dict:
+    import httpx
+    os.environ.setdefault("ALGORITHM_PER_CLIENT_LIMIT", PER_CLIENT_LIMIT_DEFAULT)
+    import main as app_main
+    from bench.localdb import LocalDatabase
+
+    db = LocalDatabase()
+    db.install()
+    try:
+        # ASGITransport doesn't run the lifespan, so start it here (graph warm-up, watcher, meeting pool)
+        async with app_main.lifespan(app_main.app):
+            transport = httpx.ASGITransport(app=app_main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://gatherly.local", timeout=args.timeout) as client:
+                return await run_load(args, client)
+    finally:
+        db.uninstall()
+
+
+async def run_over_http(args, base_url: str) -> dict:
+    import httpx
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        return await run_load(args, client)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Gatherly API load test")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running server (default: drive the app in this process)")
+    target.add_argument("--serve", action="store_true", help="start uvicorn on a local SQLite database and drive it over HTTP")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn worker processes with --serve")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations, default {DEFAULT_MIX}")
+    parser.add_argument("--concurrency", default="16", help="virtual users, or a comma-separated list to step through")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per concurrency step")
+    parser.add_argument("--groups", type=int, default=10, help="groups to seed")
+    parser.add_argument("--group-size", type=int, default=6, help="members per seeded group")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated schedules and request choices")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument("--output", help="write the full report (including histograms) to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = None
+    try:
+        if args.url:
+            target_name = args.url
+            report = asyncio.run(run_over_http(args, args.url.rstrip("/")))
+        elif args.serve:
+            port = free_port()
+            db_path = os.path.join(tempfile.mkdtemp(prefix="gatherly-load-"), "gatherly.db")
+            log_path = os.path.join(os.path.dirname(db_path), "server.log")
+            target_name = f"uvicorn bench.localapp:app --workers {args.server_workers} (log: {log_path})"
+            print(f"[INFO] Starting {target_name} on port {port}")
+            with open(log_path, "w") as log:
+                server = subprocess.Popen(
+                    [sys.executable, "-m", "uvicorn", "bench.localapp:app", "--port", str(port), "--workers", str(args.server_workers), "--log-level", "warning"],
+                    env={"ALGORITHM_PER_CLIENT_LIMIT": PER_CLIENT_LIMIT_DEFAULT, **os.environ, "GATHERLY_BENCH_DB": db_path, "WEB_CONCURRENCY": str(args.server_workers)},
+                    stdout=log, stderr=subprocess.STDOUT,
+                )
+            report = asyncio.run(run_over_http(args, f"http://127.0.0.1:{port}"))
+        else:
+            target_name = "in-process (ASGI transport)"
+            report = asyncio.run(run_in_process(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "target": target_name,
+            "duration_per_step": args.duration,
+            "groups": args.groups,
+            "group_size": args.group_size,
+            "seed": args.seed,
+        },
+        **report,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Wrote report to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
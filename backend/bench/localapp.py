@@ -0,0 +1,13 @@
+import os
+from bench.localdb import LocalDatabase
+import main
+
+# ------
+# The Gatherly app on a local SQLite database instead of Azure SQL, for load tests against a real server:
+#   GATHERLY_BENCH_DB=/tmp/gatherly.db uvicorn bench.localapp:app --port 8765 --workers 2
+# (started automatically by `python -m bench.load --serve`)
+# ------
+local_db = LocalDatabase(os.getenv("GATHERLY_BENCH_DB"))
+local_db.install()
+
+app = main.app
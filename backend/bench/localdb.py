@@ -0,0 +1,182 @@
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+
+# ------
+# Local SQLite stand-in for the Azure SQL database, for benchmarks and load tests
+# Connections behave like the pyodbc ones the routes use (positional "?" parameters passed as a tuple or
+# as separate arguments, fetchone/fetchall/rowcount, commit/close), and the T-SQL "OUTPUT INSERTED.col" /
+# "OUTPUT DELETED.col" clauses are rewritten to SQLite's RETURNING. Every get_db_connection() call opens
+# its own connection to a file database, so concurrent requests behave like separate pyodbc connections
+# ------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS Users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    home_location TEXT
+);
+CREATE TABLE IF NOT EXISTS Groups (
+    group_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    group_name TEXT NOT NULL,
+    creator_user_id INTEGER NOT NULL REFERENCES Users(user_id),
+    group_code TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS GroupMemberships (
+    membership_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    group_id INTEGER NOT NULL REFERENCES Groups(group_id),
+    user_id INTEGER NOT NULL REFERENCES Users(user_id)
+);
+CREATE TABLE IF NOT EXISTS Availability (
+    availability_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(user_id),
+    day_of_week INTEGER NOT NULL,
+    start_seconds INTEGER NOT NULL,
+    end_seconds INTEGER NOT NULL,
+    location TEXT,
+    purpose TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_memberships_group ON GroupMemberships(group_id);
+CREATE INDEX IF NOT EXISTS ix_memberships_user ON GroupMemberships(user_id);
+CREATE INDEX IF NOT EXISTS ix_availability_user_day ON Availability(user_id, day_of_week);
+"""
+
+# "OUTPUT INSERTED.user_id" / "OUTPUT DELETED.user_id, DELETED.day_of_week"
+OUTPUT_CLAUSE_PATTERN = re.compile(r'\bOUTPUT\s+((?:INSERTED|DELETED)\.\w+(?:\s*,\s*(?:INSERTED|DELETED)\.\w+)*)\s*', re.IGNORECASE)
+OUTPUT_PREFIX_PATTERN = re.compile(r'\b(?:INSERTED|DELETED)\.', re.IGNORECASE)
+
+
+def translate_sql(sql: str) -> str:
+    """Rewrites the T-SQL used by the routes to SQLite (only OUTPUT clauses need it)."""
+    match = OUTPUT_CLAUSE_PATTERN.search(sql)
+    if not match:
+        return sql
+    columns = OUTPUT_PREFIX_PATTERN.sub("", match.group(1))
+    return OUTPUT_CLAUSE_PATTERN.sub("", sql).rstrip().rstrip(";") + f" RETURNING {columns}"
+
+
+class LocalCursor:
+
+    # ------
+    # pyodbc-style cursor over a sqlite3 cursor
+    # ------
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    def execute(self, sql: str, *params):
+        if len(params) == 1 and isinstance(params[0], (tuple, list)):
+            params = tuple(params[0])
+        self._cursor.execute(translate_sql(sql), params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+
+class LocalConnection:
+
+    # ------
+    # pyodbc-style connection (autocommit off, like pyodbc's default)
+    # ------
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+
+    def cursor(self) -> LocalCursor:
+        return LocalCursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+class LocalDatabase:
+
+    # ------
+    # File-backed SQLite database with the app's schema and helpers to seed it
+    # ------
+    def __init__(self, path: str = None):
+        if path is None:
+            path = os.path.join(tempfile.mkdtemp(prefix="gatherly-bench-"), "gatherly.db")
+        self.path = path
+        self._lock = threading.Lock()
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer during load tests
+        conn.executescript(SCHEMA)
+        conn.commit()
+        conn.close()
+        self._patched = []
+
+    def connect(self) -> LocalConnection:
+        return LocalConnection(self.path)
+
+    def add_user(self, cursor, name: str, email: str, password_hash: str, home_location: str) -> int:
+        cursor.execute(
+            "INSERT INTO Users (name, email, password_hash, home_location) OUTPUT INSERTED.user_id VALUES (?, ?, ?, ?)",
+            name, email, password_hash, home_location,
+        )
+        return cursor.fetchone()[0]
+
+    def seed_group(self, members: list[dict], group_name: str = "Benchmark group", password_hash: str = "x") -> tuple[int, list[int]]:
+        """
+        Inserts generated members (see synthetic.generate_group) with their schedules and a group containing
+        all of them (the first member is the creator). Returns (group_id, user_ids).
+        """
+        with self._lock:
+            conn = self.connect()
+            cursor = conn.cursor()
+            try:
+                user_ids = []
+                for member in members:
+                    user_id = self.add_user(cursor, member["name"], member["email"], member.get("password_hash", password_hash), member["home_location"])
+                    user_ids.append(user_id)
+                    for day, start, end, location in member["slots"]:
+                        cursor.execute(
+                            "INSERT INTO Availability (user_id, day_of_week, start_seconds, end_seconds, location, purpose) VALUES (?, ?, ?, ?, ?, ?)",
+                            user_id, day, start, end, location, "class",
+                        )
+                cursor.execute(
+                    "INSERT INTO Groups (group_name, creator_user_id, group_code) OUTPUT INSERTED.group_id VALUES (?, ?, ?)",
+                    group_name, user_ids[0], "BENCH1",
+                )
+                group_id = cursor.fetchone()[0]
+                for user_id in user_ids:
+                    cursor.execute("INSERT INTO GroupMemberships (group_id, user_id) VALUES (?, ?)", group_id, user_id)
+                conn.commit()
+            finally:
+                conn.close()
+        return group_id, user_ids
+
+    def install(self):
+        """
+        Points the app at this database: replaces get_db_connection in the database module and in every
+        already imported module that did `from database import get_db_connection` (the route modules).
+        Import the app before calling this. Undo with uninstall().
+        """
+        import database
+        original = database.get_db_connection
+        for module in list(sys.modules.values()):
+            if getattr(module, "get_db_connection", None) is original:
+                self._patched.append((module, original))
+                module.get_db_connection = self.connect
+
+    def uninstall(self):
+        for module, original in self._patched:
+            module.get_db_connection = original
+        self._patched = []
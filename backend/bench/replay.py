@@ -0,0 +1,231 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+# ------
+# Replays captured production requests (see capture.py) against the local build
+# Usage (from the backend directory):
+#   python -m bench.replay captures/                          # every .jsonl file in the directory
+#   python -m bench.replay capture.jsonl --repeat 5 --output replay.json
+#   python -m bench.replay capture.jsonl --baseline replay-before.json   # compare with an earlier replay
+# Each record's anonymized data (group members with their slots and start locations, or a user's schedule) is
+# seeded into a local SQLite database, then the request runs through the app in this process. The report
+# compares latency per route (captured vs replayed, and against --baseline) and checks that the computed
+# meeting slots still match the captured results. Exit code 1 on result mismatches or latency regressions
+# ------
+
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.2
+
+
+def fill_route(route: str, **ids) -> str:
+    for name, value in ids.items():
+        route = route.replace("{" + name + "}", str(value))
+    return route
+
+
+class Replayer:
+
+    # ------
+    # Seeds the data of one captured record and runs its request
+    # ------
+    def __init__(self, client, db):
+        self.client = client
+        self.db = db
+        self._user_counter = 0
+
+    def _new_user(self, cursor, home_location: str) -> int:
+        self._user_counter += 1
+        return self.db.add_user(cursor, f"Replay {self._user_counter}", f"replay-{self._user_counter}@example.edu", "x", home_location)
+
+    def _add_slot(self, cursor, user_id: int, day: int, start: int, end: int, location: str) -> int:
+        cursor.execute(
+            "INSERT INTO Availability (user_id, day_of_week, start_seconds, end_seconds, location, purpose) OUTPUT INSERTED.availability_id VALUES (?, ?, ?, ?, ?, ?)",
+            user_id, day, start, end, location, None,
+        )
+        return cursor.fetchone()[0]
+
+    def _seeded(self, seed_fn):
+        conn = self.db.connect()
+        try:
+            result = seed_fn(conn.cursor())
+            conn.commit()
+            return result
+        finally:
+            conn.close()
+
+    def _timed(self, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = self.client.request(method, url, **kwargs)
+        return response, (time.perf_counter() - started) * 1000
+
+    def replay(self, record: dict, repeat: int):
+        """Returns (timings_ms, last_response), or None if the record can't be replayed (no captured data)."""
+        route, method, query = record.get("route") or "", record["method"], record.get("query", {})
+
+        if route.startswith("/algorithm/group/") and "group" in record:
+            day = int(query.get("day_of_week", 0))
+            def seed_group(cursor):
+                user_ids = []
+                for member in record["group"]:
+                    user_id = self._new_user(cursor, member["home_location"])
+                    for start, end, location in member["slots"]:
+                        self._add_slot(cursor, user_id, day, start, end, location)
+                    user_ids.append(user_id)
+                cursor.execute("INSERT INTO Groups (group_name, creator_user_id, group_code) OUTPUT INSERTED.group_id VALUES (?, ?, ?)", "Replay", user_ids[0], "REPLAY")
+                group_id = cursor.fetchone()[0]
+                for user_id in user_ids:
+                    cursor.execute("INSERT INTO GroupMemberships (group_id, user_id) VALUES (?, ?)", group_id, user_id)
+                return group_id
+            url = fill_route(route, group_id=self._seeded(seed_group))
+            self._timed(method, url, params=query)  # warm-up (graph path caches)
+            runs = [self._timed(method, url, params=query) for _ in range(repeat)]
+            return [ms for _response, ms in runs], runs[-1][0]
+
+        if route == "/schedule/{user_id}" and method == "GET" and "schedule" in record:
+            def seed_schedule(cursor):
+                user_id = self._new_user(cursor, None)
+                for day, start, end, location in record["schedule"]:
+                    self._add_slot(cursor, user_id, day, start, end, location)
+                return user_id
+            url = fill_route(route, user_id=self._seeded(seed_schedule))
+            runs = [self._timed(method, url, params=query) for _ in range(repeat)]
+            return [ms for _response, ms in runs], runs[-1][0]
+
+        if route == "/schedule/{user_id}/addTimeSlot" and "request" in record:
+            body = {**record["request"], "purpose": None}
+            def seed_existing(cursor):
+                user_id = self._new_user(cursor, None)
+                for start, end in record.get("existing_slots", []):
+                    self._add_slot(cursor, user_id, body["day_of_week"], start, end, body["location"])
+                return user_id
+            url = fill_route(route, user_id=self._seeded(seed_existing))
+            timings, response = [], None
+            for _ in range(repeat):
+                response, ms = self._timed(method, url, json=body)
+                timings.append(ms)
+                if response.status_code == 200:  # remove it again so the next run doesn't overlap
+                    self.client.delete(f"/schedule/{response.json()['availability_id']}")
+            return timings, response
+
+        if route == "/schedule/{availability_id}" and method == "DELETE":
+            user_id = self._seeded(lambda cursor: self._new_user(cursor, None))
+            timings, response = [], None
+            for _ in range(repeat):
+                availability_id = self._seeded(lambda cursor: self._add_slot(cursor, user_id, 1, 0, 300, "Memorial Union"))
+                response, ms = self._timed(method, fill_route(route, availability_id=availability_id))
+                timings.append(ms)
+            return timings, response
+
+        return None
+
+
+def result_summary(response):
+    """Meeting-slot summary of a replayed algorithm response, in the captured format."""
+    from capture import summarize_meeting_slots
+    return json.loads(json.dumps(summarize_meeting_slots(response.json()["slots"])))
+
+
+def summarize_routes(rows: list[dict]) -> dict:
+    by_route = defaultdict(list)
+    for row in rows:
+        by_route[row["route"]].append(row)
+    summary = {}
+    for route, route_rows in sorted(by_route.items()):
+        replay_ms = sorted(ms for row in route_rows for ms in row["replay_ms"])
+        captured_ms = sorted(row["captured_ms"] for row in route_rows if row["captured_ms"] is not None)
+        summary[route] = {
+            "records": len(route_rows),
+            "captured_p50_ms": round(statistics.median(captured_ms), 3) if captured_ms else None,
+            "replay_p50_ms": round(statistics.median(replay_ms), 3),
+            "replay_p95_ms": round(replay_ms[min(len(replay_ms) - 1, int(0.95 * len(replay_ms)))], 3),
+            "status_mismatches": sum(1 for row in route_rows if not row["status_match"]),
+            "result_mismatches": sum(1 for row in route_rows if row["result_match"] is False),
+        }
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay captured Gatherly requests against the local build")
+    parser.add_argument("capture", help="capture .jsonl file or a directory of them")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="measured runs per record")
+    parser.add_argument("--limit", type=int, help="only replay the first N records")
+    parser.add_argument("--output", help="write the replay report to this JSON file")
+    parser.add_argument("--baseline", help="replay report of an earlier build to compare latency with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed median slowdown per route against --baseline")
+    args = parser.parse_args(argv)
+
+    from fastapi.testclient import TestClient
+    import main as app_main
+    from capture import load_capture
+    from bench.localdb import LocalDatabase
+
+    records = load_capture(args.capture)[: args.limit]
+    print(f"[INFO] Replaying {len(records)} captured requests")
+
+    db = LocalDatabase()
+    db.install()
+    rows, skipped = [], 0
+    try:
+        with TestClient(app_main.app) as client:
+            replayer = Replayer(client, db)
+            for record in records:
+                replayed = replayer.replay(record, args.repeat)
+                if replayed is None:
+                    skipped += 1
+                    continue
+                timings, response = replayed
+                result_match = None
+                if "result" in record and response.status_code == 200 and "stream" not in record["route"]:
+                    result_match = result_summary(response) == record["result"]
+                rows.append({
+                    "route": f"{record['method']} {record['route']}",
+                    "query": record.get("query", {}),
+                    "captured_ms": record.get("duration_ms"),
+                    "replay_ms": [round(ms, 3) for ms in timings],
+                    "captured_status": record.get("status"),
+                    "replay_status": response.status_code,
+                    "status_match": response.status_code == record.get("status"),
+                    "result_match": result_match,
+                })
+    finally:
+        db.uninstall()
+
+    routes = summarize_routes(rows) if rows else {}
+    print(f"\n{'route':<58} {'records':>8} {'captured p50':>13} {'replay p50':>11} {'replay p95':>11} {'status':>7} {'result':>7}")
+    for route, stats in routes.items():
+        print(f"{route:<58} {stats['records']:>8} {str(stats['captured_p50_ms']):>13} {stats['replay_p50_ms']:>11} "
+              f"{stats['replay_p95_ms']:>11} {stats['status_mismatches']:>7} {stats['result_mismatches']:>7}")
+    print(f"[INFO] {len(rows)} records replayed, {skipped} skipped (no captured data, e.g. 304s or coalesced requests)")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline_routes = json.load(f).get("routes", {})
+        for route, stats in routes.items():
+            previous = baseline_routes.get(route)
+            if previous and previous["replay_p50_ms"]:
+                ratio = stats["replay_p50_ms"] / previous["replay_p50_ms"]
+                stats["baseline_ratio"] = round(ratio, 3)
+                print(f"{route:<58} {ratio:.2f}x vs baseline")
+                if ratio > 1 + args.tolerance:
+                    regressions.append(route)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"capture": args.capture, "repeat": args.repeat, "skipped": skipped, "routes": routes, "records": rows}, f, indent=2)
+        print(f"[INFO] Wrote replay report to {args.output}")
+
+    mismatches = sum(stats["result_mismatches"] for stats in routes.values())
+    if mismatches:
+        print(f"[WARNING] {mismatches} replayed meeting results differ from the captured ones")
+    if regressions:
+        print(f"[WARNING] slower than the baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+    return 1 if mismatches or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
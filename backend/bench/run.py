@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ------
+# Benchmark suite for the graph and meeting-algorithm hot paths
+# Usage (from the backend directory):
+#   python -m bench.run                                   # small + medium graphs, results to bench_results.json
+#   python -m bench.run --sizes small,medium,large --output new.json --baseline baseline.json
+#   python -m bench.run --save-baseline baseline.json     # store this run as the reference
+# Every benchmark runs on synthetic data generated from --seed, so runs on the same machine are comparable.
+# With --baseline the median of every benchmark is compared to the stored one and the exit code is 1 if
+# any of them got slower by more than --tolerance (e.g. 0.2 = 20%)
+# ------
+
+DEFAULT_SIZES = "small,medium"
+DEFAULT_GROUP_SIZE = 8
+DEFAULT_REPEAT = 7
+DEFAULT_TOLERANCE = 0.2
+BENCH_DAY = 2  # Tuesday, a full weekday schedule
+
+
+def measure(fn, repeat: int, warmup: int = 1, ops: int = 1) -> dict:
+    """Runs fn warmup + repeat times and summarizes the timings of the measured runs (in milliseconds)."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    median = statistics.median(timings)
+    return {
+        "median_ms": round(median, 4),
+        "min_ms": round(min(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "stdev_ms": round(statistics.stdev(timings), 4) if len(timings) > 1 else 0.0,
+        "repeat": repeat,
+        "ops": ops,
+        "per_op_us": round(median * 1000 / ops, 3),
+    }
+
+
+def selected(args, name: str) -> bool:
+    """True if the benchmark called name should run (--only filter)."""
+    return not args.only or args.only in name
+
+
+def run_meta(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    try:
+        import orjson  # noqa: F401
+        has_orjson = True
+    except ImportError:
+        has_orjson = False
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "group_size": args.group_size,
+        "meeting_pool_workers": os.getenv("MEETING_POOL_WORKERS"),
+        "orjson": has_orjson,
+    }
+
+
+# --------
+# Graph-level benchmarks (CampusGraph directly, no HTTP or database)
+# --------
+def bench_graph(size_name: str, data_dir: str, names: list[str], members: list[dict], args) -> dict:
+    from graph.graph_utils import CampusGraph
+    from meeting import user_start_locations
+    from bench.synthetic import busy_slots_for_day
+
+    results = {}
+    rng = random.Random(args.seed)
+
+    if selected(args, f"graph_load[{size_name}]"):
+        results[f"graph_load[{size_name}]"] = measure(lambda: CampusGraph(data_dir), repeat=max(3, args.repeat // 2), warmup=0)
+    campus_graph = CampusGraph(data_dir)
+
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(10000)]
+    def shortest_times():
+        for start, end in pairs:
+            campus_graph.get_shortest_time(start, end)
+    if selected(args, f"get_shortest_time[{size_name}]"):
+        results[f"get_shortest_time[{size_name}]"] = measure(shortest_times, args.repeat, ops=len(pairs))
+
+    path_pairs = pairs[:200]
+    def shortest_paths():
+        for start, end in path_pairs:
+            campus_graph.get_shortest_path_with_coords(start, end)
+    if selected(args, f"get_shortest_path_with_coords[{size_name}]"):
+        results[f"get_shortest_path_with_coords[{size_name}]"] = measure(shortest_paths, args.repeat, ops=len(path_pairs))
+
+    # the group's start locations at midday, scored against every building (what each free interval does)
+    user_starts = user_start_locations(busy_slots_for_day(members, BENCH_DAY), 6 * 3600)
+    if selected(args, f"best_meeting_building[{size_name}]"):
+        results[f"best_meeting_building[{size_name}]"] = measure(
+            lambda: campus_graph.best_meeting_building(user_starts, candidate_buildings=names), args.repeat
+        )
+
+    # buildings the whole group can reach within 10 minutes (GET /graph/isochrone)
+    if selected(args, f"common_reachable_within[{size_name}]"):
+        results[f"common_reachable_within[{size_name}]"] = measure(
+            lambda: campus_graph.common_reachable_within(user_starts, 600), args.repeat
+        )
+    return results
+
+
+# --------
+# Full request benchmark: GET /algorithm/group/{id}/best_meeting_times through the app against the local database
+# --------
+def bench_requests(campuses: dict, members_by_size: dict, args) -> dict:
+    from fastapi.testclient import TestClient
+    import main as app_main
+    from graph.registry import graph_registry
+    from routes.algorithm import verify_fast_path_contract
+    from bench.localdb import LocalDatabase
+    from bench.synthetic import busy_slots_for_day
+
+    db = LocalDatabase()
+    db.install()
+    results = {}
+    try:
+        with TestClient(app_main.app) as client:
+            for size_name, (data_dir, _names) in campuses.items():
+                if not selected(args, f"best_meeting_times_request[{size_name}]"):
+                    continue
+                campus_id = f"bench-{size_name}"
+                graph_registry.register(campus_id, data_dir)
+                members = members_by_size[size_name]
+                group_id, _user_ids = db.seed_group(members, group_name=f"Benchmark {size_name}")
+
+                # the fast path must still produce exactly what the schema-built response would
+                verify_fast_path_contract(graph_registry.current(campus_id).graph, busy_slots_for_day(members, BENCH_DAY), BENCH_DAY, 30)
+
+                url = f"/algorithm/group/{group_id}/best_meeting_times"
+                params = {"day_of_week": BENCH_DAY, "meeting_duration": 30, "campus_id": campus_id}
+
+                def request():
+                    response = client.get(url, params=params)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{url} returned {response.status_code}: {response.text[:200]}")
+                results[f"best_meeting_times_request[{size_name}]"] = measure(request, args.repeat, warmup=2)
+    finally:
+        db.uninstall()
+    return results
+
+
+# --------
+# Baseline comparison
+# --------
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Returns one row per benchmark present in both runs, with status "regression", "improvement" or "ok"."""
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        ratio = current["median_ms"] / previous["median_ms"] if previous["median_ms"] else float("inf")
+        status = "regression" if ratio > 1 + tolerance else "improvement" if ratio < 1 - tolerance else "ok"
+        rows.append({"name": name, "baseline_ms": previous["median_ms"], "current_ms": current["median_ms"], "ratio": round(ratio, 3), "status": status})
+    return rows
+
+
+def print_results(results: dict, comparison: list[dict] = None):
+    by_name = {row["name"]: row for row in comparison or []}
+    print(f"\n{'benchmark':<52} {'median ms':>12} {'per op us':>12} {'vs baseline':>14}")
+    for name, result in results.items():
+        row = by_name.get(name)
+        versus = f"{row['ratio']:.2f}x {row['status']}" if row else ""
+        print(f"{name:<52} {result['median_ms']:>12.3f} {result['per_op_us']:>12.3f} {versus:>14}")
+
+
+def main(argv=None) -> int:
+    from bench.synthetic import GRAPH_SIZES, generate_campus, generate_group
+
+    parser = argparse.ArgumentParser(description="Gatherly graph and meeting-algorithm benchmarks")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated graph sizes out of {', '.join(GRAPH_SIZES)}")
+    parser.add_argument("--group-size", type=int, default=DEFAULT_GROUP_SIZE, help="members in the synthetic group")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="measured runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated graphs and schedules")
+    parser.add_argument("--only", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--skip-requests", action="store_true", help="skip the full request benchmark (no app/database)")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the results JSON")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown before a benchmark counts as a regression")
+    parser.add_argument("--save-baseline", help="also write the results to this file as the new baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in GRAPH_SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+
+    work_dir = tempfile.mkdtemp(prefix="gatherly-bench-graphs-")
+    campuses, members_by_size = {}, {}
+    for size_name in sizes:
+        data_dir = os.path.join(work_dir, size_name)
+        names = generate_campus(data_dir, GRAPH_SIZES[size_name], seed=args.seed)
+        campuses[size_name] = (data_dir, names)
+        members_by_size[size_name] = generate_group(names, args.group_size, seed=args.seed, label=f"{size_name}-{args.seed}")
+        print(f"[INFO] Generated {size_name} campus with {len(names)} buildings in {data_dir}")
+
+    results = {}
+    for size_name, (data_dir, names) in campuses.items():
+        results.update(bench_graph(size_name, data_dir, names, members_by_size[size_name], args))
+    if not args.skip_requests and any(selected(args, f"best_meeting_times_request[{size_name}]") for size_name in sizes):
+        results.update(bench_requests(campuses, members_by_size, args))
+
+    report = {"meta": run_meta(args), "results": results}
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            comparison = compare_to_baseline(results, json.load(f), args.tolerance)
+        report["comparison"] = {"baseline": args.baseline, "tolerance": args.tolerance, "rows": comparison}
+
+    print_results(results, comparison)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Wrote results to {path}")
+
+    regressions = [row for row in comparison or [] if row["status"] == "regression"]
+    if regressions:
+        print(f"[WARNING] {len(regressions)} benchmark(s) slower than the baseline by more than {args.tolerance:.0%}: "
+              + ", ".join(row["name"] for row in regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import csv
+import math
+import os
+import random
+
+# ------
+# Synthetic campus graphs and group schedules for benchmarks and load tests
+# Everything is generated from a seed, so the same arguments always produce the same data
+# ------
+
+# bounding box the generated buildings are placed in (about the size of the UW-Madison campus)
+CAMPUS_LAT = (43.066, 43.080)
+CAMPUS_LON = (-89.420, -89.395)
+
+# walking speed used to turn distances into edge weights, in meters per second
+WALKING_SPEED = 1.4
+
+# every building links to this many nearest neighbours (the real campus graph has about 5 edges per node)
+NEIGHBOURS_PER_NODE = 5
+
+# graph sizes used by the benchmark suite: name -> number of buildings
+GRAPH_SIZES = {"small": 150, "medium": 500, "large": 1200}
+
+# class lengths in minutes and the times classes can start at (seconds past 7:00 am, on the hour or half hour)
+CLASS_MINUTES = (50, 50, 50, 75, 110)
+CLASS_STARTS = list(range(3600, 11 * 3600, 1800))
+
+
+def _distance_m(a: tuple, b: tuple) -> float:
+    """Approximate distance in meters between two (lat, lon) points (equirectangular, fine at campus scale)."""
+    lat = math.radians((a[0] + b[0]) / 2)
+    dx = math.radians(b[1] - a[1]) * math.cos(lat)
+    dy = math.radians(b[0] - a[0])
+    return 6371000 * math.hypot(dx, dy)
+
+
+def generate_campus(data_dir: str, node_count: int, seed: int = 0) -> list[str]:
+    """
+    Writes campus.dot and nodes.csv for a random connected campus with node_count buildings into data_dir.
+    Buildings are linked to their nearest neighbours in both directions (with slightly different walking
+    times per direction, like hills on the real campus) and along a chain so the graph is always connected.
+    Returns the building names.
+    """
+    rng = random.Random(seed)
+    names = [f"Building {i:04d}" for i in range(node_count)]
+    coords = [(rng.uniform(*CAMPUS_LAT), rng.uniform(*CAMPUS_LON)) for _ in range(node_count)]
+
+    edges = {}
+    def link(u: int, v: int):
+        meters = _distance_m(coords[u], coords[v])
+        for a, b in ((u, v), (v, u)):
+            if (a, b) not in edges:
+                edges[(a, b)] = round(meters / WALKING_SPEED * rng.uniform(0.9, 1.2), 1)
+
+    # nearest neighbours, found within a grid of cells so large graphs don't need all pairs
+    cell_size = max(CAMPUS_LAT[1] - CAMPUS_LAT[0], CAMPUS_LON[1] - CAMPUS_LON[0]) / max(1, int(math.sqrt(node_count / 4)))
+    cells = {}
+    for i, (lat, lon) in enumerate(coords):
+        cells.setdefault((int(lat / cell_size), int(lon / cell_size)), []).append(i)
+    for i, (lat, lon) in enumerate(coords):
+        cell_lat, cell_lon = int(lat / cell_size), int(lon / cell_size)
+        radius = 1
+        while True:
+            nearby = [j for d_lat in range(-radius, radius + 1) for d_lon in range(-radius, radius + 1)
+                      for j in cells.get((cell_lat + d_lat, cell_lon + d_lon), ()) if j != i]
+            if len(nearby) >= NEIGHBOURS_PER_NODE or len(nearby) == node_count - 1:
+                break
+            radius += 1
+        nearby.sort(key=lambda j: _distance_m(coords[i], coords[j]))
+        for j in nearby[:NEIGHBOURS_PER_NODE]:
+            link(i, j)
+
+    # chain in random order keeps the graph connected
+    order = list(range(node_count))
+    rng.shuffle(order)
+    for u, v in zip(order, order[1:]):
+        link(u, v)
+
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, "campus.dot"), "w", encoding="utf-8") as f:
+        f.write("digraph campus {\n")
+        for (u, v), seconds in sorted(edges.items()):
+            f.write(f'\t"{names[u]}" -> "{names[v]}" [seconds={seconds}];\n')
+        f.write("}\n")
+    with open(os.path.join(data_dir, "nodes.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Location Name", "Latitude", "Longitude"])
+        for name, (lat, lon) in zip(names, coords):
+            writer.writerow([name, lat, lon])
+    return names
+
+
+def generate_user_schedule(rng: random.Random, locations: list[str], days=range(7)) -> list[tuple]:
+    """
+    Random weekly schedule of one student: 2-5 classes on weekdays (fewer on weekends), each on the hour or
+    half hour and never overlapping. Returns [(day_of_week, start_seconds, end_seconds, location), ...].
+    """
+    slots = []
+    for day in days:
+        weekend = day in (0, 6)
+        class_count = rng.randint(0, 1) if weekend else rng.randint(2, 5)
+        busy_until = 0
+        for start in sorted(rng.sample(CLASS_STARTS, class_count)):
+            if start < busy_until:
+                continue
+            end = min(start + rng.choice(CLASS_MINUTES) * 60, 12 * 3600)
+            slots.append((day, start, end, rng.choice(locations)))
+            busy_until = end + 600  # at least 10 minutes between classes
+    return slots
+
+
+def generate_group(locations: list[str], user_count: int, seed: int = 0, days=range(7), label: str = None) -> list[dict]:
+    """
+    Random group members: [{"name", "email", "home_location", "slots": [(day, start, end, location), ...]}, ...]
+    Home locations and class buildings are drawn from locations. label (default: the seed) makes the
+    names and emails unique when several groups go into the same database.
+    """
+    rng = random.Random(seed)
+    label = label or str(seed)
+    return [
+        {
+            "name": f"User {label}-{i}",
+            "email": f"user-{label}-{i}@example.edu",
+            "home_location": rng.choice(locations),
+            "slots": generate_user_schedule(rng, locations, days),
+        }
+        for i in range(user_count)
+    ]
+
+
+def busy_slots_for_day(members: list[dict], day_of_week: int) -> dict:
+    """Converts generated members to the user_busy_slots layout used by meeting.py for one day (user ids 1..n)."""
+    return {
+        user_id: {
+            "home_location": member["home_location"],
+            "name": member["name"],
+            "slots_with_names": [(start, end, loc, member["name"]) for day, start, end, loc in sorted(member["slots"]) if day == day_of_week],
+        }
+        for user_id, member in enumerate(members, start=1)
+    }
@@ -0,0 +1,152 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+# ------
+# Opt-in capture of anonymized /algorithm and /schedule requests, for replaying real traffic shapes locally
+# (python -m bench.replay). Enabled by setting REQUEST_CAPTURE_DIR; each worker appends JSON lines to its own file.
+# A record keeps what determines the cost and result of a request: the route, non-identifying query parameters,
+# status, duration, and the data the route worked on (group sizes, slot layouts, start locations), plus a
+# summary of the computed meeting slots. User/group ids, names, emails, free-text purposes and tokens are never
+# written; members are only numbered in their original order
+# ------
+REQUEST_CAPTURE_DIR = os.getenv("REQUEST_CAPTURE_DIR")
+
+# fraction of matching requests that are captured
+REQUEST_CAPTURE_SAMPLE_RATE = float(os.getenv("REQUEST_CAPTURE_SAMPLE_RATE", "1.0"))
+
+# capturing stops once a worker has written this much
+REQUEST_CAPTURE_MAX_MB = float(os.getenv("REQUEST_CAPTURE_MAX_MB", "100"))
+
+# only requests under these paths are captured
+CAPTURED_PATH_PREFIXES = ("/algorithm/", "/schedule/")
+
+# query parameters that could identify someone are dropped (ids, emails, tokens, group codes)
+IDENTIFYING_QUERY_PATTERN = re.compile(r"user_id|email|token|code|name", re.IGNORECASE)
+
+# data recorded by the route handling the current request (a dict while the request is being captured)
+_current_capture: ContextVar = ContextVar("request_capture", default=None)
+
+
+# --------
+# Helpers for the routes: record the data a captured request worked on
+# --------
+def capturing() -> bool:
+    """True if the current request is being captured (routes only build snapshots then)."""
+    return _current_capture.get() is not None
+
+def capture_data(kind: str, data):
+    """Attaches data (already anonymized, JSON-serializable) to the current request's capture record."""
+    captured = _current_capture.get()
+    if captured is not None:
+        captured[kind] = data
+
+def anonymize_busy_slots(user_busy_slots: dict) -> list[dict]:
+    """Group snapshot without ids or names: [{"home_location", "slots": [[start, end, location], ...]}, ...] in member order."""
+    return [
+        {"home_location": info["home_location"], "slots": [[start, end, loc] for start, end, loc, _name in info["slots_with_names"]]}
+        for info in user_busy_slots.values()
+    ]
+
+def summarize_meeting_slots(slots: list[dict]) -> list[list]:
+    """Result summary to compare replays with: [[start, end, meeting_location, [walk_time per member]], ...]."""
+    return [
+        [slot["start_seconds"], slot["end_seconds"], slot["meeting_location"], [user["walk_time"] for user in slot["user_locations"]]]
+        for slot in slots
+    ]
+
+
+def route_template(path: str, path_params: dict) -> str:
+    """Replaces the path parameter values in path with their names, e.g. /schedule/42 -> /schedule/{user_id}."""
+    by_value = {str(value): name for name, value in path_params.items()}
+    return "/".join("{" + by_value[segment] + "}" if segment in by_value else segment for segment in path.split("/"))
+
+
+class RequestCapture:
+
+    # ------
+    # Writes one JSON line per captured request to <directory>/capture-<pid>-<start time>.jsonl
+    # ------
+    def __init__(self, directory: str = REQUEST_CAPTURE_DIR, sample_rate: float = REQUEST_CAPTURE_SAMPLE_RATE,
+                 max_mb: float = REQUEST_CAPTURE_MAX_MB):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_bytes = int(max_mb * 2**20)
+        self._lock = threading.Lock()
+        self._file = None
+        self._written = 0
+        self.path = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def write(self, record: dict):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._written + len(line) > self.max_bytes:
+                return
+            if self._file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self.path = os.path.join(self.directory, f"capture-{os.getpid()}-{time.strftime('%Y%m%dT%H%M%S')}.jsonl")
+                self._file = open(self.path, "a", encoding="utf-8")
+                print(f"[INFO] Capturing anonymized requests to {self.path}")
+            self._file.write(line)
+            self._file.flush()
+            self._written += len(line)
+            if self._written + len(line) > self.max_bytes:
+                print(f"[WARNING] Request capture reached {self.max_bytes // 2**20} MB, no further requests are captured")
+
+    async def middleware(self, request, call_next):
+        """HTTP middleware: captures a sample of /algorithm and /schedule requests."""
+        if not request.url.path.startswith(CAPTURED_PATH_PREFIXES) or random.random() >= self.sample_rate:
+            return await call_next(request)
+
+        captured = {}
+        token = _current_capture.set(captured)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _current_capture.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000  # until the response starts (streams keep running)
+
+        try:
+            self.write({
+                "ts": round(time.time(), 3),
+                "method": request.method,
+                "route": route_template(request.url.path, request.scope.get("path_params") or {}),
+                "query": {key: value for key, value in request.query_params.items() if not IDENTIFYING_QUERY_PATTERN.search(key)},
+                "status": response.status_code,
+                "duration_ms": round(duration_ms, 3),
+                **captured,
+            })
+        except Exception as e:
+            print(f"[WARNING] Could not write request capture: {e}")
+        return response
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# shared capture used by the app middleware
+request_capture = RequestCapture()
+
+
+def load_capture(path: str) -> list[dict]:
+    """Reads captured records from a .jsonl file (or every .jsonl file in a directory)."""
+    paths = [path]
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".jsonl"))
+    records = []
+    for file_path in paths:
+        with open(file_path, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
@@ -0,0 +1,5 @@
+# ------
+# pytest configuration: its presence makes pytest put the backend directory on sys.path, so tests import the
+# app modules (meeting, graph, routes, ...) the same way the app does. Run the tests from the backend directory:
+#   python -m pytest
+# ------
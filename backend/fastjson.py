@@ -0,0 +1,18 @@
+# ------
+# Fast JSON encoding for hot response paths
+# Uses orjson when it is installed (several times faster than the standard library and returns bytes
+# directly), otherwise falls back to json with the same compact, UTF-8 output FastAPI produces
+# ------
+try:
+    import orjson
+
+    def dumps(obj) -> bytes:
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj)
+
+except ImportError:
+    import json
+
+    def dumps(obj) -> bytes:
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
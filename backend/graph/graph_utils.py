@@ -1,6 +1,20 @@
-import networkx as nx
 import os
-import csv
+import sys
+from bisect import bisect_right
+from graph.loader import UNCATEGORIZED, load_graph_data
+from fastjson import dumps
+
+# maximum number of serialized paths kept per graph (the cache is cleared when it is full)
+PATH_JSON_CACHE_SIZE = int(os.getenv("PATH_JSON_CACHE_SIZE", "50000"))
+
+# node categories (node_categories.csv) that are not meeting venues: left out of the candidate buildings
+# unless a request asks for them by venue type
+NON_VENUE_CATEGORIES = frozenset(
+    category.strip().lower() for category in os.getenv("NON_VENUE_CATEGORIES", "parking,utility,residence").split(",") if category.strip()
+)
+
+# networkx is imported inside the methods that need it: it is a heavy import and deferring it
+# lets the app start serving before the first graph is built
 
 class CampusGraph:
     
@@ -8,45 +22,59 @@ class CampusGraph:
     # Endpoint: Encapsulate the campus graph and precompute shortest paths for efficient queries
     # This class will be instantiated once at application startup and used for all graph-related queries
     # ------ 
-    def __init__(self):
+    def __init__(self, data_dir: str = None):
         
         """
         Load the campus graph from .dot file and precompute shortest paths
+        data_dir: directory containing campus.dot and nodes.csv (default: the directory of this file)
         """
         
-        # Get the directory where this file is located
-        current_dir = os.path.dirname(os.path.abspath(__file__))
+        # Default to the directory where this file is located
+        current_dir = data_dir or os.path.dirname(os.path.abspath(__file__))
+        self.data_dir = current_dir
         
-        # Load the graph from the .dot file
-        dot_file = os.path.join(current_dir, 'campus.dot')
-        self.graph = nx.DiGraph(nx.nx_pydot.read_dot(dot_file))
+        import networkx as nx
         
-        # convert edge weights to float seconds (they are read as strings from the .dot file)
-        for u, v, d in self.graph.edges(data=True):
-            d['seconds'] = float(d.get('seconds', 0.0))
+        # Load the graph and coordinates with the native loader (no pydot parsing, weights are already floats)
+        data = load_graph_data(current_dir)
+        self.missing_coords = data.missing_coords  # graph nodes without an entry in nodes.csv
+        
+        self.graph = nx.DiGraph()
+        self.graph.add_nodes_from(data.nodes)
+        nodes = data.nodes
+        self.graph.add_weighted_edges_from(
+            ((nodes[u], nodes[v], seconds) for u, v, seconds in zip(data.edge_src, data.edge_dst, data.edge_seconds)),
+            weight='seconds',
+        )
         
         # precompute all-pairs shortest path lengths (in seconds) and store in a dictionary for O(1) access later
         self.all_pairs = dict(nx.all_pairs_dijkstra_path_length(self.graph, weight='seconds'))
         
-        # --- read node coordinates ---
-        self.node_coords = {}
-        nodes_csv = os.path.join(current_dir, 'nodes.csv')
-        with open(nodes_csv, 'r', encoding='utf-8') as f:
-            next(f)  # skip header
-            for line in f:
-                parts = line.strip().split(',')
-                if len(parts) >= 3:
-                    # Last two parts are always latitude and longitude
-                    try:
-                        lon = float(parts[-1].strip())
-                        lat = float(parts[-2].strip())
-                        # Everything else is the location name
-                        node = ','.join(parts[:-2]).strip()
-                        self.node_coords[node] = (lat, lon)
-                    except ValueError:
-                        # Skip malformed lines
-                        print(f"[WARNING] Skipping malformed coordinate line: {line.strip()}")
-                        continue
+        # each source's distance row sorted by time, as (seconds ascending, location names in the same order),
+        # so "everything within T seconds" is a binary search plus a slice (see reachable_within)
+        self.sorted_rows = {}
+        for source, row in self.all_pairs.items():
+            ordered = sorted(row.items(), key=lambda item: item[1])
+            self.sorted_rows[source] = ([seconds for _name, seconds in ordered], [name for name, _seconds in ordered])
+        
+        # node coordinates as {name: (lat, lon)}
+        self.node_coords = data.coords
+        
+        # node categories as {name: category} and the candidate meeting buildings precomputed per category
+        # (in graph node order, so ties in best_meeting_building resolve the same way for every subset)
+        self.node_categories = data.categories
+        self.category_buildings = {}
+        for name in self.graph.nodes:
+            self.category_buildings.setdefault(self.node_categories.get(name, UNCATEGORIZED), []).append(name)
+        # default candidates: every building outside NON_VENUE_CATEGORIES (all of them if that leaves none)
+        self.venue_buildings = [name for name in self.graph.nodes if self.node_categories.get(name, UNCATEGORIZED) not in NON_VENUE_CATEGORIES]
+        if not self.venue_buildings:
+            self.venue_buildings = list(self.graph.nodes)
+        # frozenset of venue types -> candidate buildings, filled on demand by meeting_candidates
+        self._candidates_by_types = {}
+        
+        # (start, end) -> path with coords already serialized as JSON, filled on demand by get_path_json
+        self._path_json_cache = {}
     
     # ------
     # Endpoint: Get the shortest travel time between two locations on campus
@@ -64,6 +92,7 @@ class CampusGraph:
     # ------
     def get_shortest_path(self, start: str, end: str) -> list[str]:
         """Returns the sequence of nodes from start to end along the shortest path."""
+        import networkx as nx
         try:
             return nx.shortest_path(self.graph, source=start, target=end, weight='seconds')
         except nx.NetworkXNoPath:
@@ -97,6 +126,21 @@ class CampusGraph:
                 })
         return result
     
+    def get_path_json(self, start: str, end: str) -> bytes:
+        """
+        Returns get_shortest_path_with_coords(start, end) already serialized as a JSON array.
+        Cached per (start, end), so a path that shows up in many responses is computed and encoded once
+        and can be copied straight into a response body.
+        """
+        key = (start, end)
+        path_json = self._path_json_cache.get(key)
+        if path_json is None:
+            if len(self._path_json_cache) >= PATH_JSON_CACHE_SIZE:
+                self._path_json_cache.clear()
+            path_json = dumps(self.get_shortest_path_with_coords(start, end))
+            self._path_json_cache[key] = path_json
+        return path_json
+    
     # ------
     # Endpoint: Get all locations on campus
     # GET /graph/all_locations
@@ -108,6 +152,77 @@ class CampusGraph:
         """
         return list(self.graph.nodes)
     
+    def estimated_bytes(self) -> int:
+        """
+        Rough estimate of the memory held by this graph, dominated by the all-pairs table.
+        Used by the graph registry to keep loaded campuses within a memory budget.
+        """
+        size = sys.getsizeof(self.all_pairs)
+        for row in self.all_pairs.values():
+            # dict storage plus one float object per entry (keys are shared node name strings)
+            size += sys.getsizeof(row) + len(row) * sys.getsizeof(0.0)
+        size += sys.getsizeof(self.node_coords) + len(self.node_coords) * (sys.getsizeof((0.0, 0.0)) + 2 * sys.getsizeof(0.0))
+        # candidate lists only hold references to the node names
+        size += sum(sys.getsizeof(names) for names in self.category_buildings.values()) + sys.getsizeof(self.venue_buildings)
+        # sorted rows only hold references to the all-pairs floats and the node names
+        size += sum(sys.getsizeof(times) + sys.getsizeof(names) for times, names in self.sorted_rows.values())
+        # networkx keeps an attribute dict per edge and adjacency dicts per node
+        size += self.graph.number_of_edges() * 400 + self.graph.number_of_nodes() * 600
+        return size
+    
+    def venue_types(self) -> dict:
+        """Number of buildings per category, e.g. {"academic": 75, "parking": 4}, for validating and listing venue types."""
+        return {category: len(names) for category, names in self.category_buildings.items()}
+    
+    def meeting_candidates(self, venue_types=None) -> list[str]:
+        """
+        Candidate meeting buildings of the given categories (venue_types), or the default venues
+        (every category outside NON_VENUE_CATEGORIES) if none are given.
+        The lists are precomputed or cached per set of venue types, so callers must not modify them.
+        Unknown categories match no buildings; routes validate them against venue_types() first.
+        """
+        if not venue_types:
+            return self.venue_buildings
+        key = frozenset(venue_types)
+        candidates = self._candidates_by_types.get(key)
+        if candidates is None:
+            if len(key) == 1:
+                candidates = self.category_buildings.get(next(iter(key)), [])
+            else:
+                candidates = [name for name in self.graph.nodes if self.node_categories.get(name, UNCATEGORIZED) in key]
+            self._candidates_by_types[key] = candidates
+        return candidates
+    
+    def reachable_within(self, origin: str, seconds: float) -> list[tuple[str, float]]:
+        """
+        Locations reachable from origin within seconds (origin included), as [(location, seconds), ...] nearest first.
+        Binary search in the origin's presorted row, so the cost depends on the number of results, not the graph size.
+        Returns an empty list for unknown origins.
+        """
+        row = self.sorted_rows.get(origin)
+        if row is None:
+            return []
+        times, names = row
+        count = bisect_right(times, seconds)
+        return list(zip(names[:count], times[:count]))
+
+    def common_reachable_within(self, origins: list[str], seconds: float) -> list[tuple[str, float]]:
+        """
+        Locations every origin can reach within seconds, as [(location, slowest origin's seconds), ...] nearest first.
+        Walks the smallest of the origins' reachable sets and checks the other origins with direct lookups.
+        """
+        if not origins:
+            return []
+        reachable = [self.reachable_within(origin, seconds) for origin in origins]
+        smallest = min(reachable, key=len)
+        common = []
+        for name, _seconds in smallest:
+            slowest = max(self.all_pairs[origin].get(name, float('inf')) for origin in origins)
+            if slowest <= seconds:
+                common.append((name, slowest))
+        common.sort(key=lambda item: item[1])
+        return common
+    
     def best_meeting_building(self, user_starts: list[str], candidate_buildings: list[str] = None):
         """
         Score each candidate building by fairness: prioritizes balanced travel distribution.
@@ -119,10 +234,13 @@ class CampusGraph:
         This penalizes buildings where one person travels much more than others.
         
         user_starts: list of starting locations for each user
-        candidate_buildings: optional list of buildings to evaluate (default: all nodes in the graph)
+        candidate_buildings: optional list of buildings to evaluate (default: meeting_candidates(), the meeting venues)
         Returns: list of tuples (building_name, fairness_score) sorted by fairness_score ascending
         """
         
+        if candidate_buildings is None:
+            candidate_buildings = self.meeting_candidates()
+        
         scores = []
         for b in candidate_buildings:
             distances = []
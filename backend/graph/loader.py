@@ -0,0 +1,183 @@
+import csv
+import os
+import re
+from array import array
+from typing import NamedTuple
+
+# ------
+# Purpose-built readers for the campus graph source files
+# campus.dot only uses a tiny subset of the DOT language (one quoted edge per line with a numeric
+# "seconds" attribute), so a line-by-line parser is much faster than going through pydot and
+# builds the edge arrays directly instead of string attributes that have to be converted afterwards
+# ------
+
+# a quoted DOT id, allowing escaped quotes inside the name
+_QUOTED_ID = r'"((?:[^"\\]|\\.)*)"'
+
+# "A" -> "B" [seconds=12.5];
+DOT_EDGE_PATTERN = re.compile(r'^' + _QUOTED_ID + r'\s*->\s*' + _QUOTED_ID + r'\s*(?:\[([^\]]*)\])?\s*;?$')
+
+# "A";  or  "A" [label="..."];
+DOT_NODE_PATTERN = re.compile(r'^' + _QUOTED_ID + r'\s*(?:\[([^\]]*)\])?\s*;?$')
+
+# key=value pairs inside an attribute list
+DOT_ATTR_PATTERN = re.compile(r'(\w+)\s*=\s*("(?:[^"\\]|\\.)*"|[^,;\s\]]+)')
+
+# category of graph nodes that are not listed in node_categories.csv
+UNCATEGORIZED = "uncategorized"
+
+# graph header / footer lines, default attribute statements and comments are skipped
+DOT_SKIP_PATTERN = re.compile(r'^((strict\s+)?(di)?graph\b.*\{|\}|(graph|node|edge)\s*\[.*\]\s*;?|//.*|#.*|)$')
+
+
+class GraphFileError(ValueError):
+    """Raised when campus.dot or nodes.csv contains a line the loader does not understand."""
+
+
+# ------
+# Parsed graph data, node names are stored once and edges refer to them by index
+# ------
+class GraphData(NamedTuple):
+    nodes: list               # node names in order of first appearance
+    index: dict               # node name -> position in nodes
+    edge_src: array           # source node index of every edge
+    edge_dst: array           # target node index of every edge
+    edge_seconds: array       # walking time of every edge in seconds
+    coords: dict              # node name -> (lat, lon), only for nodes listed in nodes.csv
+    missing_coords: list      # graph nodes without an entry in nodes.csv (sorted)
+    categories: dict          # node name -> category (lower case), UNCATEGORIZED for nodes not in node_categories.csv
+
+
+def _unescape(name: str) -> str:
+    return name.replace('\\"', '"').replace('\\\\', '\\')
+
+
+def _node_id(name: str, nodes: list, index: dict) -> int:
+    node_id = index.get(name)
+    if node_id is None:
+        node_id = len(nodes)
+        index[name] = node_id
+        nodes.append(name)
+    return node_id
+
+
+def parse_dot_edges(dot_file: str):
+    """
+    Streams campus.dot and returns (nodes, index, edge_src, edge_dst, edge_seconds).
+    Edges without a seconds attribute get 0 seconds (same as the old pydot based loader).
+    Raises GraphFileError with the line number for anything outside the supported subset.
+    """
+    nodes, index = [], {}
+    edge_src, edge_dst, edge_seconds = array('i'), array('i'), array('d')
+
+    with open(dot_file, 'r', encoding='utf-8') as f:
+        for line_number, raw_line in enumerate(f, start=1):
+            line = raw_line.strip()
+
+            match = DOT_EDGE_PATTERN.match(line)
+            if match:
+                src, dst, attrs = match.groups()
+                seconds = 0.0
+                if attrs:
+                    for key, value in DOT_ATTR_PATTERN.findall(attrs):
+                        if key == 'seconds':
+                            try:
+                                seconds = float(value.strip('"'))
+                            except ValueError:
+                                raise GraphFileError(f"{dot_file}:{line_number}: invalid seconds value {value!r}")
+                edge_src.append(_node_id(_unescape(src), nodes, index))
+                edge_dst.append(_node_id(_unescape(dst), nodes, index))
+                edge_seconds.append(seconds)
+                continue
+
+            match = DOT_NODE_PATTERN.match(line)
+            if match:
+                _node_id(_unescape(match.group(1)), nodes, index)
+                continue
+
+            if DOT_SKIP_PATTERN.match(line):
+                continue
+
+            raise GraphFileError(f"{dot_file}:{line_number}: unsupported DOT statement: {line}")
+
+    return nodes, index, edge_src, edge_dst, edge_seconds
+
+
+def read_node_coords(nodes_csv: str) -> dict:
+    """
+    Reads nodes.csv (header row, then name, latitude, longitude) into {name: (lat, lon)}.
+    The last two columns are always latitude and longitude, so unquoted commas inside a name are kept.
+    Malformed rows are skipped with a warning.
+    """
+    node_coords = {}
+    with open(nodes_csv, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # skip header
+        for row in reader:
+            if len(row) < 3:
+                if any(cell.strip() for cell in row):
+                    print(f"[WARNING] Skipping malformed coordinate line {reader.line_num}: {','.join(row)}")
+                continue
+            try:
+                lat = float(row[-2])
+                lon = float(row[-1])
+            except ValueError:
+                print(f"[WARNING] Skipping malformed coordinate line {reader.line_num}: {','.join(row)}")
+                continue
+            node = ','.join(row[:-2]).strip()
+            node_coords[node] = (lat, lon)
+    return node_coords
+
+
+def read_node_categories(categories_csv: str) -> dict:
+    """
+    Reads node_categories.csv (header row, then name, category) into {name: category}, categories lower-cased.
+    The last column is always the category, so unquoted commas inside a name are kept (same as nodes.csv).
+    The file is optional: returns an empty dict if it does not exist. Malformed rows are skipped with a warning.
+    """
+    if not os.path.exists(categories_csv):
+        return {}
+    categories = {}
+    with open(categories_csv, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # skip header
+        for row in reader:
+            category = row[-1].strip().lower() if len(row) >= 2 else ''
+            if not category:
+                if any(cell.strip() for cell in row):
+                    print(f"[WARNING] Skipping malformed category line {reader.line_num}: {','.join(row)}")
+                continue
+            categories[','.join(row[:-1]).strip()] = category
+    return categories
+
+
+def load_graph_data(data_dir: str) -> GraphData:
+    """
+    Loads campus.dot, nodes.csv and (if present) node_categories.csv from data_dir and validates that every
+    graph node has coordinates. Nodes without coordinates are still part of the graph (paths just skip them
+    when drawing), they are reported in missing_coords and logged as a warning.
+    Nodes without a category get UNCATEGORIZED, categories for names that are not in the graph are ignored.
+    """
+    nodes, index, edge_src, edge_dst, edge_seconds = parse_dot_edges(os.path.join(data_dir, 'campus.dot'))
+    coords = read_node_coords(os.path.join(data_dir, 'nodes.csv'))
+    listed_categories = read_node_categories(os.path.join(data_dir, 'node_categories.csv'))
+
+    missing_coords = sorted(node for node in nodes if node not in coords)
+    if missing_coords:
+        print(f"[WARNING] {len(missing_coords)} graph node(s) in {data_dir} have no coordinates in nodes.csv: {', '.join(missing_coords)}")
+
+    unknown_categorized = sorted(name for name in listed_categories if name not in index)
+    if unknown_categorized:
+        print(f"[WARNING] {len(unknown_categorized)} location(s) in node_categories.csv are not in the graph: {', '.join(unknown_categorized)}")
+    categories = {node: listed_categories.get(node, UNCATEGORIZED) for node in nodes}
+
+    return GraphData(
+        nodes=nodes,
+        index=index,
+        edge_src=edge_src,
+        edge_dst=edge_dst,
+        edge_seconds=edge_seconds,
+        coords=coords,
+        missing_coords=missing_coords,
+        categories=categories,
+    )
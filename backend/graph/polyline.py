@@ -0,0 +1,50 @@
+# ------
+# Encoded polyline format (the one used by Google Maps / Leaflet plugins) for compact path geometry
+# Each coordinate is stored as the delta to the previous one, rounded to 5 decimal places (~1 m),
+# and written as base64-like characters, so a path costs a few bytes per node instead of two floats
+# ------
+
+def _encode_value(value: int, out: list):
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+def encode_polyline(coords: list, precision: int = 5) -> str:
+    """
+    Encodes a list of (lat, lon) pairs as a polyline string.
+    Example: [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)] -> "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    """
+    factor = 10 ** precision
+    out = []
+    prev_lat = prev_lon = 0
+    for lat, lon in coords:
+        lat_i = int(round(lat * factor))
+        lon_i = int(round(lon * factor))
+        _encode_value(lat_i - prev_lat, out)
+        _encode_value(lon_i - prev_lon, out)
+        prev_lat, prev_lon = lat_i, lon_i
+    return "".join(out)
+
+def decode_polyline(encoded: str, precision: int = 5) -> list:
+    """Decodes a polyline string back into a list of (lat, lon) pairs."""
+    factor = 10 ** precision
+    coords = []
+    index = lat = lon = 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        coords.append((lat / factor, lon / factor))
+    return coords
@@ -0,0 +1,407 @@
+import os
+import re
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple, Optional
+from graph.graph_utils import CampusGraph
+
+# directory holding the default campus.dot / nodes.csv
+DEFAULT_GRAPH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# id of the campus served from DEFAULT_GRAPH_DIR, used when a request does not name a campus
+DEFAULT_CAMPUS_ID = os.getenv("DEFAULT_CAMPUS_ID", "uw-madison")
+
+# every other campus lives in its own sub-directory of this folder: <CAMPUS_GRAPH_ROOT>/<campus_id>/campus.dot, nodes.csv
+CAMPUS_GRAPH_ROOT = os.getenv("CAMPUS_GRAPH_ROOT", os.path.join(DEFAULT_GRAPH_DIR, "campuses"))
+
+# source files that make up one campus graph; a change to any of them triggers a rebuild
+SOURCE_FILES = ("campus.dot", "nodes.csv", "node_categories.csv")
+
+# how often (in seconds) the watcher thread checks the source files for changes, 0 disables watching
+RELOAD_POLL_SECONDS = float(os.getenv("GRAPH_RELOAD_POLL_SECONDS", "5"))
+
+# upper bound for the estimated memory of all loaded campus graphs, least recently used campuses are evicted first
+GRAPH_MEMORY_BUDGET_MB = float(os.getenv("GRAPH_MEMORY_BUDGET_MB", "512"))
+
+# campuses (other than the default one) not used for this many seconds are unloaded, 0 disables idle eviction
+GRAPH_IDLE_EVICT_SECONDS = float(os.getenv("GRAPH_IDLE_EVICT_SECONDS", "1800"))
+
+# campus ids are used as directory names, so only allow safe characters
+CAMPUS_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class UnknownCampusError(KeyError):
+    """Raised when a campus id has no graph data on disk."""
+
+
+# ------
+# Immutable snapshot of one built graph version
+# Requests hold on to the snapshot they started with, so a swap never changes the graph under them
+# ------
+class GraphVersion(NamedTuple):
+    graph: CampusGraph
+    version: int
+    built_at: datetime
+    build_seconds: float
+    fingerprint: tuple
+    size_bytes: int
+
+
+def source_fingerprint(data_dir: str) -> tuple:
+    """
+    Returns (file name, mtime_ns, size) for every source file in data_dir.
+    Missing files are recorded as (name, None, None) so that creating them is also detected as a change.
+    """
+    fingerprint = []
+    for name in SOURCE_FILES:
+        try:
+            stat = os.stat(os.path.join(data_dir, name))
+            fingerprint.append((name, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            fingerprint.append((name, None, None))
+    return tuple(fingerprint)
+
+
+class GraphRegistry:
+
+    # ------
+    # Versioned holder for the graph of one campus
+    # The graph is built on first use, rebuilt when the source files change (or when an admin asks for it)
+    # and swapped in atomically once the new version is fully built
+    # ------
+    def __init__(self, data_dir: str = None):
+        self.data_dir = data_dir or DEFAULT_GRAPH_DIR
+
+        self._active: Optional[GraphVersion] = None  # current snapshot, replaced as a whole on swap
+        self._build_lock = threading.Lock()  # only one build runs at a time
+        self._next_version = 1
+        self._rebuilding = False
+        self._last_error: Optional[str] = None
+        self._failed_fingerprint: Optional[tuple] = None  # source state of the last failed build
+        self.last_used = time.monotonic()
+
+    # ------
+    # Access
+    # ------
+    def current(self) -> GraphVersion:
+        """
+        Returns the active graph snapshot, building the first version synchronously if needed.
+        Callers should fetch the snapshot once per request and use it throughout.
+        """
+        self.last_used = time.monotonic()
+        snapshot = self._active
+        if snapshot is None:
+            snapshot = self.rebuild(only_if_missing=True)
+        return snapshot
+
+    def get(self) -> CampusGraph:
+        """Returns the active CampusGraph instance."""
+        return self.current().graph
+
+    def is_loaded(self) -> bool:
+        """True while a graph version is resident."""
+        return self._active is not None
+
+    def size_bytes(self) -> int:
+        """Estimated memory of the resident version (0 if unloaded)."""
+        snapshot = self._active
+        return snapshot.size_bytes if snapshot else 0
+
+    def info(self) -> dict:
+        """Returns the active version and build metadata, without triggering a build."""
+        snapshot = self._active
+        return {
+            "data_dir": self.data_dir,
+            "loaded": snapshot is not None,
+            "version": snapshot.version if snapshot else None,
+            "built_at": snapshot.built_at.isoformat() if snapshot else None,
+            "build_seconds": round(snapshot.build_seconds, 3) if snapshot else None,
+            "size_mb": round(snapshot.size_bytes / 2**20, 2) if snapshot else None,
+            "missing_coords": snapshot.graph.missing_coords if snapshot else None,
+            "rebuilding": self._rebuilding,
+            "last_error": self._last_error,
+        }
+
+    # ------
+    # Building, swapping and unloading
+    # ------
+    def rebuild(self, only_if_missing: bool = False, only_if_changed: bool = False) -> GraphVersion:
+        """
+        Builds a new CampusGraph from the source files and swaps it in.
+        only_if_missing: skip the build if some version is already active (used for the first load)
+        only_if_changed: skip the build if the source files have not changed since the active version
+        Returns the snapshot that is active afterwards.
+        If the build fails, the previous version stays active and the error is re-raised.
+        """
+        with self._build_lock:
+            active = self._active
+            if only_if_missing and active is not None:
+                return active
+
+            fingerprint = source_fingerprint(self.data_dir)
+            if only_if_changed and active is not None and active.fingerprint == fingerprint:
+                return active
+
+            self._rebuilding = True
+            try:
+                started = time.perf_counter()
+                graph = CampusGraph(self.data_dir)
+                build_seconds = time.perf_counter() - started
+            except Exception as e:
+                self._last_error = f"{type(e).__name__}: {e}"
+                self._failed_fingerprint = fingerprint
+                print(f"[ERROR] Failed to build campus graph from {self.data_dir}: {e}")
+                traceback.print_exc()
+                raise
+            finally:
+                self._rebuilding = False
+
+            snapshot = GraphVersion(
+                graph=graph,
+                version=self._next_version,
+                built_at=datetime.now(timezone.utc),
+                build_seconds=build_seconds,
+                fingerprint=fingerprint,
+                size_bytes=graph.estimated_bytes(),
+            )
+            self._next_version += 1
+            self._last_error = None
+            self._failed_fingerprint = None
+
+            # single reference assignment, so readers see either the old or the new snapshot
+            self._active = snapshot
+            print(f"[INFO] Campus graph version {snapshot.version} active ({build_seconds:.2f}s build, {self.data_dir})")
+            return snapshot
+
+    def unload(self):
+        """
+        Drops the resident version. Requests still holding the snapshot keep working,
+        the memory is released once they finish. The next access builds a fresh version.
+        """
+        with self._build_lock:
+            self._active = None
+
+    def check_for_changes(self) -> bool:
+        """
+        Rebuilds the graph if the source files changed since the active version was built.
+        Unloaded graphs are not rebuilt (they are loaded fresh on next use anyway).
+        Returns True if a new version was swapped in.
+        """
+        active = self._active
+        if active is None or self._build_lock.locked():
+            return False
+        fingerprint = source_fingerprint(self.data_dir)
+        if fingerprint == active.fingerprint or fingerprint == self._failed_fingerprint:
+            return False
+        print(f"[INFO] Campus graph source files changed in {self.data_dir}, rebuilding")
+        try:
+            return self.rebuild(only_if_changed=True) is not active
+        except Exception:
+            return False  # keep serving the previous version, retry on the next change
+
+
+class CampusRegistry:
+
+    # ------
+    # Graphs for several campuses, keyed by campus id
+    # Each campus is loaded lazily from its own directory on first use. Loaded campuses are kept in
+    # least-recently-used order and evicted when their estimated memory exceeds the budget or when idle,
+    # so campuses nobody is using do not keep their all-pairs data resident
+    # ------
+    def __init__(self, default_campus_id: str = DEFAULT_CAMPUS_ID, campus_root: str = CAMPUS_GRAPH_ROOT,
+                 memory_budget_mb: float = GRAPH_MEMORY_BUDGET_MB, idle_evict_seconds: float = GRAPH_IDLE_EVICT_SECONDS,
+                 poll_interval: float = RELOAD_POLL_SECONDS):
+        self.default_campus_id = default_campus_id
+        self.campus_root = campus_root
+        self.memory_budget_bytes = int(memory_budget_mb * 2**20)
+        self.idle_evict_seconds = idle_evict_seconds
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()  # guards _campuses
+        self._campuses: "OrderedDict[str, GraphRegistry]" = OrderedDict()  # least recently used first
+        self._extra_dirs = {default_campus_id: DEFAULT_GRAPH_DIR}  # campuses registered outside campus_root
+
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watcher = threading.Event()
+
+    # ------
+    # Campus lookup
+    # ------
+    def register(self, campus_id: str, data_dir: str):
+        """Registers a campus whose data lives outside campus_root (e.g. generated test data)."""
+        if not CAMPUS_ID_PATTERN.match(campus_id):
+            raise ValueError(f"Invalid campus id: {campus_id!r}")
+        with self._lock:
+            self._extra_dirs[campus_id] = data_dir
+            self._campuses.pop(campus_id, None)
+
+    def campus_dir(self, campus_id: str) -> str:
+        """Returns the data directory of a campus, raising UnknownCampusError if it has no graph data."""
+        if campus_id in self._extra_dirs:
+            return self._extra_dirs[campus_id]
+        if CAMPUS_ID_PATTERN.match(campus_id or ""):
+            data_dir = os.path.join(self.campus_root, campus_id)
+            if os.path.isfile(os.path.join(data_dir, "campus.dot")):
+                return data_dir
+        raise UnknownCampusError(campus_id)
+
+    def campus_ids(self) -> list[str]:
+        """Returns all campus ids with graph data on disk."""
+        ids = set(self._extra_dirs)
+        if os.path.isdir(self.campus_root):
+            for name in os.listdir(self.campus_root):
+                if CAMPUS_ID_PATTERN.match(name) and os.path.isfile(os.path.join(self.campus_root, name, "campus.dot")):
+                    ids.add(name)
+        return sorted(ids)
+
+    def _registry(self, campus_id: str) -> GraphRegistry:
+        with self._lock:
+            registry = self._campuses.get(campus_id)
+            if registry is None:
+                registry = GraphRegistry(self.campus_dir(campus_id))
+                self._campuses[campus_id] = registry
+            self._campuses.move_to_end(campus_id)  # mark as most recently used
+            return registry
+
+    # ------
+    # Access
+    # ------
+    def current(self, campus_id: str = None) -> GraphVersion:
+        """Returns the active graph snapshot for a campus, loading it if needed."""
+        campus_id = campus_id or self.default_campus_id
+        registry = self._registry(campus_id)
+        was_loaded = registry.is_loaded()
+        snapshot = registry.current()
+        if not was_loaded:
+            self._enforce_budget(keep=campus_id)
+        return snapshot
+
+    def get(self, campus_id: str = None) -> CampusGraph:
+        """Returns the active CampusGraph of a campus (default campus if not given)."""
+        return self.current(campus_id).graph
+
+    def is_loaded(self, campus_id: str = None) -> bool:
+        """True while the campus has a resident graph version."""
+        registry = self._campuses.get(campus_id or self.default_campus_id)
+        return registry is not None and registry.is_loaded()
+
+    def info(self, campus_id: str = None) -> dict:
+        """Returns version/build metadata of one campus without loading it."""
+        campus_id = campus_id or self.default_campus_id
+        registry = self._campuses.get(campus_id) or GraphRegistry(self.campus_dir(campus_id))
+        return {"campus_id": campus_id, **registry.info()}
+
+    def memory_info(self) -> dict:
+        """Returns the estimated memory of every loaded campus and the configured budget."""
+        with self._lock:
+            loaded = {campus_id: r.size_bytes() for campus_id, r in self._campuses.items() if r.is_loaded()}
+        return {
+            "budget_mb": round(self.memory_budget_bytes / 2**20, 2),
+            "used_mb": round(sum(loaded.values()) / 2**20, 2),
+            "loaded": {campus_id: round(size / 2**20, 2) for campus_id, size in loaded.items()},
+        }
+
+    def warm_up_in_background(self, campus_id: str = None, on_ready: Callable[[GraphVersion], None] = None) -> threading.Thread:
+        """
+        Loads a campus graph on a background thread so the app can accept requests while it builds.
+        Requests that need the graph before it is ready wait for this build instead of starting another one.
+        on_ready: optional callback receiving the loaded snapshot
+        """
+        def _run():
+            try:
+                snapshot = self.current(campus_id)
+                if on_ready:
+                    on_ready(snapshot)
+            except Exception:
+                pass  # already logged in rebuild(), the next request retries the build
+
+        thread = threading.Thread(target=_run, name="graph-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def reload_in_background(self, campus_id: str = None) -> bool:
+        """
+        Starts a rebuild of one campus on a background thread and returns immediately.
+        Returns False if a rebuild of that campus is already running.
+        """
+        campus_id = campus_id or self.default_campus_id
+        registry = self._registry(campus_id)
+        if registry._build_lock.locked():
+            return False
+
+        def _run():
+            try:
+                registry.rebuild()
+                self._enforce_budget(keep=campus_id)
+            except Exception:
+                pass  # already logged in rebuild(), the old version stays active
+
+        threading.Thread(target=_run, name=f"graph-rebuild-{campus_id}", daemon=True).start()
+        return True
+
+    # ------
+    # Eviction
+    # ------
+    def _enforce_budget(self, keep: str = None):
+        """
+        Unloads least recently used campuses until the loaded ones fit in the memory budget.
+        The default campus (readiness depends on it) and keep (the campus just loaded) are never unloaded.
+        """
+        with self._lock:
+            loaded = [(campus_id, r) for campus_id, r in self._campuses.items() if r.is_loaded()]
+            used = sum(r.size_bytes() for _, r in loaded)
+            for campus_id, registry in loaded:  # oldest first
+                if used <= self.memory_budget_bytes:
+                    break
+                if campus_id == keep or campus_id == self.default_campus_id:
+                    continue
+                used -= registry.size_bytes()
+                registry.unload()
+                print(f"[INFO] Evicted campus graph '{campus_id}' to stay within {self.memory_budget_bytes / 2**20:.0f} MB")
+
+    def evict_idle(self):
+        """Unloads campuses (except the default one) that have not been used for idle_evict_seconds."""
+        if self.idle_evict_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for campus_id, registry in self._campuses.items():
+                if campus_id == self.default_campus_id or not registry.is_loaded():
+                    continue
+                if now - registry.last_used > self.idle_evict_seconds:
+                    registry.unload()
+                    print(f"[INFO] Evicted idle campus graph '{campus_id}'")
+
+    # ------
+    # Background watcher: hot reload of changed source files and idle eviction
+    # ------
+    def start_watcher(self):
+        """Starts a daemon thread that rebuilds changed campuses and evicts idle ones."""
+        if self.poll_interval <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+        self._stop_watcher.clear()
+        self._watcher = threading.Thread(target=self._watch, name="graph-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        """Stops the watcher thread (if running)."""
+        self._stop_watcher.set()
+        if self._watcher:
+            self._watcher.join(timeout=self.poll_interval + 1)
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop_watcher.wait(self.poll_interval):
+            with self._lock:
+                registries = list(self._campuses.items())
+            for campus_id, registry in registries:
+                if registry.check_for_changes():
+                    self._enforce_budget(keep=campus_id)
+            self.evict_idle()
+
+
+# shared registry used by main.py and all routes
+graph_registry = CampusRegistry()
@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from typing import NamedTuple
+
+# ------
+# Short-lived in-memory cache of group roles (creator and member ids) used for authorization checks
+# Group routes look up whether the requesting user is the creator or a member here instead of querying
+# the database on every request. Entries expire after GROUP_ROLE_CACHE_SECONDS and are dropped right away
+# by the write routes that change membership in this process (other workers see the change after the TTL)
+# ------
+GROUP_ROLE_CACHE_SECONDS = float(os.getenv("GROUP_ROLE_CACHE_SECONDS", "30"))
+
+# upper bound on cached groups; the whole cache is cleared when it is reached
+GROUP_ROLE_CACHE_SIZE = int(os.getenv("GROUP_ROLE_CACHE_SIZE", "10000"))
+
+
+class GroupRoles(NamedTuple):
+    creator_id: int
+    member_ids: frozenset
+
+    def role(self, user_id: int):
+        """Returns "creator", "member" or None for user_id."""
+        if user_id == self.creator_id:
+            return "creator"
+        if user_id in self.member_ids:
+            return "member"
+        return None
+
+
+def load_group_roles(cursor, group_id: int):
+    """Reads the group's creator and members, None if the group doesn't exist."""
+    cursor.execute("SELECT creator_user_id FROM Groups WHERE group_id = ?", group_id)
+    row = cursor.fetchone()
+    if not row:
+        return None
+    cursor.execute("SELECT user_id FROM GroupMemberships WHERE group_id = ?", group_id)
+    return GroupRoles(row[0], frozenset(member_row[0] for member_row in cursor.fetchall()))
+
+
+class GroupRoleCache:
+
+    # ------
+    # group_id -> (expires_at, GroupRoles); missing groups are never cached
+    # ------
+    def __init__(self, ttl_seconds: float = GROUP_ROLE_CACHE_SECONDS, max_size: int = GROUP_ROLE_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, group_id: int, get_connection):
+        """
+        Returns the GroupRoles for group_id (None if the group doesn't exist), loading them with a
+        connection from get_connection() only when there is no fresh cached entry.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(group_id)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        conn = get_connection()
+        try:
+            roles = load_group_roles(conn.cursor(), group_id)
+        finally:
+            conn.close()
+
+        if roles is not None:
+            with self._lock:
+                if len(self._entries) >= self.max_size:
+                    self._entries.clear()
+                self._entries[group_id] = (now + self.ttl_seconds, roles)
+        return roles
+
+    def invalidate(self, *group_ids):
+        """Drops the cached roles of group_ids (call after committing a membership change)."""
+        with self._lock:
+            for group_id in group_ids:
+                self._entries.pop(group_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"cached_groups": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl_seconds": self.ttl_seconds}
+
+
+# shared cache used by the group routes
+group_roles = GroupRoleCache()
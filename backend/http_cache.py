@@ -0,0 +1,102 @@
+import hashlib
+import os
+import threading
+import uuid
+from collections import defaultdict
+from fastapi import Request
+from fastapi.responses import Response
+from fastjson import dumps
+
+# ------
+# ETag / conditional GET support
+# Read endpoints send a strong ETag; when the client sends it back in If-None-Match and nothing changed,
+# the route answers 304 Not Modified with an empty body. ETags come either from in-process data versions
+# (checked before touching the database) or from a hash of the response body (after the query)
+# ------
+
+# static graph data: cacheable by browsers/proxies for a while, then revalidated with the ETag
+GRAPH_CACHE_CONTROL = "public, max-age=300"
+
+# per-user data: only the user's browser may cache it and it must revalidate on every use
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+# Local data versions are only bumped by writes handled in this process. With several workers a write on
+# another worker would not be seen and its readers would get stale 304s, and the worker count can't be detected
+# reliably (uvicorn --workers / gunicorn -w don't set WEB_CONCURRENCY), so they are opt-in: set this to 1 only
+# for deployments that run a single worker process. By default ETags are hashed from the response body
+TRUST_LOCAL_VERSIONS = os.getenv("ETAG_TRUST_LOCAL_VERSIONS", "0").lower() in ("1", "true", "yes")
+
+
+class DataVersions:
+
+    # ------
+    # Per-key version counters for data behind cached read endpoints, e.g. ("schedule", user_id)
+    # Write routes bump the keys they change; read routes derive their ETag from the current version
+    # A random epoch per process makes ETags from before a restart never match
+    # ------
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = defaultdict(int)
+        self.epoch = uuid.uuid4().hex[:12]
+
+    def bump(self, kind: str, *ids):
+        """Marks the data of kind for each of ids as changed."""
+        with self._lock:
+            for key_id in ids:
+                self._versions[(kind, int(key_id))] += 1
+
+    def version(self, kind: str, key_id) -> int:
+        return self._versions.get((kind, int(key_id)), 0)
+
+    def etag(self, kind: str, key_id):
+        """
+        Returns the ETag for the current version of (kind, key_id), or None if local versions
+        are not trusted (the caller then falls back to a hash of the response body).
+        """
+        if not TRUST_LOCAL_VERSIONS:
+            return None
+        return f'"{kind}-{key_id}-{self.epoch}-{self.version(kind, key_id)}"'
+
+
+# shared version table used by the read and write routes
+data_versions = DataVersions()
+
+
+def hash_etag(*parts) -> str:
+    """Strong ETag from a hash of the given parts (bytes or anything with a stable str())."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header contains etag (or *)."""
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]  # weak comparison is fine for GET revalidation
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """304 response carrying the validators the client should keep using."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def conditional_json_response(request: Request, content, cache_control: str, etag: str = None) -> Response:
+    """
+    Serializes content and returns it with an ETag and Cache-Control header,
+    or a 304 if the client already has this version. Without an etag, one is hashed from the body.
+    """
+    body = dumps(content)
+    etag = etag or hash_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag, "Cache-Control": cache_control})
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Callable
+from fastapi.concurrency import run_in_threadpool
+
+# ------
+# Live push of recomputed meeting suggestions
+# Clients subscribe to a group's best meeting times (one subscription per group, day, duration and campus,
+# shared by every socket that asks for the same thing). Write routes mark the groups they affect as dirty;
+# marks are debounced per group, so a burst of schedule edits collapses into one recomputation, and only
+# subscriptions whose result actually changed are pushed. Dirty marks are local to this process, so with
+# several workers a subscriber only sees edits handled by its own worker (like the local data versions)
+# ------
+
+# quiet period after the last edit before a dirty group is recomputed, in seconds
+LIVE_UPDATE_DEBOUNCE_SECONDS = float(os.getenv("LIVE_UPDATE_DEBOUNCE_SECONDS", "0.5"))
+
+# a group that keeps getting edited is still recomputed at least this often, in seconds
+LIVE_UPDATE_MAX_DELAY_SECONDS = float(os.getenv("LIVE_UPDATE_MAX_DELAY_SECONDS", "3"))
+
+# day value for marks that affect every day of a group (membership changes)
+ALL_DAYS = None
+
+
+class Subscription:
+
+    # ------
+    # One live result: how to compute it, its last pushed body and the queues of the sockets watching it
+    # ------
+    def __init__(self, key: tuple, day_of_week: int, compute: Callable[[], bytes]):
+        self.key = key
+        self.day_of_week = day_of_week
+        self.compute = compute
+        self.queues = set()
+        self.last_body = None
+
+
+class LiveUpdates:
+
+    # ------
+    # Subscriptions by group, debounced dirty marks and the recompute/push loop (runs on the server's event loop)
+    # ------
+    def __init__(self, debounce_seconds: float = LIVE_UPDATE_DEBOUNCE_SECONDS, max_delay_seconds: float = LIVE_UPDATE_MAX_DELAY_SECONDS):
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._loop = None
+        self._lock = threading.Lock()  # guards _subscriptions for the request threads calling watching()
+        self._subscriptions = {}  # group_id -> {key: Subscription}
+        self._dirty = {}  # group_id -> set of days (ALL_DAYS in the set means every day)
+        self._first_marked = {}  # group_id -> monotonic time of the oldest pending mark
+        self._timers = {}  # group_id -> asyncio.TimerHandle of the pending recompute
+        self._recomputing = set()
+        self._marks = 0
+        self._recomputes = 0
+        self._pushes = 0
+
+    # --- subscribers (event loop) ---
+
+    async def subscribe(self, group_id: int, key: tuple, day_of_week: int, compute: Callable[[], bytes]):
+        """
+        Registers a socket's interest in the result identified by key (compute() returns its serialized body).
+        Returns (subscription, queue); the current result is put on the queue right away, later ones when they change.
+        If the first compute() raises, nothing stays registered and the exception is passed on.
+        """
+        self._loop = asyncio.get_running_loop()
+        with self._lock:
+            group_subscriptions = self._subscriptions.setdefault(group_id, {})
+            subscription = group_subscriptions.get(key)
+            if subscription is None:
+                subscription = group_subscriptions[key] = Subscription(key, day_of_week, compute)
+            queue = asyncio.Queue(maxsize=1)
+            subscription.queues.add(queue)
+
+        try:
+            if subscription.last_body is None:
+                subscription.last_body = await run_in_threadpool(subscription.compute)
+        except BaseException:
+            # the caller never gets the queue to unsubscribe with, so don't leave it (or an empty subscription) behind
+            self.unsubscribe(group_id, subscription, queue)
+            raise
+        queue.put_nowait(subscription.last_body)
+        return subscription, queue
+
+    def unsubscribe(self, group_id: int, subscription: Subscription, queue: asyncio.Queue):
+        with self._lock:
+            subscription.queues.discard(queue)
+            group_subscriptions = self._subscriptions.get(group_id, {})
+            if not subscription.queues and group_subscriptions.get(subscription.key) is subscription:
+                del group_subscriptions[subscription.key]
+            if not group_subscriptions:
+                self._subscriptions.pop(group_id, None)
+
+    # --- write routes (any thread) ---
+
+    def watching(self, group_ids=None) -> list[int]:
+        """Group ids among group_ids (or all) that have subscribers, so routes can skip extra queries when nobody listens."""
+        with self._lock:
+            if group_ids is None:
+                return list(self._subscriptions)
+            return [group_id for group_id in group_ids if group_id in self._subscriptions]
+
+    def mark_dirty(self, group_ids, day_of_week=ALL_DAYS):
+        """Marks the groups' results for day_of_week (or every day) as changed; safe to call from request threads."""
+        group_ids = self.watching(group_ids)
+        if not group_ids or self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._mark, group_ids, day_of_week)
+
+    # --- debounce and recompute (event loop) ---
+
+    def _mark(self, group_ids: list[int], day_of_week):
+        now = time.monotonic()
+        for group_id in group_ids:
+            self._marks += 1
+            self._dirty.setdefault(group_id, set()).add(day_of_week)
+            first_marked = self._first_marked.setdefault(group_id, now)
+            # wait for a quiet period, but never longer than max_delay after the first pending mark
+            delay = min(self.debounce_seconds, max(0.0, first_marked + self.max_delay_seconds - now))
+            timer = self._timers.pop(group_id, None)
+            if timer is not None:
+                timer.cancel()
+            self._timers[group_id] = self._loop.call_later(delay, self._start_recompute, group_id)
+
+    def _start_recompute(self, group_id: int):
+        self._timers.pop(group_id, None)
+        if group_id in self._recomputing:
+            # a recompute is still running: try again after it has had time to finish
+            self._timers[group_id] = self._loop.call_later(self.debounce_seconds, self._start_recompute, group_id)
+            return
+        days = self._dirty.pop(group_id, set())
+        self._first_marked.pop(group_id, None)
+        self._recomputing.add(group_id)
+        self._loop.create_task(self._recompute(group_id, days))
+
+    async def _recompute(self, group_id: int, days: set):
+        try:
+            with self._lock:
+                subscriptions = [
+                    subscription for subscription in self._subscriptions.get(group_id, {}).values()
+                    if ALL_DAYS in days or subscription.day_of_week in days
+                ]
+            for subscription in subscriptions:
+                try:
+                    body = await run_in_threadpool(subscription.compute)
+                except Exception as e:
+                    print(f"[WARNING] Live recompute for group {group_id} failed: {e}")
+                    continue
+                self._recomputes += 1
+                if body == subscription.last_body:
+                    continue
+                subscription.last_body = body
+                for queue in list(subscription.queues):
+                    if queue.full():  # the socket hasn't sent the previous result yet, only the newest one matters
+                        queue.get_nowait()
+                    queue.put_nowait(body)
+                    self._pushes += 1
+            print(f"[DEBUG] Live recompute for group {group_id}: {len(subscriptions)} subscriptions, days {sorted(days, key=str)}")
+        finally:
+            self._recomputing.discard(group_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscriptions = [subscription for group in self._subscriptions.values() for subscription in group.values()]
+        return {
+            "groups": len(self._subscriptions),
+            "subscriptions": len(subscriptions),
+            "sockets": sum(len(subscription.queues) for subscription in subscriptions),
+            "dirty_marks": self._marks,
+            "recomputes": self._recomputes,
+            "pushes": self._pushes,
+        }
+
+
+# shared live update hub used by the write routes and the live endpoint
+live_updates = LiveUpdates()
@@ -1,11 +1,52 @@
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+import time
+PROCESS_START = time.monotonic()  # taken before the heavier imports below, used to report startup timings
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from database import get_db_connection
-from graph.graph_utils import CampusGraph # import the graph utilities to initialize the campus graph 
+from graph.registry import graph_registry # shared, versioned holder of the campus graph
+from meeting_pool import meeting_pool # process pool for the meeting algorithm
+from auth import password_hasher # dedicated executor for Argon2 hashing
+from group_roles import group_roles # cached group authorization lookups
+from capture import request_capture # opt-in request capture for replay
+from live_updates import live_updates # live meeting-time subscriptions
+from admission import AdmissionControl, admission_stats # concurrency/queue limits and deadlines for expensive routes
+
+# seconds since process start at which each startup milestone was reached (None until it happens)
+startup_timings = {"app_ready": None, "graph_ready": None, "first_request": None}
+
+def _seconds_since_start() -> float:
+    return round(time.monotonic() - PROCESS_START, 3)
+
+def _on_graph_ready(snapshot):
+    startup_timings["graph_ready"] = _seconds_since_start()
+    print(f"[INFO] Campus graph ready {startup_timings['graph_ready']}s after process start")
+    meeting_pool.start(snapshot)  # start the meeting workers with the graph preloaded
+
+# load the campus graph in the background when the application starts, so workers accept requests right away
+# the registry keeps one shared instance for all graph-related queries and rebuilds it in the background
+# whenever campus.dot or nodes.csv change, so updating the graph data no longer needs a redeploy
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    graph_registry.warm_up_in_background(on_ready=_on_graph_ready)
+    graph_registry.start_watcher()
+    startup_timings["app_ready"] = _seconds_since_start()
+    print(f"[INFO] Gatherly API accepting requests {startup_timings['app_ready']}s after process start")
+    yield
+    graph_registry.stop_watcher()
+    meeting_pool.shutdown()
+    password_hasher.shutdown()
+    request_capture.close()
 
 # create the main FastAPI application instance
-app = FastAPI(title = "Gatherly API")
+app = FastAPI(title = "Gatherly API", lifespan=lifespan)
+
+# admission control for /algorithm: bounded concurrency and queue (fast 429/503 with Retry-After when full)
+# and a per-request deadline; added before CORS so rejections still carry the CORS headers
+app.add_middleware(AdmissionControl)
 
 # Add CORS middleware to allow frontend to communicate with backend
 app.add_middleware(
@@ -14,11 +55,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "X-Gatherly-Partial"],  # let the frontend see load shedding and partial results
 )
 
-# load the campus graph when the application starts
-# can be used effeciently for all graph-related queries without needing to reload or recompute paths each time
-campus_graph = CampusGraph()
+# compress larger responses (algorithm results with paths) for clients that send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+# record when the first request was served (time-to-first-request after a worker restart)
+@app.middleware("http")
+async def record_first_request(request: Request, call_next):
+    response = await call_next(request)
+    if startup_timings["first_request"] is None:
+        startup_timings["first_request"] = _seconds_since_start()
+        print(f"[INFO] First request served {startup_timings['first_request']}s after process start")
+    return response
+
+# opt-in capture of anonymized /algorithm and /schedule requests for local replay (set REQUEST_CAPTURE_DIR)
+if request_capture.enabled:
+    app.middleware("http")(request_capture.middleware)
 
 # include the routers for different API endpoints
 # this allows us to organize our API endpoints into separate modules (users, groups, schedule, algorithm) while still having them all accessible under the main FastAPI application
@@ -42,6 +96,46 @@ async def root():
     </html>
     """
 
+# ------
+# Liveness: the process is up and serving, never touches the graph or the database
+# GET /healthz
+# ------
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+# ------
+# Readiness: 200 once the default campus graph is loaded, 503 while it is still warming up
+# GET /readyz
+# ------
+@app.get("/readyz")
+async def readyz():
+    ready = graph_registry.is_loaded()
+    body = {
+        "status": "ready" if ready else "warming_up",
+        "graph": graph_registry.info(),
+        "startup_seconds": startup_timings,
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+# ------
+# Runtime stats for load tests and monitoring: password hasher throughput/queueing,
+# campus graph memory, in-flight meeting computations, group role cache hit rate, live subscriptions
+# and admission control (queueing, rejections, partial responses)
+# GET /stats
+# ------
+@app.get("/stats")
+async def stats():
+    return {
+        "password_hasher": password_hasher.stats(),
+        "graph_memory": graph_registry.memory_info(),
+        "meeting_requests_in_flight": algorithm.meeting_requests.in_flight(),
+        "group_role_cache": group_roles.stats(),
+        "live_updates": live_updates.stats(),
+        "admission": admission_stats(),
+        "uptime_seconds": _seconds_since_start(),
+    }
+
 @app.get("/db-test", response_class=HTMLResponse)
 def test_db():
     try:
@@ -0,0 +1,519 @@
+import heapq
+import math
+import time
+from bisect import bisect_right
+from graph.graph_utils import CampusGraph
+from graph.polyline import encode_polyline
+from fastjson import dumps
+
+# ------
+# Core meeting-time computation, shared by the algorithm routes and the worker processes
+# Everything here works on plain Python data (no database, no Pydantic) so it can run in a
+# separate process and its results can be pickled back to the request thread
+# ------
+
+# the schedulable day runs from 7 AM (0 seconds) to 7 PM
+DAY_START = 0
+DAY_END = 12 * 3600
+
+# Helper function to convert seconds past 7:00 am to "HH:MM" format
+def seconds_to_hhmm(seconds):
+    # Convert seconds past 7:00 am to total seconds from midnight
+    total_seconds = seconds + 7 * 3600
+    # floor division to get hours
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    return f"{hours:02d}:{minutes:02d}"
+
+# --------
+# Helper function: intervals of the day where every user is free
+# user_busy_slots: {user_id: {"home_location", "name", "slots_with_names": [(start, end, location, name), ...]}}
+# with each user's slots sorted by start time
+# --------
+def compute_free_intervals(user_busy_slots: dict) -> list[tuple[int, int]]:
+    free_intervals = [(DAY_START, DAY_END)]
+
+    # --- Subtract each user's busy slots from the current free intervals ---
+    for user_id, info in user_busy_slots.items():
+        next_free = []
+        user_slots = info["slots_with_names"]
+
+        for free_start, free_end in free_intervals:
+            curr_start = free_start
+            for busy_start, busy_end, _loc, _name in user_slots:
+                if busy_end <= curr_start:
+                    continue  # busy slot ends before free interval starts
+                if busy_start >= free_end:
+                    break  # busy slot starts after free interval ends
+                if curr_start < busy_start:
+                    next_free.append((curr_start, busy_start))  # free interval before busy slot
+                curr_start = max(curr_start, busy_end)  # move current start past busy slot
+            if curr_start < free_end:
+                next_free.append((curr_start, free_end))  # remaining free interval
+        free_intervals = next_free  # update free intervals for next user
+
+    return free_intervals
+
+# --------
+# Helper function: each user's last known location before a given time (home location if none)
+# --------
+def user_start_locations(user_busy_slots: dict, start: int) -> list[str]:
+    user_starts = []
+    for user_id, info in user_busy_slots.items():
+        last_loc = info["home_location"]
+        for busy_start, busy_end, loc, _name in info["slots_with_names"]:
+            if busy_end <= start:
+                last_loc = loc
+            else:
+                break
+        user_starts.append(last_loc)
+    return user_starts
+
+# --------
+# Compute the meeting slot (optimal building + each user's walk) for one free interval
+# Returns the slot as a dict matching CommonSlotWithLocationsWithName, or None if the interval
+# is too short for the meeting plus the longest walk
+# with_paths=False stores each user's path as already serialized JSON ("path_json", from the graph's
+# path cache) instead of a list of dicts, for callers that write the response bytes directly
+# --------
+def compute_interval_slot(campus_graph: CampusGraph, user_busy_slots: dict, start: int, end: int,
+                          meeting_duration: int, candidate_buildings: list[str], with_paths: bool = True):
+    user_starts = user_start_locations(user_busy_slots, start)
+
+    # Find best meeting building based on fairness of travel times
+    best_buildings = campus_graph.best_meeting_building(user_starts, candidate_buildings=candidate_buildings)
+    if not best_buildings:
+        print(f"[DEBUG] No best building found for user_starts: {user_starts}, skipping")
+        return None
+
+    top_building, _ = best_buildings[0]
+
+    # Compute individual walking times and track max walk
+    walking_times = []
+    max_walk = 0
+    for (user_id, info), loc in zip(user_busy_slots.items(), user_starts):
+        try:
+            walk_time = campus_graph.get_shortest_time(loc, top_building)
+
+            # Only include if walk time is valid (not infinity)
+            if walk_time == float('inf'):
+                print(f"[WARNING] No path found from {loc} to {top_building}, using 0 walk time")
+                walk_time = 0
+
+            user_location = {
+                "user_id": user_id,
+                "name": info["name"],
+                "location": loc,
+                "walk_time": int(walk_time),
+            }
+            if with_paths:
+                user_location["path"] = campus_graph.get_shortest_path_with_coords(loc, top_building)
+            else:
+                user_location["path_json"] = campus_graph.get_path_json(loc, top_building)
+            walking_times.append(user_location)
+            if walk_time > max_walk:
+                max_walk = walk_time
+        except Exception as e:
+            print(f"[WARNING] Failed to compute walking time for user {user_id} from {loc}: {e}")
+            # Add user with 0 walk time as fallback
+            walking_times.append({
+                "user_id": user_id,
+                "name": info["name"],
+                "location": loc,
+                "walk_time": 0,
+                "path": [],
+            })
+
+    available_time = end - start
+    required_time = meeting_duration * 60 + max_walk
+    print(f"[DEBUG] Interval {start}-{end} ({seconds_to_hhmm(start)}-{seconds_to_hhmm(end)}): available={available_time}s, required={required_time}s (duration={meeting_duration*60}s + max_walk={max_walk}s)")
+
+    # Only a candidate slot if there is enough time for meeting + max walk
+    if available_time < required_time:
+        return None
+
+    return {
+        "start_seconds": start,
+        "end_seconds": end,
+        "start_hhmm": seconds_to_hhmm(start),
+        "end_hhmm": seconds_to_hhmm(end),
+        "meeting_location": top_building,
+        "user_locations": walking_times,
+    }
+
+# --------
+# Yield the candidate meeting slots for a group on one day, one free interval at a time
+# Each slot is yielded as soon as it is computed, so callers can stream results before the
+# slowest interval is done (and stop early by closing the generator)
+# With a deadline (a time.time() timestamp, so it means the same in the worker processes) the remaining
+# intervals are skipped once it has passed; the generator then returns False (True when every interval was computed)
+# Only buildings of the given venue_types (node categories) are scored, by default the campus' meeting venues
+# --------
+def iter_meeting_slots(campus_graph: CampusGraph, user_busy_slots: dict, meeting_duration: int, with_paths: bool = True,
+                       deadline: float = None, venue_types: tuple = None):
+    free_intervals = compute_free_intervals(user_busy_slots)
+    print(f"[DEBUG] Final free_intervals before candidate processing: {free_intervals}")
+
+    all_buildings = campus_graph.meeting_candidates(venue_types)  # precomputed candidate buildings
+    for interval_index, (start, end) in enumerate(free_intervals):
+        if deadline is not None and time.time() >= deadline:
+            print(f"[WARNING] Meeting computation ran out of time after {interval_index} of {len(free_intervals)} free intervals")
+            return False
+        try:
+            slot = compute_interval_slot(campus_graph, user_busy_slots, start, end, meeting_duration, all_buildings, with_paths)
+        except Exception as e:
+            print(f"[ERROR] Error processing free interval {start}-{end}: {e}")
+            import traceback
+            traceback.print_exc()
+            continue
+        if slot is not None:
+            yield slot
+    return True
+
+# --------
+# Compute all candidate meeting slots for a group on one day
+# Returns a list of slot dicts matching CommonSlotWithLocationsWithName
+# --------
+def compute_meeting_slots(campus_graph: CampusGraph, user_busy_slots: dict, meeting_duration: int, venue_types: tuple = None) -> list[dict]:
+    candidate_slots = list(iter_meeting_slots(campus_graph, user_busy_slots, meeting_duration, venue_types=venue_types))
+    print(f"[DEBUG] Final candidate_slots count: {len(candidate_slots)}")
+    return candidate_slots
+
+# --------
+# Serialize a best_meeting_times response straight to JSON bytes
+# Produces exactly the GroupFreeTimesResponseWithName layout (same field order as the schema) without
+# building a Pydantic model per node; serialized paths ("path_json") are copied in as they are
+# --------
+def render_meeting_times_json(day_of_week: int, slots) -> bytes:
+    parts = [b'{"day_of_week":', dumps(day_of_week), b',"slots":[']
+    for slot_index, slot in enumerate(slots):
+        if slot_index:
+            parts.append(b',')
+        parts += [
+            b'{"start_seconds":', dumps(slot["start_seconds"]),
+            b',"end_seconds":', dumps(slot["end_seconds"]),
+            b',"start_hhmm":', dumps(slot["start_hhmm"]),
+            b',"end_hhmm":', dumps(slot["end_hhmm"]),
+            b',"meeting_location":', dumps(slot["meeting_location"]),
+            b',"user_locations":[',
+        ]
+        for user_index, user_location in enumerate(slot["user_locations"]):
+            if user_index:
+                parts.append(b',')
+            path_json = user_location.get("path_json") or dumps(user_location["path"])
+            parts += [
+                b'{"user_id":', dumps(user_location["user_id"]),
+                b',"name":', dumps(user_location["name"]),
+                b',"location":', dumps(user_location["location"]),
+                b',"walk_time":', dumps(user_location["walk_time"]),
+                b',"path":', path_json, b'}',
+            ]
+        parts.append(b']}')
+    parts.append(b']}')
+    return b''.join(parts)
+
+# --------
+# Compute all candidate meeting slots and return the serialized best_meeting_times response
+# (runs in the worker process, so only the finished bytes are sent back to the request thread)
+# --------
+def compute_meeting_times_json(campus_graph: CampusGraph, user_busy_slots: dict, meeting_duration: int, day_of_week: int,
+                               venue_types: tuple = None) -> bytes:
+    return compute_meeting_times_json_within(campus_graph, user_busy_slots, meeting_duration, day_of_week, None, venue_types)[0]
+
+# --------
+# Same as compute_meeting_times_json, but stops scoring free intervals once deadline (time.time()) has passed
+# Returns (body, complete); complete is False if the body only holds the slots computed before the deadline
+# --------
+def compute_meeting_times_json_within(campus_graph: CampusGraph, user_busy_slots: dict, meeting_duration: int, day_of_week: int,
+                                      deadline: float = None, venue_types: tuple = None) -> tuple[bytes, bool]:
+    slots = []
+    candidates = iter_meeting_slots(campus_graph, user_busy_slots, meeting_duration, with_paths=False, deadline=deadline, venue_types=venue_types)
+    while True:
+        try:
+            slots.append(next(candidates))
+        except StopIteration as finished:
+            complete = finished.value
+            break
+    print(f"[DEBUG] Final candidate_slots count: {len(slots)}{'' if complete else ' (partial, out of time)'}")
+    return render_meeting_times_json(day_of_week, slots), complete
+
+# --------
+# Convert full slots into the compact response layout
+# Every distinct path is stored once (slots refer to it by path_id), member names are sent once,
+# and path geometry is either node indices into a shared coordinate table (geometry="nodes")
+# or node indices plus an encoded polyline (geometry="polyline")
+# Returns a dict matching GroupFreeTimesCompactResponse (without day_of_week)
+# --------
+def compact_meeting_slots(slots: list[dict], user_busy_slots: dict, geometry: str = "nodes") -> dict:
+    locations, location_ids, coords = [], {}, []
+    paths, path_ids = [], {}
+
+    def path_id_for(path: list[dict]) -> int:
+        key = tuple(node["location"] for node in path)
+        path_id = path_ids.get(key)
+        if path_id is None:
+            node_ids = []
+            for node in path:
+                location_id = location_ids.get(node["location"])
+                if location_id is None:
+                    location_id = len(locations)
+                    location_ids[node["location"]] = location_id
+                    locations.append(node["location"])
+                    coords.append([node["lat"], node["lon"]])
+                node_ids.append(location_id)
+            path_id = len(paths)
+            path_ids[key] = path_id
+            compact_path = {"path_id": path_id, "nodes": node_ids}
+            if geometry == "polyline":
+                compact_path["polyline"] = encode_polyline([(node["lat"], node["lon"]) for node in path])
+            paths.append(compact_path)
+        return path_id
+
+    compact_slots = []
+    for slot in slots:
+        compact_slots.append({
+            "start_seconds": slot["start_seconds"],
+            "end_seconds": slot["end_seconds"],
+            "start_hhmm": slot["start_hhmm"],
+            "end_hhmm": slot["end_hhmm"],
+            "meeting_location": slot["meeting_location"],
+            "user_locations": [
+                {
+                    "user_id": user_location["user_id"],
+                    "location": user_location["location"],
+                    "walk_time": user_location["walk_time"],
+                    "path_id": path_id_for(user_location["path"]),
+                }
+                for user_location in slot["user_locations"]
+            ],
+        })
+
+    return {
+        "geometry": geometry,
+        "members": [{"user_id": user_id, "name": info["name"]} for user_id, info in user_busy_slots.items()],
+        "locations": locations,
+        "coords": coords if geometry == "nodes" else None,
+        "paths": paths,
+        "slots": compact_slots,
+    }
+
+# --------
+# Compute all candidate meeting slots in the compact layout (runs in the worker process, so only the
+# compact structure has to be sent back to the request thread)
+# --------
+def compute_compact_meeting_slots(campus_graph: CampusGraph, user_busy_slots: dict, meeting_duration: int, geometry: str,
+                                  venue_types: tuple = None) -> dict:
+    slots = compute_meeting_slots(campus_graph, user_busy_slots, meeting_duration, venue_types)
+    return compact_meeting_slots(slots, user_busy_slots, geometry)
+
+# --------
+# Quorum mode: intervals where at least min_attendees members are free, for groups too large for everyone to be free
+# Each member's free intervals give the start times at which they could attend a window of the meeting's length;
+# a coverage-count sweep over those start intervals finds every run of start times with a constant set of
+# available members in O(S log S) for S busy slots in total, without looking at subsets of members
+# --------
+def member_free_intervals(slots_with_names: list) -> list[tuple[int, int]]:
+    """One member's free intervals within the day (their busy slots must be sorted by start)."""
+    free_intervals = []
+    curr_start = DAY_START
+    for busy_start, busy_end, _loc, _name in slots_with_names:
+        if curr_start < min(busy_start, DAY_END):
+            free_intervals.append((curr_start, min(busy_start, DAY_END)))
+        curr_start = max(curr_start, busy_end)
+        if curr_start >= DAY_END:
+            break
+    if curr_start < DAY_END:
+        free_intervals.append((curr_start, DAY_END))
+    return free_intervals
+
+def quorum_runs(free_by_member: dict, window_seconds: int, min_attendees: int) -> list[tuple[int, int, int]]:
+    """
+    Sweep over every member's feasible start times: a member can attend a window starting at t if one of
+    their free intervals [a, b] has a <= t and t + window_seconds <= b, i.e. t in [a, b - window_seconds].
+    Returns (run_start, run_end, attendee_count) for every run of start times [run_start, run_end) in which
+    the set of members who can attend doesn't change and has at least min_attendees members.
+    """
+    events = []
+    for free_intervals in free_by_member.values():
+        for free_start, free_end in free_intervals:
+            if free_end - free_start >= window_seconds:
+                events.append((free_start, 1))
+                events.append((free_end - window_seconds + 1, -1))  # first start that no longer fits
+    events.sort()
+
+    runs = []
+    count = 0
+    i = 0
+    while i < len(events):
+        event_time = events[i][0]
+        while i < len(events) and events[i][0] == event_time:
+            count += events[i][1]
+            i += 1
+        if i < len(events) and count >= min_attendees:
+            runs.append((event_time, events[i][0], count))
+    return runs
+
+def compute_quorum_meeting_slots(campus_graph: CampusGraph, user_busy_slots: dict, meeting_duration: int,
+                                 min_attendees: int, limit: int = 10, venue_types: tuple = None) -> list[dict]:
+    """
+    Returns up to limit meeting slots where at least min_attendees members are free, ranked by attendance
+    (then by length of the free window, then start time). Each slot is a CommonSlotWithLocationsWithName dict
+    for the attendees only (meeting building scored by fairness over the attendees) plus attendee_count and
+    absent_user_ids. Slots whose attendees and time are contained in a better-ranked slot are left out.
+    """
+    window_seconds = meeting_duration * 60
+    free_by_member = {user_id: member_free_intervals(info["slots_with_names"]) for user_id, info in user_busy_slots.items()}
+    free_starts = {user_id: [free_start for free_start, _free_end in intervals] for user_id, intervals in free_by_member.items()}
+
+    runs = quorum_runs(free_by_member, window_seconds, min_attendees)
+    runs.sort(key=lambda run: (-run[2], -(run[1] - run[0]), run[0]))
+    print(f"[DEBUG] Quorum sweep: {len(runs)} runs with at least {min_attendees} of {len(user_busy_slots)} members free")
+
+    all_buildings = campus_graph.meeting_candidates(venue_types)
+    slots, accepted, tried = [], [], set()
+    max_candidates = limit * 10  # bounds the scoring work when most candidates are too short once walking is added
+    for run_start, _run_end, _count in runs[:max_candidates]:
+        if len(slots) >= limit:
+            break
+
+        # members who can attend a meeting starting at run_start, and the window they are all free for
+        attendees = {}
+        common_start, common_end = DAY_START, DAY_END
+        for user_id, intervals in free_by_member.items():
+            index = bisect_right(free_starts[user_id], run_start) - 1
+            if index >= 0 and intervals[index][1] - run_start >= window_seconds:
+                attendees[user_id] = user_busy_slots[user_id]
+                common_start = max(common_start, intervals[index][0])
+                common_end = min(common_end, intervals[index][1])
+
+        key = (common_start, common_end, frozenset(attendees))
+        if key in tried:
+            continue
+        tried.add(key)
+        if any(start <= common_start and common_end <= end and key[2] <= members for start, end, members in accepted):
+            continue
+
+        try:
+            slot = compute_interval_slot(campus_graph, attendees, common_start, common_end, meeting_duration, all_buildings)
+        except Exception as e:
+            print(f"[ERROR] Error processing quorum interval {common_start}-{common_end}: {e}")
+            continue
+        if slot is None:
+            continue
+
+        slot["attendee_count"] = len(attendees)
+        slot["absent_user_ids"] = [user_id for user_id in user_busy_slots if user_id not in attendees]
+        slots.append(slot)
+        accepted.append(key)
+    return slots
+
+# --------
+# Helper function: a user's commitments around a free interval
+# Returns (previous location, time they are free from, next location or None, time they must leave for it by)
+# the previous location is the user's home location (free from the start of the day) if nothing comes before
+# --------
+def user_commitments_around(info: dict, free_start: int, free_end: int) -> tuple:
+    previous_location, free_from = info["home_location"], DAY_START
+    next_location, next_start = None, DAY_END
+    for busy_start, busy_end, loc, _name in info["slots_with_names"]:
+        if busy_end <= free_start:
+            previous_location, free_from = loc, busy_end
+        elif busy_start >= free_end:
+            next_location, next_start = loc, busy_start
+            break
+    return previous_location, free_from, next_location, next_start
+
+# --------
+# Rank concrete (start time, building) meeting proposals for a group on one day
+# A building is feasible at start time t if every user can walk there from their previous commitment after it ends
+# and still reach their next commitment in time after the meeting; the feasible start times for a building in a free
+# interval are [max(free_from + walk_there), min(next_start - walk_on) - duration] over the users (a building some user
+# has no path to, or no path on from, is infeasible). Buildings are scored
+# like best_meeting_building (average walk + 0.5 * standard deviation) and the best limit proposals are kept in a bounded
+# heap; once it is full, a building is dropped as soon as the average of the walks summed so far (a lower bound of its
+# score) exceeds the worst kept score, so most buildings never get all their users' walks looked up
+# Each (free interval, building) pair is proposed once, at its earliest feasible start on the step_minutes grid,
+# with the latest feasible start alongside. Returns MeetingProposal dicts, best first
+# --------
+def compute_meeting_proposals(campus_graph: CampusGraph, user_busy_slots: dict, meeting_duration: int,
+                              limit: int = 10, step_minutes: int = 5, candidate_buildings: list[str] = None,
+                              venue_types: tuple = None) -> list[dict]:
+    duration_seconds = meeting_duration * 60
+    step_seconds = step_minutes * 60
+    buildings = candidate_buildings if candidate_buildings is not None else campus_graph.meeting_candidates(venue_types)
+    user_count = len(user_busy_slots)
+    all_pairs = campus_graph.all_pairs
+
+    heap = []  # the kept proposals as a max-heap on (score, start): entries (-score, -start, sequence, proposal)
+    evaluated = infeasible = pruned = 0
+    for free_start, free_end in compute_free_intervals(user_busy_slots):
+        if free_end - free_start < duration_seconds:
+            continue
+        commitments = [user_commitments_around(info, free_start, free_end) for info in user_busy_slots.values()]
+
+        for building in buildings:
+            evaluated += 1
+            worst_kept = -heap[0][0] if len(heap) >= limit else float('inf')
+
+            # per-user feasibility narrows the start window; the running average walk bounds the score from below
+            earliest, latest = free_start, free_end - duration_seconds
+            walks, walk_sum = [], 0.0
+            for previous_location, free_from, next_location, next_start in commitments:
+                # the campus graph is directed and not strongly connected: a user who can't walk to the building
+                # (or on from it to their next commitment) can't attend there, so the building is infeasible
+                walk = all_pairs.get(previous_location, {}).get(building)
+                walk_on = all_pairs.get(building, {}).get(next_location) if next_location is not None else 0
+                if walk is None or walk_on is None:
+                    earliest = float('inf')
+                    break
+                earliest = max(earliest, free_from + walk)
+                latest = min(latest, next_start - walk_on - duration_seconds)
+                if earliest > latest:
+                    break
+                walk_sum += walk
+                walks.append(walk)
+                if walk_sum / user_count > worst_kept:
+                    break
+
+            start = math.ceil(earliest / step_seconds) * step_seconds if earliest <= latest else None  # first grid time
+            if start is None or start > latest:
+                infeasible += 1
+                continue
+            if len(walks) < user_count:
+                pruned += 1
+                continue
+
+            average = walk_sum / user_count
+            score = average + 0.5 * (sum((walk - average) ** 2 for walk in walks) / user_count) ** 0.5
+            entry = (-score, -start, evaluated, (building, start, int(latest), commitments))
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif (score, start) < (-heap[0][0], -heap[0][1]):
+                heapq.heapreplace(heap, entry)
+
+    print(f"[DEBUG] Meeting proposals: {evaluated} (interval, building) options, {infeasible} infeasible, "
+          f"{pruned} pruned by the score bound, {len(heap)} kept")
+
+    proposals = []
+    for negative_score, _negative_start, _sequence, (building, start, latest, commitments) in sorted(heap, key=lambda entry: (-entry[0], -entry[1], entry[2])):
+        user_locations = []
+        for (user_id, info), (previous_location, _free_from, _next_location, _next_start) in zip(user_busy_slots.items(), commitments):
+            user_locations.append({
+                "user_id": user_id,
+                "name": info["name"],
+                "location": previous_location,
+                "walk_time": int(all_pairs.get(previous_location, {}).get(building, 0)),
+                "path": campus_graph.get_shortest_path_with_coords(previous_location, building),
+            })
+        proposals.append({
+            "start_seconds": start,
+            "end_seconds": start + duration_seconds,
+            "start_hhmm": seconds_to_hhmm(start),
+            "end_hhmm": seconds_to_hhmm(start + duration_seconds),
+            "meeting_location": building,
+            "user_locations": user_locations,
+            "score": round(-negative_score, 1),
+            "latest_start_seconds": latest,
+            "latest_start_hhmm": seconds_to_hhmm(latest),
+        })
+    return proposals
@@ -0,0 +1,143 @@
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+# ------
+# Process pool for the CPU-bound part of the meeting algorithm
+# The scoring/interval work runs in worker processes that keep their own copy of the campus graph,
+# so it does not compete under the GIL with the request threads. Workers preload the default campus
+# at startup and load other campuses (or newer versions) on demand, keyed by data directory and the
+# source fingerprint of the files they were built from, so a request for another version rebuilds
+# ------
+
+def _default_worker_count() -> int:
+    cpus = os.cpu_count() or 1
+    return 0 if cpus <= 1 else min(4, cpus - 1)
+
+# number of worker processes, 0 runs the computation inline in the request thread
+MEETING_POOL_WORKERS = int(os.getenv("MEETING_POOL_WORKERS", _default_worker_count()))
+
+# how many campus graphs each worker keeps in memory
+WORKER_GRAPH_CACHE_SIZE = int(os.getenv("MEETING_POOL_GRAPH_CACHE", "2"))
+
+
+# --- worker process side ---
+
+_worker_graphs: "OrderedDict[str, tuple]" = OrderedDict()  # data_dir -> (fingerprint, CampusGraph)
+
+def _worker_graph(data_dir: str, fingerprint: tuple):
+    """Returns the worker's CampusGraph for data_dir, (re)building it if the cached one is a different version."""
+    cached = _worker_graphs.get(data_dir)
+    if cached is not None and cached[0] == fingerprint:
+        _worker_graphs.move_to_end(data_dir)
+        return cached[1]
+
+    from graph.graph_utils import CampusGraph
+    from graph.registry import source_fingerprint
+    # the graph is built from the files on disk now, which may already be newer than the requested version
+    # (a reload between the request's snapshot and this build), so it is cached under the fingerprint of what
+    # was actually read, taken before the build: a file changing mid-build then just means one more rebuild later
+    built_fingerprint = source_fingerprint(data_dir)
+    graph = CampusGraph(data_dir)
+    if built_fingerprint != fingerprint:
+        print(f"[WARNING] Meeting worker {os.getpid()}: graph files in {data_dir} changed since the request's snapshot, using the newer version")
+    _worker_graphs[data_dir] = (built_fingerprint, graph)
+    _worker_graphs.move_to_end(data_dir)
+    while len(_worker_graphs) > WORKER_GRAPH_CACHE_SIZE:
+        _worker_graphs.popitem(last=False)
+    return graph
+
+def _init_worker(preload: list):
+    """Pool initializer: builds the graphs listed in preload [(data_dir, fingerprint), ...]."""
+    for data_dir, fingerprint in preload:
+        try:
+            _worker_graph(data_dir, fingerprint)
+        except Exception as e:
+            print(f"[WARNING] Meeting worker {os.getpid()} could not preload graph from {data_dir}: {e}")
+
+def _run_in_worker(fn: Callable, data_dir: str, fingerprint: tuple, args: tuple):
+    return fn(_worker_graph(data_dir, fingerprint), *args)
+
+
+# --- request side ---
+
+class MeetingPool:
+
+    # ------
+    # Lazily started process pool; falls back to running inline if disabled or if the pool breaks
+    # ------
+    def __init__(self, workers: int = MEETING_POOL_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self, snapshot) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn instead of fork: the server process has running threads (graph watcher, threadpool)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=([(snapshot.graph.data_dir, snapshot.fingerprint)],),
+                )
+                print(f"[INFO] Started meeting process pool with {self.workers} workers")
+            return self._executor
+
+    def start(self, snapshot):
+        """Starts the worker processes now (preloading snapshot's graph) instead of on the first request."""
+        if self.workers > 0:
+            self._get_executor(snapshot)
+
+    def run(self, fn: Callable, snapshot, *args):
+        """
+        Runs fn(campus_graph, *args) for the graph version in snapshot (a GraphVersion),
+        in a worker process if the pool is enabled, otherwise in the calling thread.
+        fn and args must be picklable (module-level function, plain data).
+        """
+        if self.workers <= 0:
+            return fn(snapshot.graph, *args)
+
+        executor = self._get_executor(snapshot)
+        try:
+            return executor.submit(_run_in_worker, fn, snapshot.graph.data_dir, snapshot.fingerprint, args).result()
+        except BrokenProcessPool:
+            self._discard_broken(executor)
+            return fn(snapshot.graph, *args)
+
+    def run_many(self, fn: Callable, snapshot, arg_list: list) -> list:
+        """
+        Runs fn(campus_graph, *args) for every args tuple in arg_list and returns the results in the same order.
+        All calls are submitted at once, so they are spread over the worker processes in parallel.
+        """
+        if self.workers <= 0:
+            return [fn(snapshot.graph, *args) for args in arg_list]
+
+        executor = self._get_executor(snapshot)
+        try:
+            futures = [executor.submit(_run_in_worker, fn, snapshot.graph.data_dir, snapshot.fingerprint, args) for args in arg_list]
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            self._discard_broken(executor)
+            return [fn(snapshot.graph, *args) for args in arg_list]
+
+    def _discard_broken(self, executor: ProcessPoolExecutor):
+        print("[ERROR] Meeting process pool broke, restarting it and computing inline for this request")
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# shared pool used by the algorithm routes
+meeting_pool = MeetingPool()
@@ -1,204 +1,615 @@
-from fastapi import APIRouter, HTTPException  # for creating API routes and handling HTTP errors
-from typing import List  # for type hinting lists
+import asyncio
+import math
+import os
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket  # for creating API routes and handling HTTP errors
+from fastapi.concurrency import run_in_threadpool  # run blocking work without blocking the event loop
+from fastapi.responses import Response, StreamingResponse
 from database import get_db_connection  # function to get a database connection
-from schemas import GroupFreeTimesResponseWithName, CommonSlotWithLocationsWithName, PathNode, UserLocationSlotWithName  # new schemas
+from schemas import GroupFreeTimesResponseWithName, GroupFreeTimesCompactResponse, GroupQuorumTimesResponse, GroupMeetingProposalsResponse, DashboardMeetingTimesResponse, CommonSlotWithLocationsWithName, PathNode, UserLocationSlotWithName  # new schemas
+from routes.graph import get_campus_snapshot  # shared, versioned graph of the requested campus
+from routes.groups import check_acting_user  # the path user must be the signed-in user
+from tokens import InvalidToken, get_current_user_id, verify_token  # user id from the signed session token
+from group_roles import group_roles  # cached group membership lookups
+from live_updates import live_updates  # debounced recompute and push to subscribers
+from admission import PARTIAL_HEADER, request_deadline  # per-request time budget from admission control
+from graph.registry import GraphVersion
+from meeting import compute_meeting_slots, compute_meeting_times_json, compute_meeting_times_json_within, compute_compact_meeting_slots, compute_quorum_meeting_slots, compute_meeting_proposals, iter_meeting_slots  # core meeting-time computation
+from meeting_pool import meeting_pool  # process pool for the CPU-bound part
+from singleflight import SingleFlight  # coalesces identical concurrent requests
+from fastjson import dumps  # fast JSON encoder (orjson when installed)
+from capture import anonymize_busy_slots, capture_data, capturing, summarize_meeting_slots  # opt-in request capture for replay
+import json
 
 # create a router for algorithm-related endpoints
 router = APIRouter()
 
-# Helper function to convert seconds past 7:00 am to "HH:MM" format
-def seconds_to_hhmm(seconds):
-    # Convert seconds past 7:00 am to total seconds from midnight
-    total_seconds = seconds + 7 * 3600
-    # floor division to get hours
-    hours = total_seconds // 3600
-    minutes = (total_seconds % 3600) // 60
-    return f"{hours:02d}:{minutes:02d}"
+# identical concurrent requests (e.g. a whole group opening the dashboard at once) share one computation
+meeting_requests = SingleFlight()
+
+# when set, every pre-serialized best_meeting_times response is also validated against the response schema
+VALIDATE_FAST_PATH = os.getenv("ALGORITHM_VALIDATE_FAST_PATH", "").lower() in ("1", "true", "yes")
+
+# --------
+# Helper function: fetch every group member and their busy slots on one day
+# Returns {user_id: {"home_location", "name", "slots_with_names": [(start, end, location, name), ...]}}
+# --------
+def fetch_group_busy_slots(cursor, group_id: int, day_of_week: int) -> dict:
+    # --- Get all users in the group including names ---
+    cursor.execute("""
+        SELECT u.user_id, u.home_location, u.name
+        FROM GroupMemberships gm
+        JOIN Users u ON gm.user_id = u.user_id
+        WHERE gm.group_id = ?
+    """, (group_id,))
+    users = cursor.fetchall()  # list of (user_id, home_location, name)
+    print(f"[DEBUG] Found {len(users) if users else 0} users in group")
+
+    if not users:
+        raise HTTPException(status_code=404, detail="No users found in this group")
+
+    # --- Get busy slots for each user on the given day ---
+    user_busy_slots = {}
+    for user_id, home_location, name in users:
+        cursor.execute("""
+            SELECT start_seconds, end_seconds, location
+            FROM Availability
+            WHERE user_id = ? AND day_of_week = ?
+            ORDER BY start_seconds
+        """, (user_id, day_of_week))
+        slots = cursor.fetchall()  # list of (start_seconds, end_seconds, location)
+        print(f"[DEBUG] User {user_id} ({name}): {len(slots)} busy slots")
+
+        # Store busy slots and user info including name for later processing
+        # We'll need names to show on frontend
+        user_busy_slots[user_id] = {
+            "home_location": home_location,
+            "name": name,
+            "slots_with_names": [(start, end, loc, name) for start, end, loc in slots]
+        }
+    return user_busy_slots
+
+# --------
+# Helper function: open a connection, fetch the group's busy slots and close it again
+# --------
+def load_group_busy_slots(group_id: int, day_of_week: int) -> dict:
+    # Connect to the database
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        user_busy_slots = fetch_group_busy_slots(cursor, group_id, day_of_week)
+    finally:
+        conn.close()  # always close the database connection
+
+    if capturing():
+        capture_data("group", anonymize_busy_slots(user_busy_slots))
+    return user_busy_slots
+
+# --------
+# Helper function: check the requested venue types (node categories, e.g. academic, library, dining) against the
+# campus graph. Returns them as a sorted tuple (part of the single-flight keys, passed on to the meeting computation)
+# or None for the campus' default meeting venues; raises a 400 for unknown venue types
+# --------
+def resolve_venue_types(snapshot: GraphVersion, venue_type: List[str]):
+    if not venue_type:
+        return None
+    venue_types = tuple(sorted({value.strip().lower() for value in venue_type if value.strip()}))
+    known = snapshot.graph.venue_types()
+    unknown = [value for value in venue_types if value not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown venue_type: {unknown[0]} (known: {', '.join(sorted(known))})")
+    return venue_types or None
+
+# --------
+# Helper function: record the graph and a summary of the computed slots for a captured request
+# --------
+def capture_meeting_result(snapshot: GraphVersion, campus_id: str, slots: list[dict]):
+    if capturing():
+        campus_graph = snapshot.graph
+        capture_data("graph", {"campus_id": campus_id, "nodes": campus_graph.graph.number_of_nodes(), "edges": campus_graph.graph.number_of_edges()})
+        capture_data("result", summarize_meeting_slots(slots))
+
+# --------
+# Helper function: fetch the group's data, then run the meeting computation in the process pool
+# The database connection is closed before the CPU-bound part starts
+# Returns (body, complete): the response body already serialized (GroupFreeTimesResponseWithName layout) and
+# False if the deadline (time.time() timestamp) passed before every free interval was scored
+# --------
+def compute_best_meeting_times(snapshot: GraphVersion, group_id: int, day_of_week: int, meeting_duration: int,
+                               deadline: float = None, venue_types: tuple = None) -> tuple[bytes, bool]:
+    try:
+        user_busy_slots = load_group_busy_slots(group_id, day_of_week)
+        body, complete = meeting_pool.run(compute_meeting_times_json_within, snapshot, user_busy_slots, meeting_duration, day_of_week, deadline, venue_types)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"[ERROR] Error in get_best_meeting_times: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error calculating best meeting times: {str(e)}")
+
+    print(f"[DEBUG] Returning response with day_of_week={day_of_week}, {len(body)} bytes\n")
+    return body, complete
+
+# --------
+# Helper function: check that the pre-serialized response matches what the Pydantic path produces
+# Computes the same slots through the regular path (PathNode models and all), validates both against
+# GroupFreeTimesResponseWithName and raises AssertionError if they differ
+# --------
+def verify_fast_path_contract(campus_graph, user_busy_slots: dict, day_of_week: int, meeting_duration: int):
+    fast = GroupFreeTimesResponseWithName.model_validate_json(
+        compute_meeting_times_json(campus_graph, user_busy_slots, meeting_duration, day_of_week)
+    )
+    slots = [
+        CommonSlotWithLocationsWithName(**{
+            **slot,
+            "user_locations": [
+                UserLocationSlotWithName(**{**user, "path": [PathNode(**n) for n in user["path"]]})
+                for user in slot["user_locations"]
+            ],
+        })
+        for slot in compute_meeting_slots(campus_graph, user_busy_slots, meeting_duration)
+    ]
+    regular = GroupFreeTimesResponseWithName(day_of_week=day_of_week, slots=slots)
+    assert fast.model_dump() == regular.model_dump(), "fast path response differs from the schema-built response"
 
 # --------
 # Endpoint: Get best meeting times for a group based on free slots and travel times
-# GET /algorithm/group/{group_id}/best_meeting_times?day_of_week=...&meeting_duration=...
+# GET /algorithm/group/{group_id}/best_meeting_times?day_of_week=...&meeting_duration=...&campus_id=...
 # duration (minimum time user wants to meet for is in minutes, e.g., 30 for 30 minutes)
 # returns free time slots for the group on the specified day, along with the optimal meeting location and walking times for each user to that location and their names
+# if the request's time budget runs out, the slots found so far are returned with the X-Gatherly-Partial header
+# venue_type (repeatable, e.g. venue_type=library&venue_type=union) limits the meeting locations to those categories;
+# without it every building except parking, utility and residence buildings is considered
 # --------
 @router.get("/group/{group_id}/best_meeting_times", response_model=GroupFreeTimesResponseWithName)
-def get_best_meeting_times(group_id: int, day_of_week: int, meeting_duration: int):
-    # Import here to avoid circular imports
-    from main import campus_graph
-
+def get_best_meeting_times(group_id: int, day_of_week: int, meeting_duration: int, campus_id: str = None,
+                           venue_type: List[str] = Query(None)):
     print(f"\n[DEBUG] START get_best_meeting_times: group_id={group_id}, day_of_week={day_of_week}, meeting_duration={meeting_duration}")
 
     if not (0 <= day_of_week <= 6):
         raise HTTPException(status_code=400, detail="Invalid day_of_week")
 
-    # Connect to the database
+    # take one graph snapshot of the group's campus for the whole request so a concurrent reload can't change it mid-computation
+    snapshot = get_campus_snapshot(campus_id)
+    venue_types = resolve_venue_types(snapshot, venue_type)
+
+    # concurrent requests with the same parameters on the same graph version wait for one shared computation
+    key = ("best_meeting_times", snapshot.graph.data_dir, snapshot.version, group_id, day_of_week, meeting_duration, venue_types)
+    deadline = request_deadline()
+    body, complete = meeting_requests.do(key, lambda: compute_best_meeting_times(snapshot, group_id, day_of_week, meeting_duration, deadline, venue_types))
+
+    # the body is already serialized in the response_model layout, so it is sent as-is instead of being
+    # re-validated node by node (response_model still documents the shape in the OpenAPI schema)
+    if VALIDATE_FAST_PATH:
+        GroupFreeTimesResponseWithName.model_validate_json(body)
+    if capturing():
+        capture_meeting_result(snapshot, campus_id, json.loads(body)["slots"])
+    headers = None if complete else {PARTIAL_HEADER: "deadline"}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# --------
+# Helper function: the current best_meeting_times body for a live subscription
+# Uses the latest graph snapshot and the same single-flight key as the endpoint, so a concurrent request shares the work
+# --------
+def live_meeting_times_body(group_id: int, day_of_week: int, meeting_duration: int, campus_id: str, venue_type: List[str] = None) -> bytes:
+    snapshot = get_campus_snapshot(campus_id)
+    venue_types = resolve_venue_types(snapshot, venue_type)
+    key = ("best_meeting_times", snapshot.graph.data_dir, snapshot.version, group_id, day_of_week, meeting_duration, venue_types)
+    body, _complete = meeting_requests.do(key, lambda: compute_best_meeting_times(snapshot, group_id, day_of_week, meeting_duration, None, venue_types))
+    return body
+
+# --------
+# Endpoint: Live best meeting times for a group over a WebSocket
+# WS /algorithm/group/{group_id}/best_meeting_times/live?day_of_week=...&meeting_duration=...&venue_type=...&campus_id=...&token=...
+# sends {"type": "meeting_times", "group_id", "result": <best_meeting_times response>} right away and again whenever
+# a schedule edit or membership change alters the result (edits are debounced, unchanged results are not sent)
+# browsers can't set headers on a WebSocket, so the session token is passed as the token query parameter
+# a socket whose user has left the group is closed (1008) instead of getting the next result
+# --------
+@router.websocket("/group/{group_id}/best_meeting_times/live")
+async def live_best_meeting_times(websocket: WebSocket, group_id: int, day_of_week: int, meeting_duration: int,
+                                  token: str = None, campus_id: str = None, venue_type: List[str] = Query(None)):
+    try:
+        user_id = verify_token(token or "")
+    except InvalidToken:
+        await websocket.close(code=1008, reason="Missing or invalid session token")
+        return
+    roles = await run_in_threadpool(group_roles.get, group_id, get_db_connection)
+    if roles is None or roles.role(user_id) is None:
+        await websocket.close(code=1008, reason="Not a member of this group")
+        return
+    if not (0 <= day_of_week <= 6):
+        await websocket.close(code=1008, reason="Invalid day_of_week")
+        return
+    try:
+        snapshot = await run_in_threadpool(get_campus_snapshot, campus_id)
+        venue_types = resolve_venue_types(snapshot, venue_type)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    print(f"[DEBUG] Live subscription: user {user_id}, group {group_id}, day_of_week={day_of_week}, meeting_duration={meeting_duration}")
+    key = (group_id, day_of_week, meeting_duration, campus_id, venue_types)
+    try:
+        subscription, queue = await live_updates.subscribe(
+            group_id, key, day_of_week, lambda: live_meeting_times_body(group_id, day_of_week, meeting_duration, campus_id, venue_types)
+        )
+    except HTTPException as e:
+        await websocket.close(code=1011, reason=str(e.detail))
+        return
+
+    prefix = b'{"type":"meeting_times","group_id":' + dumps(group_id) + b',"result":'
+    receive = asyncio.ensure_future(websocket.receive())  # only used to notice the client going away
+    try:
+        while True:
+            next_body = asyncio.ensure_future(queue.get())
+            done, _pending = await asyncio.wait({next_body, receive}, return_when=asyncio.FIRST_COMPLETED)
+            if next_body in done:
+                # membership is checked again before every push: a member removed from the group stops getting its data
+                roles = await run_in_threadpool(group_roles.get, group_id, get_db_connection)
+                if roles is None or roles.role(user_id) is None:
+                    await websocket.close(code=1008, reason="Not a member of this group")
+                    break
+                await websocket.send_text((prefix + next_body.result() + b'}').decode("utf-8"))
+            else:
+                next_body.cancel()
+            if receive in done:
+                if receive.result()["type"] == "websocket.disconnect":
+                    break
+                receive = asyncio.ensure_future(websocket.receive())  # client messages (e.g. keepalives) are ignored
+    finally:
+        receive.cancel()
+        live_updates.unsubscribe(group_id, subscription, queue)
+        print(f"[DEBUG] Live subscription closed: user {user_id}, group {group_id}")
+
+# --------
+# Helper function: same as compute_best_meeting_times, but producing the compact response layout
+# --------
+def compute_compact_best_meeting_times(snapshot: GraphVersion, group_id: int, day_of_week: int, meeting_duration: int, geometry: str,
+                                       venue_types: tuple = None) -> dict:
+    try:
+        user_busy_slots = load_group_busy_slots(group_id, day_of_week)
+        compact = meeting_pool.run(compute_compact_meeting_slots, snapshot, user_busy_slots, meeting_duration, geometry, venue_types)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"[ERROR] Error in get_best_meeting_times_compact: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error calculating best meeting times: {str(e)}")
+
+    return {"day_of_week": day_of_week, **compact}
+
+# --------
+# Endpoint: Get best meeting times in the compact layout
+# GET /algorithm/group/{group_id}/best_meeting_times/compact?day_of_week=...&meeting_duration=...&geometry=nodes|polyline
+# same slots as best_meeting_times, but each distinct path is sent once and slots refer to it by path_id;
+# geometry=nodes sends a shared [lat, lon] table, geometry=polyline sends an encoded polyline per path
+# --------
+@router.get("/group/{group_id}/best_meeting_times/compact", response_model=GroupFreeTimesCompactResponse, response_model_exclude_none=True)
+def get_best_meeting_times_compact(group_id: int, day_of_week: int, meeting_duration: int, campus_id: str = None,
+                                   geometry: Literal["nodes", "polyline"] = "nodes", venue_type: List[str] = Query(None)):
+    print(f"\n[DEBUG] START get_best_meeting_times_compact: group_id={group_id}, day_of_week={day_of_week}, meeting_duration={meeting_duration}, geometry={geometry}")
+
+    if not (0 <= day_of_week <= 6):
+        raise HTTPException(status_code=400, detail="Invalid day_of_week")
+
+    snapshot = get_campus_snapshot(campus_id)
+    venue_types = resolve_venue_types(snapshot, venue_type)
+
+    key = ("best_meeting_times_compact", snapshot.graph.data_dir, snapshot.version, group_id, day_of_week, meeting_duration, geometry, venue_types)
+    compact = meeting_requests.do(key, lambda: compute_compact_best_meeting_times(snapshot, group_id, day_of_week, meeting_duration, geometry, venue_types))
+
+    # serialized directly in the response_model layout (coords is left out when not used, like response_model_exclude_none)
+    if compact["coords"] is None:
+        compact = {k: v for k, v in compact.items() if k != "coords"}
+    capture_meeting_result(snapshot, campus_id, compact["slots"])
+    return Response(content=dumps(compact), media_type="application/json")
+
+
+# --------
+# Helper function: encode one streamed event as an NDJSON line or a server-sent event
+# --------
+def encode_stream_event(event: str, data: dict, stream_format: str) -> bytes:
+    if stream_format == "sse":
+        return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+    return dumps({"type": event, **data}) + b"\n"
+
+# --------
+# Endpoint: Stream best meeting times for a group, one slot at a time
+# GET /algorithm/group/{group_id}/best_meeting_times/stream?day_of_week=...&meeting_duration=...&format=ndjson|sse
+# emits a "start" event, one "slot" event per qualifying free interval as soon as it is computed
+# (same slot shape as best_meeting_times) and an "end" event with the slot count
+# the computation stops as soon as the client disconnects
+# --------
+@router.get("/group/{group_id}/best_meeting_times/stream")
+async def stream_best_meeting_times(request: Request, group_id: int, day_of_week: int, meeting_duration: int,
+                                    campus_id: str = None, format: Literal["ndjson", "sse"] = "ndjson",
+                                    venue_type: List[str] = Query(None)):
+    print(f"\n[DEBUG] START stream_best_meeting_times: group_id={group_id}, day_of_week={day_of_week}, meeting_duration={meeting_duration}")
+
+    if not (0 <= day_of_week <= 6):
+        raise HTTPException(status_code=400, detail="Invalid day_of_week")
+
+    # graph snapshot and group data are loaded before the response starts, so errors are still normal HTTP errors
+    snapshot = await run_in_threadpool(get_campus_snapshot, campus_id)
+    venue_types = resolve_venue_types(snapshot, venue_type)
+    user_busy_slots = await run_in_threadpool(load_group_busy_slots, group_id, day_of_week)
+
+    # slots are computed interval by interval in the threadpool (not the process pool) so each one can be sent right away
+    slots = iter_meeting_slots(snapshot.graph, user_busy_slots, meeting_duration, venue_types=venue_types)
+
+    async def event_stream():
+        slot_count = 0
+        try:
+            yield encode_stream_event("start", {"day_of_week": day_of_week}, format)
+            while True:
+                if await request.is_disconnected():
+                    print(f"[DEBUG] Client disconnected, stopping stream for group {group_id} after {slot_count} slots")
+                    return
+                slot = await run_in_threadpool(next, slots, None)
+                if slot is None:
+                    break
+                slot_count += 1
+                yield encode_stream_event("slot", slot, format)
+            yield encode_stream_event("end", {"slot_count": slot_count}, format)
+        finally:
+            slots.close()  # stop the generator if the stream ends early
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(event_stream(), media_type=media_type, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# --------
+# Helper function: fetch the group's data and compute its quorum meeting slots in the process pool
+# --------
+def compute_quorum_meeting_times(snapshot: GraphVersion, group_id: int, day_of_week: int, meeting_duration: int,
+                                 min_attendees: int, pct: float, limit: int, venue_types: tuple = None) -> dict:
+    try:
+        user_busy_slots = load_group_busy_slots(group_id, day_of_week)
+        member_count = len(user_busy_slots)
+        required = min_attendees if min_attendees is not None else math.ceil(pct * member_count / 100)
+        if not (1 <= required <= member_count):
+            raise HTTPException(status_code=400, detail=f"min_attendees must be between 1 and the group size ({member_count})")
+        slots = meeting_pool.run(compute_quorum_meeting_slots, snapshot, user_busy_slots, meeting_duration, required, limit, venue_types)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"[ERROR] Error in get_quorum_meeting_times: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error calculating quorum meeting times: {str(e)}")
+
+    return {"day_of_week": day_of_week, "member_count": member_count, "min_attendees": required, "slots": slots}
+
+# --------
+# Endpoint: Get meeting times where at least K members (min_attendees) or P percent (pct) of the group are free
+# GET /algorithm/group/{group_id}/quorum_meeting_times?day_of_week=...&meeting_duration=...&min_attendees=...|pct=...&limit=10
+# for large groups where everyone is rarely free at once; slots are ranked by attendance, the meeting location is
+# chosen by fairness over the attendees only, and each slot lists the members who can't make it
+# --------
+@router.get("/group/{group_id}/quorum_meeting_times", response_model=GroupQuorumTimesResponse)
+def get_quorum_meeting_times(group_id: int, day_of_week: int, meeting_duration: int, min_attendees: int = None,
+                             pct: float = None, limit: int = 10, campus_id: str = None, venue_type: List[str] = Query(None)):
+    print(f"\n[DEBUG] START get_quorum_meeting_times: group_id={group_id}, day_of_week={day_of_week}, meeting_duration={meeting_duration}, min_attendees={min_attendees}, pct={pct}")
+
+    if not (0 <= day_of_week <= 6):
+        raise HTTPException(status_code=400, detail="Invalid day_of_week")
+    if meeting_duration <= 0:
+        raise HTTPException(status_code=400, detail="meeting_duration must be positive")
+    if (min_attendees is None) == (pct is None):
+        raise HTTPException(status_code=400, detail="Give exactly one of min_attendees or pct")
+    if pct is not None and not (0 < pct <= 100):
+        raise HTTPException(status_code=400, detail="pct must be between 0 and 100")
+    if not (1 <= limit <= 50):
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+
+    snapshot = get_campus_snapshot(campus_id)
+    venue_types = resolve_venue_types(snapshot, venue_type)
+
+    key = ("quorum_meeting_times", snapshot.graph.data_dir, snapshot.version, group_id, day_of_week, meeting_duration, min_attendees, pct, limit, venue_types)
+    result = meeting_requests.do(key, lambda: compute_quorum_meeting_times(snapshot, group_id, day_of_week, meeting_duration, min_attendees, pct, limit, venue_types))
+
+    capture_meeting_result(snapshot, campus_id, result["slots"])
+    return Response(content=dumps(result), media_type="application/json")
+
+
+# --------
+# Helper function: fetch the group's data and rank its meeting proposals in the process pool
+# --------
+def compute_group_meeting_proposals(snapshot: GraphVersion, group_id: int, day_of_week: int, meeting_duration: int,
+                                    limit: int, step_minutes: int, venue_types: tuple = None) -> dict:
+    try:
+        user_busy_slots = load_group_busy_slots(group_id, day_of_week)
+        proposals = meeting_pool.run(compute_meeting_proposals, snapshot, user_busy_slots, meeting_duration, limit, step_minutes, None, venue_types)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"[ERROR] Error in get_meeting_proposals: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error calculating meeting proposals: {str(e)}")
+
+    return {"day_of_week": day_of_week, "meeting_duration": meeting_duration, "proposals": proposals}
+
+# --------
+# Endpoint: Get the top ranked (start time, building) meeting proposals for a group
+# GET /algorithm/group/{group_id}/meeting_proposals?day_of_week=...&meeting_duration=...&limit=10&step_minutes=5&campus_id=...
+# unlike best_meeting_times (one building per free interval, checked against the longest walk), every building is
+# considered at concrete start times on a step_minutes grid, and each member must be able to walk there after their
+# previous commitment and reach their next one after the meeting; proposals are ranked by fairness score
+# --------
+@router.get("/group/{group_id}/meeting_proposals", response_model=GroupMeetingProposalsResponse)
+def get_meeting_proposals(group_id: int, day_of_week: int, meeting_duration: int, limit: int = 10, step_minutes: int = 5,
+                          campus_id: str = None, venue_type: List[str] = Query(None)):
+    print(f"\n[DEBUG] START get_meeting_proposals: group_id={group_id}, day_of_week={day_of_week}, meeting_duration={meeting_duration}, limit={limit}, step_minutes={step_minutes}")
+
+    if not (0 <= day_of_week <= 6):
+        raise HTTPException(status_code=400, detail="Invalid day_of_week")
+    if meeting_duration <= 0:
+        raise HTTPException(status_code=400, detail="meeting_duration must be positive")
+    if not (1 <= limit <= 50):
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+    if not (1 <= step_minutes <= 60):
+        raise HTTPException(status_code=400, detail="step_minutes must be between 1 and 60")
+
+    snapshot = get_campus_snapshot(campus_id)
+    venue_types = resolve_venue_types(snapshot, venue_type)
+
+    key = ("meeting_proposals", snapshot.graph.data_dir, snapshot.version, group_id, day_of_week, meeting_duration, limit, step_minutes, venue_types)
+    result = meeting_requests.do(key, lambda: compute_group_meeting_proposals(snapshot, group_id, day_of_week, meeting_duration, limit, step_minutes, venue_types))
+
+    capture_meeting_result(snapshot, campus_id, result["proposals"])
+    return Response(content=dumps(result), media_type="application/json")
+
+# --------
+# Helper function: fetch all groups of a user with their members' busy slots on the given days, in one connection
+# Every member's schedule is queried once, even if they share several groups with the user
+# Returns ([(group_id, group_name), ...], {(group_id, day_of_week): user_busy_slots})
+# --------
+def load_user_groups_busy_slots(user_id: int, days: list[int]) -> tuple[list, dict]:
     conn = get_db_connection()
     cursor = conn.cursor()
-
     try:
-        # --- Get all users in the group including names ---
+        cursor.execute("SELECT user_id FROM Users WHERE user_id = ?", (user_id,))
+        if not cursor.fetchone():
+            raise HTTPException(status_code=404, detail="User not found")
+
         cursor.execute("""
-            SELECT u.user_id, u.home_location, u.name
+            SELECT g.group_id, g.group_name
+            FROM GroupMemberships gm
+            JOIN Groups g ON gm.group_id = g.group_id
+            WHERE gm.user_id = ?
+            ORDER BY g.group_id
+        """, (user_id,))
+        groups = cursor.fetchall()  # list of (group_id, group_name)
+
+        # members of all the user's groups in one query
+        cursor.execute("""
+            SELECT gm.group_id, u.user_id, u.home_location, u.name
             FROM GroupMemberships gm
             JOIN Users u ON gm.user_id = u.user_id
-            WHERE gm.group_id = ?
-        """, (group_id,))
-        users = cursor.fetchall()  # list of (user_id, home_location, name)
-        print(f"[DEBUG] Found {len(users) if users else 0} users in group")
-        
-        if not users:
-            raise HTTPException(status_code=404, detail="No users found in this group")
-
-        # --- Get busy slots for each user on the given day ---
-        user_busy_slots = {}
-        for user_id, home_location, name in users:
-            cursor.execute("""
-                SELECT start_seconds, end_seconds, location
-                FROM Availability
-                WHERE user_id = ? AND day_of_week = ?
-                ORDER BY start_seconds
-            """, (user_id, day_of_week))
-            slots = cursor.fetchall()  # list of (start_seconds, end_seconds, location)
-            print(f"[DEBUG] User {user_id} ({name}): {len(slots)} busy slots")
-
-            # Store busy slots and user info including name for later processing
-            # We'll need names to show on frontend
-            user_busy_slots[user_id] = {
-                "home_location": home_location,
-                "name": name,
-                "slots_with_names": [(start, end, loc, name) for start, end, loc in slots]
+            WHERE gm.group_id IN (SELECT group_id FROM GroupMemberships WHERE user_id = ?)
+        """, (user_id,))
+        memberships = cursor.fetchall()  # list of (group_id, user_id, home_location, name)
+
+        # busy slots of every distinct member on the requested days, also in one query
+        day_placeholders = ", ".join("?" for _ in days)
+        cursor.execute(f"""
+            SELECT a.user_id, a.day_of_week, a.start_seconds, a.end_seconds, a.location
+            FROM Availability a
+            WHERE a.user_id IN (
+                SELECT DISTINCT m.user_id FROM GroupMemberships m
+                WHERE m.group_id IN (SELECT group_id FROM GroupMemberships WHERE user_id = ?)
+            ) AND a.day_of_week IN ({day_placeholders})
+            ORDER BY a.user_id, a.day_of_week, a.start_seconds
+        """, (user_id, *days))
+        busy_rows = cursor.fetchall()  # list of (user_id, day_of_week, start_seconds, end_seconds, location)
+    finally:
+        conn.close()  # always close the database connection
+
+    members = {}  # user_id -> (home_location, name)
+    members_by_group = {}  # group_id -> [user_id, ...] in query order
+    for group_id, member_id, home_location, name in memberships:
+        members[member_id] = (home_location, name)
+        members_by_group.setdefault(group_id, []).append(member_id)
+
+    slots_by_member_day = {}  # (user_id, day_of_week) -> [(start, end, location, name), ...]
+    for member_id, day, start, end, location in busy_rows:
+        slots_by_member_day.setdefault((member_id, day), []).append((start, end, location, members[member_id][1]))
+    print(f"[DEBUG] Dashboard for user {user_id}: {len(groups)} groups, {len(members)} distinct members, {len(busy_rows)} busy slots")
+
+    busy_by_group_day = {}
+    for group_id, _group_name in groups:
+        for day in days:
+            busy_by_group_day[(group_id, day)] = {
+                member_id: {
+                    "home_location": members[member_id][0],
+                    "name": members[member_id][1],
+                    "slots_with_names": slots_by_member_day.get((member_id, day), []),
+                }
+                for member_id in members_by_group.get(group_id, [])
             }
+    return groups, busy_by_group_day
+
+# --------
+# Helper function: compute the best meeting times of every group of a user on every requested day
+# All (group, day) computations go to the process pool at once and run in parallel; groups with the same
+# members are only computed once per day. Returns (body, complete): the serialized DashboardMeetingTimesResponse
+# and False if the deadline passed before some group-day was fully computed
+# --------
+def compute_dashboard_meeting_times(snapshot: GraphVersion, user_id: int, days: list[int], meeting_duration: int,
+                                    deadline: float = None, venue_types: tuple = None) -> tuple[bytes, bool]:
+    try:
+        groups, busy_by_group_day = load_user_groups_busy_slots(user_id, days)
 
-        # --- Initialize free intervals for the full day ---
-        day_start = 0
-        day_end = 12 * 3600  # 7 AM to 7 PM
-        free_intervals = [(day_start, day_end)]
-        print(f"[DEBUG] Initial free_intervals: {free_intervals}")
-
-        # --- Subtract each user's busy slots from the current free intervals ---
-        for user_id, info in user_busy_slots.items():
-            next_free = []
-            user_slots = info["slots_with_names"]
-
-            for free_start, free_end in free_intervals:
-                curr_start = free_start
-                for busy_start, busy_end, _loc, _name in user_slots:
-                    if busy_end <= curr_start:
-                        continue  # busy slot ends before free interval starts
-                    if busy_start >= free_end:
-                        break  # busy slot starts after free interval ends
-                    if curr_start < busy_start:
-                        next_free.append((curr_start, busy_start))  # free interval before busy slot
-                    curr_start = max(curr_start, busy_end)  # move current start past busy slot
-                if curr_start < free_end:
-                    next_free.append((curr_start, free_end))  # remaining free interval
-            free_intervals = next_free  # update free intervals for next user
-            print(f"[DEBUG] Free intervals after user {user_id}: {free_intervals}")
-
-        print(f"[DEBUG] Final free_intervals before candidate processing: {free_intervals}")
-        
-        # --- For each free interval, compute walking times to all buildings ---
-        candidate_slots: List[CommonSlotWithLocationsWithName] = []
-        all_buildings = list(campus_graph.graph.nodes)  # all campus buildings
-        print(f"[DEBUG] All buildings available: {all_buildings}")
-
-        for start, end in free_intervals:
-            try:
-                user_starts = []
-                user_names = {}
-
-                # Determine last known location for each user before this free interval
-                for user_id, info in user_busy_slots.items():
-                    last_loc = info["home_location"]
-                    for busy_start, busy_end, loc, _name in info["slots_with_names"]:
-                        if busy_end <= start:
-                            last_loc = loc
-                        else:
-                            break
-                    user_starts.append(last_loc)
-                    user_names[user_id] = info["name"]
-
-                # Find best meeting building based on total travel time
-                best_buildings = campus_graph.best_meeting_building(user_starts, candidate_buildings=all_buildings)
-                print(f"[DEBUG] best_buildings returned: {best_buildings}")
-                
-                if not best_buildings:
-                    print(f"[DEBUG] No best building found for user_starts: {user_starts}, skipping")
-                    continue
-                
-                top_building, _ = best_buildings[0]
-
-                # Compute individual walking times and track max walk
-                walking_times = []
-                max_walk = 0
-                for user_id, loc in zip(user_busy_slots.keys(), user_starts):
-                    try:
-                        walk_time = campus_graph.get_shortest_time(loc, top_building)
-                        
-                        # Only include if walk time is valid (not infinity)
-                        if walk_time == float('inf'):
-                            print(f"[WARNING] No path found from {loc} to {top_building}, using 0 walk time")
-                            walk_time = 0
-                        
-                        path_coords = campus_graph.get_shortest_path_with_coords(loc, top_building)
-                        walking_times.append(UserLocationSlotWithName(
-                            user_id=user_id,
-                            name=user_names[user_id],
-                            location=loc,
-                            walk_time=int(walk_time),
-                            path=[PathNode(**n) for n in path_coords] # convert dicts to pydantic
-                        ))
-                        if walk_time > max_walk:
-                            max_walk = walk_time
-                        print(f"[DEBUG] User {user_id}: location={loc}, walk_time={int(walk_time)}s")
-                    except Exception as e:
-                        print(f"[WARNING] Failed to compute walking time for user {user_id} from {loc}: {e}")
-                        # Add user with 0 walk time as fallback
-                        walking_times.append(UserLocationSlotWithName(
-                            user_id=user_id,
-                            name=user_names[user_id],
-                            location=loc,
-                            walk_time=0,
-                            path=[]
-                        ))
-                        print(f"[DEBUG] User {user_id}: using fallback with 0s walk time")
-
-                available_time = end - start
-                required_time = meeting_duration * 60 + max_walk
-                print(f"[DEBUG] Interval {start}-{end} ({seconds_to_hhmm(start)}-{seconds_to_hhmm(end)}): available={available_time}s, required={required_time}s (duration={meeting_duration*60}s + max_walk={max_walk}s)")
-
-                # Only include in candidate_slots if enough time for meeting + max walk
-                if available_time >= required_time:
-                    candidate_slots.append(CommonSlotWithLocationsWithName(
-                        start_seconds=start,
-                        end_seconds=end,
-                        start_hhmm=seconds_to_hhmm(start),
-                        end_hhmm=seconds_to_hhmm(end),
-                        meeting_location=top_building,
-                        user_locations=walking_times
-                    ))
-                    print(f"[DEBUG] ✓ Added candidate slot")
-                else:
-                    print(f"[DEBUG] ✗ Skipped interval: not enough time")
-            except Exception as e:
-                print(f"[ERROR] Error processing free interval {start}-{end}: {e}")
-                import traceback
-                traceback.print_exc()
+        task_index, tasks, task_of = {}, [], {}
+        for (group_id, day), user_busy_slots in busy_by_group_day.items():
+            if not user_busy_slots:
                 continue
+            members_key = (tuple(user_busy_slots), day)
+            if members_key not in task_index:
+                task_index[members_key] = len(tasks)
+                tasks.append((user_busy_slots, meeting_duration, day, deadline, venue_types))
+            task_of[(group_id, day)] = task_index[members_key]
 
+        print(f"[DEBUG] Computing {len(tasks)} group-days for {len(busy_by_group_day)} requested")
+        results = meeting_pool.run_many(compute_meeting_times_json_within, snapshot, tasks)
+        bodies = [body for body, _complete in results]
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"[ERROR] Error in get_best_meeting_times: {e}")
+        print(f"[ERROR] Error in get_dashboard_meeting_times: {e}")
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error calculating best meeting times: {str(e)}")
-    finally:
-        conn.close()  # always close the database connection
+        raise HTTPException(status_code=500, detail=f"Error calculating dashboard meeting times: {str(e)}")
+
+    # the per-day bodies are already serialized, so they are spliced into the response as they are
+    parts = [b'{"user_id":', dumps(user_id), b',"meeting_duration":', dumps(meeting_duration), b',"groups":[']
+    for group_index, (group_id, group_name) in enumerate(groups):
+        if group_index:
+            parts.append(b',')
+        day_bodies = [
+            bodies[task_of[(group_id, day)]] if (group_id, day) in task_of else dumps({"day_of_week": day, "slots": []})
+            for day in days
+        ]
+        parts += [
+            b'{"group_id":', dumps(group_id),
+            b',"group_name":', dumps(group_name),
+            b',"member_count":', dumps(len(busy_by_group_day[(group_id, days[0])])),
+            b',"days":[', b','.join(day_bodies), b']}',
+        ]
+    parts.append(b']}')
+    return b''.join(parts), all(complete for _body, complete in results)
+
+# --------
+# Endpoint: Get best meeting times for all of a user's groups in one request (for the dashboard)
+# GET /algorithm/user/{user_id}/dashboard_meeting_times?meeting_duration=...&day_of_week=1&day_of_week=2&campus_id=...
+# day_of_week can be repeated and defaults to every day of the week; each group has one entry per requested day
+# in the best_meeting_times layout. Only the signed-in user can load their own dashboard
+# like best_meeting_times, partial results after the time budget runs out carry the X-Gatherly-Partial header
+# --------
+@router.get("/user/{user_id}/dashboard_meeting_times", response_model=DashboardMeetingTimesResponse)
+def get_dashboard_meeting_times(user_id: int, meeting_duration: int, day_of_week: List[int] = Query(None),
+                                campus_id: str = None, venue_type: List[str] = Query(None),
+                                current_user_id: int = Depends(get_current_user_id)):
+    print(f"\n[DEBUG] START get_dashboard_meeting_times: user_id={user_id}, day_of_week={day_of_week}, meeting_duration={meeting_duration}")
+    check_acting_user(current_user_id, user_id)
+
+    days = sorted(set(day_of_week)) if day_of_week else list(range(7))
+    if not all(0 <= day <= 6 for day in days):
+        raise HTTPException(status_code=400, detail="Invalid day_of_week")
+
+    snapshot = get_campus_snapshot(campus_id)
+    venue_types = resolve_venue_types(snapshot, venue_type)
+
+    key = ("dashboard_meeting_times", snapshot.graph.data_dir, snapshot.version, user_id, tuple(days), meeting_duration, venue_types)
+    deadline = request_deadline()
+    body, complete = meeting_requests.do(key, lambda: compute_dashboard_meeting_times(snapshot, user_id, days, meeting_duration, deadline, venue_types))
 
-    print(f"[DEBUG] Final candidate_slots count: {len(candidate_slots)}")
-    print(f"[DEBUG] Returning response with day_of_week={day_of_week}, slots={len(candidate_slots)}\n")
-    
-    # Return response matching the expected schema
-    return {
-        "day_of_week": day_of_week,
-        "slots": candidate_slots
-    }
\ No newline at end of file
+    if VALIDATE_FAST_PATH:
+        DashboardMeetingTimesResponse.model_validate_json(body)
+    headers = None if complete else {PARTIAL_HEADER: "deadline"}
+    return Response(content=body, media_type="application/json", headers=headers)
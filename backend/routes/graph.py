@@ -1,34 +1,89 @@
-from fastapi import APIRouter
-from graph.graph_utils import CampusGraph
+import hmac
+import math
+import os
+from typing import List
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from graph.graph_utils import CampusGraph, NON_VENUE_CATEGORIES
+from graph.registry import graph_registry, GraphVersion, UnknownCampusError
+from http_cache import GRAPH_CACHE_CONTROL, conditional_json_response, etag_matches, hash_etag, not_modified
 
 # create router for graph endpoints
 router = APIRouter()
 
-# use the existing campus_graph instance (or you can pass it in during startup)
-campus_graph = CampusGraph()
+# token required to trigger a graph reload by hand, reloading is disabled if it is not set
+GRAPH_ADMIN_TOKEN = os.getenv("GRAPH_ADMIN_TOKEN")
+
+# most origins one isochrone request may name
+ISOCHRONE_MAX_ORIGINS = int(os.getenv("ISOCHRONE_MAX_ORIGINS", "50"))
+
+# --------
+# Helper functions to look up the graph of a campus (default campus if campus_id is None)
+# --------
+def get_campus_snapshot(campus_id: str = None) -> GraphVersion:
+    """Returns the active graph snapshot of a campus, or raises a 404 if the campus is unknown."""
+    try:
+        return graph_registry.current(campus_id)
+    except UnknownCampusError:
+        raise HTTPException(status_code=404, detail=f"Unknown campus: {campus_id}")
+
+def get_campus_graph(campus_id: str = None) -> CampusGraph:
+    """Returns the active CampusGraph of a campus, or raises a 404 if the campus is unknown."""
+    return get_campus_snapshot(campus_id).graph
+
+def graph_etag(snapshot: GraphVersion, *parts) -> str:
+    """
+    ETag for data derived only from one graph version. Based on the source files' fingerprint,
+    so it stays the same across restarts and workers as long as campus.dot, nodes.csv and node_categories.csv don't change.
+    """
+    return hash_etag("graph", snapshot.graph.data_dir, snapshot.fingerprint, *parts)
 
 # ------
 # Endpoint: Get all locations on campus
 # GET /graph/all_locations
 # ------
 @router.get("/all_locations")
-def get_all_locations():
+def get_all_locations(request: Request, campus_id: str = None):
     """
     Returns a list of all nodes/locations in the campus graph.
     Can be used to populate a frontend search/dropdown component.
+    Sends an ETag derived from the graph version and answers 304 if the client already has it.
+    """
+    snapshot = get_campus_snapshot(campus_id)
+    etag = graph_etag(snapshot, "all_locations")
+    if etag_matches(request, etag):
+        return not_modified(etag, GRAPH_CACHE_CONTROL)
+    return conditional_json_response(request, {"locations": snapshot.graph.get_all_locations()}, GRAPH_CACHE_CONTROL, etag)
+
+# ------
+# Endpoint: Get the venue types (node categories) that the algorithm routes accept as venue_type
+# GET /graph/venue_types
+# ------
+@router.get("/venue_types")
+def get_venue_types(request: Request, campus_id: str = None):
+    """
+    Returns every location category of the campus with its number of locations and whether it is
+    considered for meetings by default (parking, utility and residence buildings are not).
     """
-    return {"locations": campus_graph.get_all_locations()}
+    snapshot = get_campus_snapshot(campus_id)
+    etag = graph_etag(snapshot, "venue_types")
+    if etag_matches(request, etag):
+        return not_modified(etag, GRAPH_CACHE_CONTROL)
+    venue_types = [
+        {"venue_type": category, "locations": count, "default": category not in NON_VENUE_CATEGORIES}
+        for category, count in sorted(snapshot.graph.venue_types().items())
+    ]
+    return conditional_json_response(request, {"venue_types": venue_types}, GRAPH_CACHE_CONTROL, etag)
 
 # ------
 # Endpoint: Get shortest travel time between two locations
 # GET /graph/shortest_time?start=LocationA&end=LocationB
 # ------
 @router.get("/shortest_time")
-def shortest_time(start: str, end: str):
+def shortest_time(start: str, end: str, campus_id: str = None):
     """
     Returns the shortest travel time in seconds between two campus locations.
     """
-    time_sec = campus_graph.get_shortest_time(start, end)
+    time_sec = get_campus_graph(campus_id).get_shortest_time(start, end)
     return {"start": start, "end": end, "seconds": time_sec}
 
 # ------
@@ -36,11 +91,11 @@ def shortest_time(start: str, end: str):
 # GET /graph/shortest_path?start=LocationA&end=LocationB
 # ------
 @router.get("/shortest_path")
-def shortest_path(start: str, end: str):
+def shortest_path(start: str, end: str, campus_id: str = None):
     """
     Returns the shortest path as a list of node names from start to end.
     """
-    path = campus_graph.get_shortest_path(start, end)
+    path = get_campus_graph(campus_id).get_shortest_path(start, end)
     return {"start": start, "end": end, "path": path}
 
 # ------
@@ -48,9 +103,103 @@ def shortest_path(start: str, end: str):
 # GET /graph/shortest_path_with_coords?start=LocationA&end=LocationB
 # ------
 @router.get("/shortest_path_with_coords")
-def shortest_path_with_coords(start: str, end: str):
+def shortest_path_with_coords(start: str, end: str, campus_id: str = None):
     """
     Returns the shortest path with coordinates for each node.
     """
-    path_with_coords = campus_graph.get_shortest_path_with_coords(start, end)
-    return {"start": start, "end": end, "path": path_with_coords}
\ No newline at end of file
+    path_with_coords = get_campus_graph(campus_id).get_shortest_path_with_coords(start, end)
+    return {"start": start, "end": end, "path": path_with_coords}
+
+# ------
+# Endpoint: Walking isochrone - every location reachable within a time limit from one or more origins
+# GET /graph/isochrone?origin=LocationA&origin=LocationB&seconds=600&per_origin=false
+# ------
+@router.get("/isochrone")
+def isochrone(request: Request, seconds: float, origin: List[str] = Query(...), per_origin: bool = False, campus_id: str = None):
+    """
+    Returns the locations every origin can reach within seconds (e.g. "which buildings can the whole group
+    reach in 10 minutes"), nearest first, with the slowest origin's walking time and the coordinates.
+    With per_origin=true, each origin's own reachable set is included as well.
+    Answered from the graph's presorted distance rows, so the work grows with the result, not with the campus.
+    """
+    if not math.isfinite(seconds) or seconds < 0:
+        raise HTTPException(status_code=400, detail="seconds must be a finite, non-negative number")
+    origins = list(dict.fromkeys(origin))  # repeated origins count once
+    if len(origins) > ISOCHRONE_MAX_ORIGINS:
+        raise HTTPException(status_code=400, detail=f"At most {ISOCHRONE_MAX_ORIGINS} origins are allowed")
+
+    snapshot = get_campus_snapshot(campus_id)
+    campus_graph = snapshot.graph
+    unknown = [name for name in origins if name not in campus_graph.sorted_rows]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown location: {unknown[0]}")
+
+    # derived only from the graph version, so it is cacheable like the other graph data
+    etag = graph_etag(snapshot, "isochrone", seconds, per_origin, *sorted(origins))
+    if etag_matches(request, etag):
+        return not_modified(etag, GRAPH_CACHE_CONTROL)
+
+    def with_coords(name: str, walk_seconds: float) -> dict:
+        lat, lon = campus_graph.node_coords.get(name, (None, None))
+        return {"location": name, "seconds": walk_seconds, "lat": lat, "lon": lon}
+
+    body = {
+        "seconds": seconds,
+        "origins": origins,
+        "locations": [with_coords(name, walk_seconds) for name, walk_seconds in campus_graph.common_reachable_within(origins, seconds)],
+    }
+    if per_origin:
+        body["per_origin"] = {
+            name: [with_coords(reached, walk_seconds) for reached, walk_seconds in campus_graph.reachable_within(name, seconds)]
+            for name in origins
+        }
+    return conditional_json_response(request, body, GRAPH_CACHE_CONTROL, etag)
+
+# ------
+# Endpoint: List the campuses served by this deployment and the memory used by loaded graphs
+# GET /graph/campuses
+# ------
+@router.get("/campuses")
+def list_campuses():
+    """
+    Returns all campus ids with graph data, which of them are currently loaded and their estimated memory.
+    """
+    return {
+        "default_campus_id": graph_registry.default_campus_id,
+        "campuses": graph_registry.campus_ids(),
+        "memory": graph_registry.memory_info(),
+    }
+
+# ------
+# Endpoint: Get the active graph version and when it was built
+# GET /graph/version?campus_id=...
+# ------
+@router.get("/version")
+def graph_version(campus_id: str = None):
+    """
+    Returns the version number and build time of the graph currently used to answer requests.
+    """
+    try:
+        return graph_registry.info(campus_id)
+    except UnknownCampusError:
+        raise HTTPException(status_code=404, detail=f"Unknown campus: {campus_id}")
+
+# ------
+# Endpoint: Rebuild the graph from campus.dot / nodes.csv in the background (admin only)
+# POST /graph/reload?campus_id=...
+# ------
+@router.post("/reload", status_code=202)
+def reload_graph(campus_id: str = None, x_admin_token: str = Header(None)):
+    """
+    Starts a background rebuild of the campus graph. Requests keep using the current version
+    until the new one is fully built and swapped in.
+    """
+    # constant-time compare (as bytes, so non-ASCII header values are simply a mismatch), the token can't be guessed by timing
+    if not GRAPH_ADMIN_TOKEN or not hmac.compare_digest((x_admin_token or "").encode("utf-8"), GRAPH_ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Not authorized to reload the graph")
+
+    try:
+        started = graph_registry.reload_in_background(campus_id)
+    except UnknownCampusError:
+        raise HTTPException(status_code=404, detail=f"Unknown campus: {campus_id}")
+    return {"reload_started": started, **graph_registry.info(campus_id)}
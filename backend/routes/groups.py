@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from database import get_db_connection # function to get a database connection
+from http_cache import data_versions # invalidates cached list-groups responses
+from tokens import get_current_user_id # user id from the signed session token
+from group_roles import group_roles # cached creator/member lookups for authorization
+from live_updates import live_updates # pushes recomputed meeting times to subscribed members
 import random # for generating random group codes
 import string # for generating random group codes
 
@@ -7,6 +11,7 @@ import string # for generating random group codes
 router = APIRouter()
 
 # groups.py is for all creator-related group operations
+# every endpoint acts as the user in the session token from login/signup (Authorization: Bearer <token>)
 
 # --------
 # Helper function to generate a 6-character alphanumeric group code
@@ -15,13 +20,46 @@ def generate_group_code(length=6):
     """Generate a random alphanumeric group code for users to join group"""
     return "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
+# --------
+# Helper function to get the user ids of all members of a group
+# Used to invalidate the members' cached group lists after a change (call before commit, bump after)
+# --------
+def get_group_member_ids(cursor, group_id):
+    cursor.execute("SELECT user_id FROM GroupMemberships WHERE group_id = ?", group_id)
+    return [row[0] for row in cursor.fetchall()]
+
+# --------
+# Helper function: the acting user is the one in the session token; the older user id query parameters
+# are still accepted for compatibility but must name that same user
+# --------
+def check_acting_user(current_user_id: int, claimed_user_id):
+    if claimed_user_id is not None and claimed_user_id != current_user_id:
+        raise HTTPException(status_code=403, detail="User id does not match the signed-in user")
+
+# --------
+# Helper function: the requesting user's role in a group ("creator" or "member") from the role cache
+# Raises 404 if the group doesn't exist and 403 if the user isn't in it (or isn't the creator when creator_only)
+# --------
+def require_group_role(group_id: int, user_id: int, creator_only: bool, forbidden_detail: str) -> str:
+    roles = group_roles.get(group_id, get_db_connection)
+    if roles is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    role = roles.role(user_id)
+    if role is None or (creator_only and role != "creator"):
+        raise HTTPException(status_code=403, detail=forbidden_detail)
+    return role
+
 # --------
 # Endpoint: Change the group's code (creator only) for letting users join the group
 # POST /groups/{group_id}/change_code
 # --------
 @router.post("/{group_id}/change_code")
-def change_group_code(group_id: int, creator_user_id: int = Query(...)):
-    
+def change_group_code(group_id: int, creator_user_id: int = Query(None), current_user_id: int = Depends(get_current_user_id)):
+    check_acting_user(current_user_id, creator_user_id)
+
+    # Check that the group exists (404) and that the signed-in user is its creator (403)
+    require_group_role(group_id, current_user_id, creator_only=True, forbidden_detail="Only the group creator can change the group code")
+
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -29,25 +67,15 @@ def change_group_code(group_id: int, creator_user_id: int = Query(...)):
         # Generate a new group code
         new_code = generate_group_code()
 
-        # Check if the group exists and if the creator_user_id matches the group's creator
-        cursor.execute("SELECT creator_user_id FROM Groups WHERE group_id = ?", group_id)
-        result = cursor.fetchone()
-        
-        # If no group is found with the given group_id, raise a 404 error
-        if not result:
-            raise HTTPException(status_code=404, detail="Group not found")
-        
-        # If the creator_user_id does not match the group's creator, raise a 403 error
-        if result[0] != creator_user_id:
-            raise HTTPException(status_code=403, detail="Only the group creator can change the group code")
-
         # Update the group code in the database
         cursor.execute("UPDATE Groups SET group_code = ? WHERE group_id = ?", new_code, group_id)
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Group not found")
 
+        member_ids = get_group_member_ids(cursor, group_id)
         conn.commit() # finalize changes to the database
+        data_versions.bump("user_groups", *member_ids) # every member's group list shows the code
     finally:
         conn.close() # always close the database connection
 
@@ -58,8 +86,10 @@ def change_group_code(group_id: int, creator_user_id: int = Query(...)):
 # POST /groups/create
 # --------
 @router.post("/create")
-def create_group(group_name: str = Query(...), creator_user_id: int = Query(...)):
-    
+def create_group(group_name: str = Query(...), creator_user_id: int = Query(None), current_user_id: int = Depends(get_current_user_id)):
+    check_acting_user(current_user_id, creator_user_id)
+    creator_user_id = current_user_id
+
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -88,6 +118,7 @@ def create_group(group_name: str = Query(...), creator_user_id: int = Query(...)
         creator_name = cursor.fetchone()[0]
         
         conn.commit() # commit the transaction
+        data_versions.bump("user_groups", creator_user_id)
     finally:
         conn.close() # close the database connection
     
@@ -105,8 +136,13 @@ def create_group(group_name: str = Query(...), creator_user_id: int = Query(...)
 # GET /groups/{group_id}/displayInfo
 # --------
 @router.get("/{group_id}/displayInfo")
-def get_group_info(group_id: int, requester_user_id: int):
-    
+def get_group_info(group_id: int, requester_user_id: int = None, current_user_id: int = Depends(get_current_user_id)):
+    check_acting_user(current_user_id, requester_user_id)
+    requester_user_id = current_user_id
+
+    # Check if requester is creator or a member of the group
+    require_group_role(group_id, requester_user_id, creator_only=False, forbidden_detail="Not authorized to view this group")
+
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -128,16 +164,6 @@ def get_group_info(group_id: int, requester_user_id: int):
         # Unpack the group information into individual variables
         group_name, group_code, creator_id, creator_name = group_row
 
-        # Check if requester is creator or a member of the group
-        if requester_user_id != creator_id:
-            cursor.execute("""
-                SELECT 1 FROM GroupMemberships
-                WHERE group_id = ? AND user_id = ?
-            """, group_id, requester_user_id)
-
-            if not cursor.fetchone():
-                raise HTTPException(status_code=403, detail="Not authorized to view this group")
-
         # Get all members of the group (user_id and name)
         cursor.execute("""
             SELECT u.user_id, u.name
@@ -172,31 +198,28 @@ def get_group_info(group_id: int, requester_user_id: int):
 # POST /groups/{group_id}/remove_member
 # --------
 @router.delete("/{group_id}/remove_member")
-def remove_member(group_id: int, creator_user_id: int = Query(...), member_user_id: int = Query(...)):
-    
+def remove_member(group_id: int, member_user_id: int = Query(...), creator_user_id: int = Query(None),
+                  current_user_id: int = Depends(get_current_user_id)):
+    check_acting_user(current_user_id, creator_user_id)
+
+    # Check that the group exists (404) and that the signed-in user is its creator (403)
+    require_group_role(group_id, current_user_id, creator_only=True, forbidden_detail="Only the group creator can remove members")
+
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        # Check if the group exists and if the creator_user_id matches the group's creator
-        cursor.execute("SELECT creator_user_id FROM Groups WHERE group_id = ?", group_id)
-        result = cursor.fetchone()
-        
-        # If no group is found with the given group_id, raise a 404 error
-        if not result:
-            raise HTTPException(status_code=404, detail="Group not found")
-        
-        # If the creator_user_id does not match the group's creator, raise a 403 error
-        if result[0] != creator_user_id:
-            raise HTTPException(status_code=403, detail="Only the group creator can remove members")
-
         # Remove the member from the group in the database
+        member_ids = get_group_member_ids(cursor, group_id)
         cursor.execute("DELETE FROM GroupMemberships WHERE group_id = ? AND user_id = ?", group_id, member_user_id)
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Member not found in the group")
 
         conn.commit() # finalize changes to the database
+        group_roles.invalidate(group_id)
+        data_versions.bump("user_groups", *member_ids) # removed member and everyone still listing them
+        live_updates.mark_dirty([group_id]) # the group's meeting times no longer include the removed member
 
     finally:
         conn.close() # always close connection
@@ -208,10 +231,13 @@ def remove_member(group_id: int, creator_user_id: int = Query(...), member_user_
 # POST /groups/{group_id}/join
 # --------
 @router.post("/{group_id}/join")
-def join_group(group_id: int, user_id: int = Query(...), group_code: str = Query(...)):
+def join_group(group_id: int, group_code: str = Query(...), user_id: int = Query(None), current_user_id: int = Depends(get_current_user_id)):
     """
-    Adds a user to a group if the group_code matches and the user is not already a member.
+    Adds the signed-in user to a group if the group_code matches and the user is not already a member.
     """
+    check_acting_user(current_user_id, user_id)
+    user_id = current_user_id
+
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -261,6 +287,9 @@ def join_group(group_id: int, user_id: int = Query(...), group_code: str = Query
         members = [{"user_id": str(uid), "name": name, "is_creator": uid == creator_id} for uid, name in members_rows]
 
         conn.commit()
+        group_roles.invalidate(group_id)
+        data_versions.bump("user_groups", *[uid for uid, _name in members_rows]) # includes the new member
+        live_updates.mark_dirty([group_id]) # the group's meeting times now include the new member
 
     finally:
         conn.close()
@@ -1,11 +1,24 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from database import get_db_connection # function to get a database connection
+from http_cache import PRIVATE_CACHE_CONTROL, conditional_json_response, data_versions, etag_matches, not_modified
 from schemas import TimeSlotCreate, TimeSlotResponse # format for user data
+from capture import capture_data, capturing # opt-in request capture for replay
+from live_updates import live_updates # pushes recomputed meeting times to subscribed members
 from typing import List
 
 # create a router for schedule-related endpoints
 router = APIRouter()
 
+# --------
+# Helper function: mark the meeting times of the user's groups on that day as changed for live subscribers
+# Only queries the user's groups when some group has subscribers at all
+# --------
+def notify_schedule_change(cursor, user_id: int, day_of_week: int):
+    if not live_updates.watching():
+        return
+    cursor.execute("SELECT group_id FROM GroupMemberships WHERE user_id = ?", user_id)
+    live_updates.mark_dirty([row[0] for row in cursor.fetchall()], day_of_week)
+
 # --------
 # Add availability time slot for a user
 # POST /schedule/{user_id}/add
@@ -31,8 +44,13 @@ def add_time_slot(user_id: int, slot: TimeSlotCreate):
             WHERE user_id = ? AND day_of_week = ?
         """, user_id, slot.day_of_week)
         
+        existing_slots = cursor.fetchall()
+        if capturing():
+            capture_data("request", {"day_of_week": slot.day_of_week, "start_seconds": slot.start_seconds, "end_seconds": slot.end_seconds, "location": slot.location})
+            capture_data("existing_slots", [[existing_start, existing_end] for existing_start, existing_end in existing_slots])
+
         # check if the new time slot overlaps with any existing time slots for the same user and day
-        for existing_start, existing_end in cursor.fetchall():
+        for existing_start, existing_end in existing_slots:
             if existing_start < slot.end_seconds and existing_end > slot.start_seconds:
                 raise HTTPException(status_code=400, detail="Time slot overlaps existing slot")
         
@@ -46,6 +64,8 @@ def add_time_slot(user_id: int, slot: TimeSlotCreate):
         # get the generated availability_id from the database
         availability_id = cursor.fetchone()[0]
         conn.commit() # finalize changes to the database
+        data_versions.bump("schedule", user_id) # invalidate cached copies of this user's schedule
+        notify_schedule_change(cursor, user_id, slot.day_of_week)
         
         # return the created time slot with its new availability_id
         return TimeSlotResponse(
@@ -64,7 +84,12 @@ def add_time_slot(user_id: int, slot: TimeSlotCreate):
 # GET /schedule/{user_id}
 # --------
 @router.get("/{user_id}", response_model=List[TimeSlotResponse])
-def get_schedule(user_id: int):
+def get_schedule(user_id: int, request: Request):
+    
+    # answer 304 straight away if the client's copy is still current (no database round trip)
+    etag = data_versions.etag("schedule", user_id)
+    if etag and etag_matches(request, etag):
+        return not_modified(etag, PRIVATE_CACHE_CONTROL)
     
     # connect to the database
     conn = get_db_connection()
@@ -82,7 +107,7 @@ def get_schedule(user_id: int):
 
         # fetch all rows returned by the query and convert them into a list of TimeSlotResponse objects to return as the API response
         rows = cursor.fetchall()
-        return [
+        slots = [
             TimeSlotResponse(
                 availability_id=row[0],
                 day_of_week=row[1],
@@ -90,11 +115,16 @@ def get_schedule(user_id: int):
                 end_seconds=row[3],
                 location=row[4],
                 purpose=row[5]
-            )
+            ).model_dump()
             for row in rows
         ]
+        if capturing():
+            capture_data("schedule", [[row[1], row[2], row[3], row[4]] for row in rows])  # day, start, end, location
     finally:
         conn.close() # always close the database connection
+    
+    # sent with an ETag (hashed from the body if local data versions aren't trusted) so polling clients get 304s
+    return conditional_json_response(request, slots, PRIVATE_CACHE_CONTROL, etag)
 
 # --------
 # Delete availability slot
@@ -109,10 +139,14 @@ def delete_time_slot(availability_id: int):
     
     try:
         # delete the time slot with the given availability_id from the database
-        cursor.execute("DELETE FROM Availability WHERE availability_id = ?", availability_id)
-        if cursor.rowcount == 0:
+        # OUTPUT DELETED.user_id, DELETED.day_of_week tells us whose schedule changed and on which day
+        cursor.execute("DELETE FROM Availability OUTPUT DELETED.user_id, DELETED.day_of_week WHERE availability_id = ?", availability_id)
+        deleted = cursor.fetchone()
+        if not deleted:
             raise HTTPException(status_code=404, detail="Time slot not found")
         conn.commit() # finalize changes to the database
+        data_versions.bump("schedule", deleted[0]) # invalidate cached copies of this user's schedule
+        notify_schedule_change(cursor, deleted[0], deleted[1])
     finally:
         conn.close() # always close the database connection
     
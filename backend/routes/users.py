@@ -1,22 +1,31 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool  # run blocking database work without blocking the event loop
 from database import get_db_connection # function to get a database connection
-from auth import hash_password, verify_password # password utilities
+from auth import PASSWORD_HASH_RETRY_AFTER, PasswordHasherBusy, password_hasher # password utilities
+from tokens import issue_token # signed session tokens
 from schemas import UserCreate, UserLogin, UserResponse # format for user data
+from http_cache import PRIVATE_CACHE_CONTROL, conditional_json_response, data_versions, etag_matches, not_modified
 
 # create a router for user-related endpoints
 router = APIRouter()
 
 # ---- Signup ----
-@router.post("/signup", response_model=UserResponse)
-def signup(user: UserCreate):
+# Argon2 runs on the dedicated password hasher (auth.password_hasher), not in the request threadpool,
+# so a burst of signups/logins can't starve other endpoints; when its queue is full the request gets a 503
+def find_user_id_by_email(email: str):
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("SELECT user_id FROM Users WHERE email = ?", user.email)
-        if cursor.fetchone():
-            raise HTTPException(status_code=400, detail="Email already registered")
+        cursor.execute("SELECT user_id FROM Users WHERE email = ?", email)
+        row = cursor.fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
 
-        hashed_pwd = hash_password(user.password)
+def insert_user(user: UserCreate, hashed_pwd: str) -> str:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
         cursor.execute("""
             INSERT INTO Users (name, email, password_hash, home_location)
             OUTPUT INSERTED.user_id
@@ -26,44 +35,101 @@ def signup(user: UserCreate):
         conn.commit()
     finally:
         conn.close()
+    return user_id
+
+def hasher_busy_error() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many sign-in requests right now, please try again shortly",
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+    )
+
+@router.post("/signup", response_model=UserResponse)
+async def signup(user: UserCreate):
+    if await run_in_threadpool(find_user_id_by_email, user.email) is not None:
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    try:
+        hashed_pwd = await password_hasher.hash(user.password)
+    except PasswordHasherBusy:
+        raise hasher_busy_error()
+
+    user_id = await run_in_threadpool(insert_user, user, hashed_pwd)
+    token, expires_at = issue_token(user_id)
 
     return UserResponse(
         user_id=user_id,
         name=user.name,
         email=user.email,
-        home_location=user.home_location
+        home_location=user.home_location,
+        token=token,
+        token_expires_at=expires_at
     )
 
 # ---- Login ----
-@router.post("/login", response_model=UserResponse)
-def login(credentials: UserLogin):
+def find_user_by_email(email: str):
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
         cursor.execute(
             "SELECT user_id, name, email, password_hash, home_location FROM Users WHERE email = ?", 
-            credentials.email
+            email
         )
-        row = cursor.fetchone()
-        if not row:
-            raise HTTPException(status_code=400, detail="Invalid email or password")
-        user_id, name, email, hashed_pwd, home_location = row
+        return cursor.fetchone()
+    finally:
+        conn.close()
 
-        if not verify_password(credentials.password, hashed_pwd):
-            raise HTTPException(status_code=400, detail="Invalid email or password")
+def update_password_hash(user_id, hashed_pwd: str):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE Users SET password_hash = ? WHERE user_id = ?", hashed_pwd, user_id)
+        conn.commit()
     finally:
         conn.close()
 
+@router.post("/login", response_model=UserResponse)
+async def login(credentials: UserLogin):
+    row = await run_in_threadpool(find_user_by_email, credentials.email)
+    if not row:
+        raise HTTPException(status_code=400, detail="Invalid email or password")
+    user_id, name, email, hashed_pwd, home_location = row
+
+    try:
+        verified, new_hash = await password_hasher.verify_and_update(credentials.password, hashed_pwd)
+    except PasswordHasherBusy:
+        raise hasher_busy_error()
+    if not verified:
+        raise HTTPException(status_code=400, detail="Invalid email or password")
+
+    # the stored hash used older Argon2 parameters: store the rehashed password (a failure here must not block the login)
+    if new_hash:
+        try:
+            await run_in_threadpool(update_password_hash, user_id, new_hash)
+            print(f"[INFO] Upgraded password hash parameters for user {user_id}")
+        except Exception as e:
+            print(f"[WARNING] Could not store upgraded password hash for user {user_id}: {e}")
+
+    # signed token carrying the user id, so later requests are authorized without a database lookup
+    token, expires_at = issue_token(user_id)
+
     return UserResponse(
         user_id=str(user_id),
         name=name,
         email=email,
-        home_location=home_location
+        home_location=home_location,
+        token=token,
+        token_expires_at=expires_at
     )
 
 # ---- List User Groups ----
 @router.get("/{user_id}/list-groups")
-def list_user_groups(user_id: int):
+def list_user_groups(user_id: int, request: Request):
+    # answer 304 straight away if none of the user's groups changed since the client's copy (no database round trip)
+    etag = data_versions.etag("user_groups", user_id)
+    if etag and etag_matches(request, etag):
+        return not_modified(etag, PRIVATE_CACHE_CONTROL)
+
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
@@ -108,10 +174,12 @@ def list_user_groups(user_id: int):
                 "code": group_code,
                 "members": members
             })
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in list_user_groups: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     finally:
         conn.close()
 
-    return groups
\ No newline at end of file
+    return conditional_json_response(request, groups, PRIVATE_CACHE_CONTROL, etag)
\ No newline at end of file
@@ -32,6 +32,8 @@ class UserResponse(BaseModel):
     name: str
     email: EmailStr
     home_location: str
+    token: Optional[str] = None # signed session token, sent back as Authorization: Bearer <token> (login/signup only)
+    token_expires_at: Optional[int] = None # Unix seconds
     
 # ------
 # Schedule / Availability related schemas
@@ -110,4 +112,99 @@ class CommonSlotWithLocationsWithName(CommonSlotWithWalk):
     pass
 
 class GroupFreeTimesResponseWithName(GroupFreeTimesWithWalkResponse):
-    pass
\ No newline at end of file
+    pass
+
+# --------
+# Quorum slot: like a common slot, but only for the members who can attend
+# --------
+class QuorumSlot(CommonSlotWithWalk):
+    attendee_count: int
+    absent_user_ids: List[int]  # members who are busy for part of the slot
+
+# --------
+# Response for a group's quorum meeting times (at least min_attendees of member_count free), ranked by attendance
+# --------
+class GroupQuorumTimesResponse(BaseModel):
+    day_of_week: int
+    member_count: int
+    min_attendees: int
+    slots: List[QuorumSlot]
+
+# --------
+# Ranked (start time, building) meeting proposal: the meeting at its earliest feasible start on the time grid,
+# its fairness score in seconds (lower is better) and the latest start every member can still make
+# --------
+class MeetingProposal(CommonSlotWithWalk):
+    score: float
+    latest_start_seconds: int
+    latest_start_hhmm: str
+
+class GroupMeetingProposalsResponse(BaseModel):
+    day_of_week: int
+    meeting_duration: int
+    proposals: List[MeetingProposal]
+
+# --------
+# Dashboard batch response: best meeting times for every group of a user, for each requested day
+# --------
+class GroupDashboardMeetingTimes(BaseModel):
+    group_id: int
+    group_name: str
+    member_count: int
+    days: List[GroupFreeTimesResponseWithName]
+
+class DashboardMeetingTimesResponse(BaseModel):
+    user_id: int
+    meeting_duration: int
+    groups: List[GroupDashboardMeetingTimes]
+
+# --------
+# Compact algorithm response, each distinct walking path is sent only once
+# --------
+
+# --------
+# One distinct walking path, referenced from slots by path_id
+# --------
+class CompactPath(BaseModel):
+    path_id: int
+    nodes: List[int]  # indices into the response's locations table, in walking order
+    polyline: Optional[str] = None  # encoded polyline of the path (only with geometry=polyline)
+
+# --------
+# User location for a compact slot, the path is a reference into the paths table
+# --------
+class CompactUserLocationSlot(BaseModel):
+    user_id: int
+    location: str
+    walk_time: int  # in seconds
+    path_id: int
+
+# --------
+# Common slot in the compact response
+# --------
+class CompactCommonSlot(BaseModel):
+    start_seconds: int
+    end_seconds: int
+    start_hhmm: str
+    end_hhmm: str
+    meeting_location: str
+    user_locations: List[CompactUserLocationSlot]
+
+# --------
+# Group member name, sent once instead of once per slot
+# --------
+class CompactMember(BaseModel):
+    user_id: int
+    name: str
+
+# --------
+# Compact response for a group's free times: members, location/coordinate tables and distinct paths
+# --------
+class GroupFreeTimesCompactResponse(BaseModel):
+    day_of_week: int
+    geometry: str  # "nodes" or "polyline"
+    members: List[CompactMember]
+    locations: List[str]
+    coords: Optional[List[List[float]]] = None  # [lat, lon] for each entry in locations (only with geometry=nodes)
+    paths: List[CompactPath]
+    slots: List[CompactCommonSlot]
@@ -0,0 +1,46 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+
+class SingleFlight:
+
+    # ------
+    # Coalesces concurrent identical calls: while a call for a key is running, other callers with
+    # the same key wait for it and receive its result (or its exception) instead of recomputing it
+    # Nothing is cached once the call finishes, so later requests always see fresh data
+    # ------
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Runs fn() unless a call with the same key is already in flight, in which case
+        this waits for that call and returns its result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = Future()
+                self._calls[key] = call
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of distinct keys currently being computed."""
+        return len(self._calls)
@@ -0,0 +1,48 @@
+import os
+import pytest
+from bench.synthetic import GRAPH_SIZES, generate_campus
+from graph.graph_utils import CampusGraph
+
+# ------
+# Shared campus graphs for the meeting-algorithm tests
+# ------
+
+# hand-built campus (walking seconds of every directed edge): Hall A-D are connected both ways, nobody can walk
+# to Island (it only has a way out) and Dead End can be reached from Hall B but has no way on
+TINY_CAMPUS_EDGES = [
+    ("Hall A", "Hall B", 120), ("Hall B", "Hall A", 120),
+    ("Hall B", "Hall C", 180), ("Hall C", "Hall B", 180),
+    ("Hall C", "Hall D", 90), ("Hall D", "Hall C", 90),
+    ("Hall A", "Hall D", 400), ("Hall D", "Hall A", 400),
+    ("Island", "Hall A", 60),
+    ("Hall B", "Dead End", 30),
+]
+
+
+def write_campus(data_dir: str, edges: list) -> str:
+    """Writes campus.dot and nodes.csv for the given (start, end, seconds) edges and returns data_dir."""
+    os.makedirs(data_dir, exist_ok=True)
+    names = list(dict.fromkeys(name for start, end, _seconds in edges for name in (start, end)))
+    with open(os.path.join(data_dir, "campus.dot"), "w", encoding="utf-8") as f:
+        f.write("digraph campus {\n")
+        for start, end, seconds in edges:
+            f.write(f'\t"{start}" -> "{end}" [seconds={seconds}];\n')
+        f.write("}\n")
+    with open(os.path.join(data_dir, "nodes.csv"), "w", encoding="utf-8") as f:
+        f.write("Location Name,Latitude,Longitude\n")
+        for index, name in enumerate(names):
+            f.write(f"{name},{43.07 + index * 0.001},{-89.40 - index * 0.001}\n")
+    return data_dir
+
+
+@pytest.fixture(scope="session")
+def tiny_campus(tmp_path_factory) -> CampusGraph:
+    return CampusGraph(write_campus(str(tmp_path_factory.mktemp("tiny_campus")), TINY_CAMPUS_EDGES))
+
+
+@pytest.fixture(scope="session")
+def synthetic_campus(tmp_path_factory):
+    """A generated small campus as (CampusGraph, building names)."""
+    data_dir = str(tmp_path_factory.mktemp("synthetic_campus"))
+    names = generate_campus(data_dir, GRAPH_SIZES["small"], seed=0)
+    return CampusGraph(data_dir), names
@@ -0,0 +1,46 @@
+import pytest
+from bench.synthetic import GRAPH_SIZES, busy_slots_for_day, generate_campus, generate_group
+from graph.graph_utils import CampusGraph
+from meeting import compute_meeting_slots
+from routes.algorithm import verify_fast_path_contract
+
+# ------
+# Contract test for the pre-serialized best_meeting_times response: for generated campuses and groups, the bytes
+# written by compute_meeting_times_json must match the response built through the Pydantic schemas exactly
+# ------
+
+MEETING_DURATION = 30
+
+
+@pytest.fixture(scope="module")
+def campus(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("campus")
+    names = generate_campus(str(data_dir), GRAPH_SIZES["small"], seed=0)
+    return CampusGraph(str(data_dir)), names
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("day_of_week", [0, 2, 5])
+def test_fast_path_matches_schema_response(campus, seed, day_of_week):
+    campus_graph, names = campus
+    members = generate_group(names, 6, seed=seed)
+    verify_fast_path_contract(campus_graph, busy_slots_for_day(members, day_of_week), day_of_week, MEETING_DURATION)
+
+
+def test_fast_path_matches_schema_response_without_path(campus):
+    campus_graph, names = campus
+    members = generate_group(names, 4, seed=3)
+    user_busy_slots = busy_slots_for_day(members, 2)
+    # a home location that is not on the graph: that member has no path (walk time 0, empty path) to any building
+    user_busy_slots[1]["home_location"] = "Not On The Campus Graph"
+    user_busy_slots[1]["slots_with_names"] = []
+
+    slots = compute_meeting_slots(campus_graph, user_busy_slots, MEETING_DURATION)
+    assert any(user_location["path"] == [] for slot in slots for user_location in slot["user_locations"])
+    verify_fast_path_contract(campus_graph, user_busy_slots, 2, MEETING_DURATION)
+
+
+def test_fast_path_matches_schema_response_for_one_member(campus):
+    campus_graph, names = campus
+    members = generate_group(names, 1, seed=4)
+    verify_fast_path_contract(campus_graph, busy_slots_for_day(members, 1), 1, MEETING_DURATION)
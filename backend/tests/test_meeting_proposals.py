@@ -0,0 +1,81 @@
+import math
+import pytest
+from bench.synthetic import busy_slots_for_day, generate_group
+from meeting import compute_free_intervals, compute_meeting_proposals, user_commitments_around
+
+# ------
+# compute_meeting_proposals (bounded heap + lower-bound pruning) against a brute-force ranking of every
+# feasible (free interval, building) option
+# ------
+
+
+def brute_force_proposals(campus_graph, user_busy_slots: dict, meeting_duration: int, limit: int, step_minutes: int) -> list:
+    """Every option scored in full, sorted by (score, start); returns [(building, start, latest, score), ...]."""
+    duration_seconds, step_seconds = meeting_duration * 60, step_minutes * 60
+    options = []
+    for free_start, free_end in compute_free_intervals(user_busy_slots):
+        if free_end - free_start < duration_seconds:
+            continue
+        commitments = [user_commitments_around(info, free_start, free_end) for info in user_busy_slots.values()]
+        for sequence, building in enumerate(campus_graph.meeting_candidates()):
+            earliest, latest, walks = free_start, free_end - duration_seconds, []
+            for previous_location, free_from, next_location, next_start in commitments:
+                walk = campus_graph.all_pairs.get(previous_location, {}).get(building)
+                walk_on = campus_graph.all_pairs.get(building, {}).get(next_location) if next_location is not None else 0
+                if walk is None or walk_on is None:
+                    break
+                walks.append(walk)
+                earliest = max(earliest, free_from + walk)
+                latest = min(latest, next_start - walk_on - duration_seconds)
+            if len(walks) < len(commitments):
+                continue  # some user can't get there (or on from there)
+            start = math.ceil(earliest / step_seconds) * step_seconds
+            if start > latest:
+                continue
+            average = sum(walks) / len(walks)
+            score = average + 0.5 * (sum((walk - average) ** 2 for walk in walks) / len(walks)) ** 0.5
+            options.append((score, start, free_start, sequence, building, int(latest)))
+    options.sort()
+    return [(building, start, latest, round(score, 1)) for score, start, _free_start, _sequence, building, latest in options[:limit]]
+
+
+def summarize(proposals: list) -> list:
+    return [(p["meeting_location"], p["start_seconds"], p["latest_start_seconds"], p["score"]) for p in proposals]
+
+
+def member(name: str, home_location: str, slots: list) -> dict:
+    return {"home_location": home_location, "name": name, "slots_with_names": [(start, end, loc, name) for start, end, loc in slots]}
+
+
+def test_unreachable_buildings_are_never_proposed(tiny_campus):
+    user_busy_slots = {
+        1: member("a", "Hall A", [(3600, 7200, "Hall C")]),
+        2: member("b", "Hall D", [(5400, 9000, "Hall B")]),
+    }
+    proposals = compute_meeting_proposals(tiny_campus, user_busy_slots, 30, limit=50)
+    locations = {p["meeting_location"] for p in proposals}
+    assert "Island" not in locations  # nobody can walk there
+    assert all(p["score"] > 0 for p in proposals)  # both users start at different halls, every walk takes time
+    # Dead End can be reached but not left: only the evening interval (no next commitment) can use it
+    assert all(p["start_seconds"] >= 9000 for p in proposals if p["meeting_location"] == "Dead End")
+    assert summarize(proposals) == brute_force_proposals(tiny_campus, user_busy_slots, 30, 50, 5)
+
+
+@pytest.mark.parametrize("limit", [1, 3, 10])
+def test_proposals_match_brute_force_on_tiny_campus(tiny_campus, limit):
+    user_busy_slots = {
+        1: member("a", "Hall A", [(1800, 5400, "Hall B"), (9000, 12600, "Hall D")]),
+        2: member("b", "Hall C", [(0, 3000, "Hall D"), (10800, 14400, "Hall A")]),
+        3: member("c", "Island", [(7200, 8000, "Hall C")]),
+    }
+    proposals = compute_meeting_proposals(tiny_campus, user_busy_slots, 20, limit=limit)
+    assert summarize(proposals) == brute_force_proposals(tiny_campus, user_busy_slots, 20, limit, 5)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+@pytest.mark.parametrize("limit", [1, 5, 20])
+def test_proposals_match_brute_force_on_generated_campus(synthetic_campus, seed, limit):
+    campus_graph, names = synthetic_campus
+    user_busy_slots = busy_slots_for_day(generate_group(names, 5, seed=seed), 2)
+    proposals = compute_meeting_proposals(campus_graph, user_busy_slots, 30, limit=limit, step_minutes=10)
+    assert summarize(proposals) == brute_force_proposals(campus_graph, user_busy_slots, 30, limit, 10)
@@ -0,0 +1,90 @@
+import pytest
+from meeting import DAY_END, compute_meeting_slots, compute_quorum_meeting_slots, member_free_intervals, quorum_runs
+
+# ------
+# Quorum meeting search ("at least K of N members free") on hand-built schedules
+# ------
+
+
+def member(name: str, home_location: str, slots: list) -> dict:
+    return {"home_location": home_location, "name": name, "slots_with_names": [(start, end, loc, name) for start, end, loc in slots]}
+
+
+def free_members(user_busy_slots: dict, start: int, window_seconds: int) -> set:
+    """Members free for the whole window [start, start + window_seconds], by direct check."""
+    return {
+        user_id for user_id, info in user_busy_slots.items()
+        if start + window_seconds <= DAY_END
+        and not any(busy_start < start + window_seconds and start < busy_end for busy_start, busy_end, _loc, _name in info["slots_with_names"])
+    }
+
+
+def test_quorum_runs_counts_and_boundaries():
+    # start times that fit a 30 minute window: member 1 [0, 1800], member 2 [1800, 5400], member 3 [0, 5400]
+    free_by_member = {1: [(0, 3600)], 2: [(1800, 7200)], 3: [(0, 7200)]}
+    assert quorum_runs(free_by_member, 1800, 2) == [(0, 1800, 2), (1800, 1801, 3), (1801, 5401, 2)]
+    assert quorum_runs(free_by_member, 1800, 3) == [(1800, 1801, 3)]
+    assert quorum_runs({1: [(0, 1000)]}, 1800, 1) == []  # too short for the window
+
+
+def test_quorum_runs_match_direct_check():
+    user_busy_slots = {
+        1: member("a", "Hall A", [(1800, 5400, "Hall B"), (9000, 12600, "Hall D")]),
+        2: member("b", "Hall C", [(0, 3000, "Hall D"), (10800, 14400, "Hall A")]),
+        3: member("c", "Hall B", [(7200, 8000, "Hall C"), (20000, 25000, "Hall A")]),
+        4: member("d", "Hall D", [(4000, 9000, "Hall A")]),
+    }
+    free_by_member = {user_id: member_free_intervals(info["slots_with_names"]) for user_id, info in user_busy_slots.items()}
+    window_seconds = 1800
+    for min_attendees in range(1, 5):
+        runs = quorum_runs(free_by_member, window_seconds, min_attendees)
+        covered = set()
+        for run_start, run_end, count in runs:
+            assert run_start < run_end and count >= min_attendees
+            for start in (run_start, (run_start + run_end) // 2, run_end - 1):
+                assert len(free_members(user_busy_slots, start, window_seconds)) == count
+            covered.update(range(run_start, run_end, 60))
+        # every start time (on a minute grid) with enough free members lies in a run
+        for start in range(0, DAY_END, 60):
+            if len(free_members(user_busy_slots, start, window_seconds)) >= min_attendees:
+                assert any(run_start <= start < run_end for run_start, run_end, _count in runs)
+
+
+def test_all_members_quorum_matches_best_meeting_times(tiny_campus):
+    user_busy_slots = {
+        1: member("a", "Hall A", [(1800, 5400, "Hall B"), (9000, 12600, "Hall D")]),
+        2: member("b", "Hall C", [(0, 3000, "Hall D"), (10800, 14400, "Hall A")]),
+        3: member("c", "Hall B", [(7200, 8000, "Hall C")]),
+    }
+    quorum = compute_quorum_meeting_slots(tiny_campus, user_busy_slots, 30, len(user_busy_slots), limit=50)
+    regular = compute_meeting_slots(tiny_campus, user_busy_slots, 30)
+
+    def key(slot):
+        return (slot["start_seconds"], slot["end_seconds"], slot["meeting_location"], [u["walk_time"] for u in slot["user_locations"]])
+
+    assert regular
+    assert sorted(map(key, quorum)) == sorted(map(key, regular))
+    assert all(slot["attendee_count"] == 3 and slot["absent_user_ids"] == [] for slot in quorum)
+
+
+@pytest.mark.parametrize("limit", [1, 2])
+def test_candidate_cutoff_keeps_the_best_slots(tiny_campus, limit):
+    # twelve members with staggered classes give far more than limit * 10 runs
+    locations = ["Hall A", "Hall B", "Hall C", "Hall D"]
+    user_busy_slots = {
+        user_id: member(f"m{user_id}", locations[user_id % 4], [(user_id * 2400, user_id * 2400 + 1500, locations[(user_id + 1) % 4])])
+        for user_id in range(1, 13)
+    }
+    free_by_member = {user_id: member_free_intervals(info["slots_with_names"]) for user_id, info in user_busy_slots.items()}
+    assert len(quorum_runs(free_by_member, 1800, 8)) > limit * 10
+
+    limited = compute_quorum_meeting_slots(tiny_campus, user_busy_slots, 30, 8, limit=limit)
+    unlimited = compute_quorum_meeting_slots(tiny_campus, user_busy_slots, 30, 8, limit=1000)
+    assert [slot["start_seconds"] for slot in limited] == [slot["start_seconds"] for slot in unlimited[:limit]]
+    # the best slot has the highest attendance any window of the meeting's length can get
+    best_attendance = max(len(free_members(user_busy_slots, start, 1800)) for start in range(0, DAY_END, 60))
+    assert limited[0]["attendee_count"] == best_attendance
+    for slot in limited:
+        attendees = free_members(user_busy_slots, slot["start_seconds"], 1800)
+        assert slot["attendee_count"] == len(attendees)
+        assert set(slot["absent_user_ids"]) == set(user_busy_slots) - attendees
@@ -0,0 +1,82 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from fastapi import Header, HTTPException
+
+# ------
+# Signed session tokens
+# Login/signup issue a token carrying the user id and an expiry, signed with HMAC-SHA256.
+# Routes verify it from the Authorization: Bearer header without touching the database.
+# Format: base64url(payload JSON) + "." + base64url(signature)
+# ------
+
+# Secret used to sign tokens. Must be set (and identical on every worker) in production; without it a random
+# per-process secret is used, so tokens stop working after a restart or when served by another worker
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+if not SESSION_SECRET:
+    print("[WARNING] SESSION_SECRET is not set, using a random secret (sessions will not survive a restart)")
+    SESSION_SECRET = secrets.token_urlsafe(32)
+_SECRET_BYTES = SESSION_SECRET.encode("utf-8")
+
+# how long a token stays valid (seconds), default 7 days
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+class InvalidToken(ValueError):
+    """Raised when a token is malformed, has a bad signature or has expired."""
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_SECRET_BYTES, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue_token(user_id: int, ttl_seconds: int = SESSION_TTL_SECONDS) -> tuple[str, int]:
+    """Returns (token, expires_at) for user_id, expires_at in Unix seconds."""
+    expires_at = int(time.time()) + ttl_seconds
+    payload = _b64encode(json.dumps({"uid": int(user_id), "exp": expires_at}, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}", expires_at
+
+def verify_token(token: str) -> int:
+    """Returns the user id carried by token, or raises InvalidToken."""
+    # tokens are base64url text; anything else would fail in _sign / compare_digest instead of being rejected
+    if not token.isascii():
+        raise InvalidToken("malformed token")
+    try:
+        payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidToken("malformed token")
+
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidToken("bad signature")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+        user_id, expires_at = int(claims["uid"]), int(claims["exp"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidToken("malformed payload")
+
+    if expires_at < time.time():
+        raise InvalidToken("token expired")
+    return user_id
+
+
+# --------
+# Dependency: the authenticated user's id from the Authorization: Bearer <token> header (401 otherwise)
+# --------
+def get_current_user_id(authorization: str = Header(None)) -> int:
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return verify_token(authorization[7:].strip())
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=f"Invalid session: {e}", headers={"WWW-Authenticate": "Bearer"})
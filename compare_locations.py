@@ -1,24 +1,14 @@
-import re
-import csv
+import os
+import sys
 
-# Extract nodes from campus.dot
-with open('backend/graph/campus.dot', 'r') as f:
-    dot_content = f.read()
+# use the same loader as the backend, so this report matches what the server warns about at startup
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from graph.loader import load_graph_data
 
-# Find all locations (text in quotes before ->)
-dot_nodes = set(re.findall(r'\"([^\"]+)\" ->', dot_content))
-
-# Extract locations from nodes.csv
-csv_locations = set()
-with open('backend/graph/nodes.csv', 'r', encoding='utf-8') as f:
-    reader = csv.reader(f)
-    next(reader)  # skip header
-    for row in reader:
-        if row:
-            csv_locations.add(row[0].strip())
+data = load_graph_data(os.path.join('backend', 'graph'))
 
 # Find missing
-missing = sorted(dot_nodes - csv_locations)
+missing = data.missing_coords
 
 print('MISSING FROM nodes.csv:')
 print('=' * 60)
@@ -26,6 +16,6 @@ for loc in missing:
     print(f'- {loc}')
 
 print(f'\n\nSummary:')
-print(f'Total locations in campus.dot: {len(dot_nodes)}')
-print(f'Total locations in nodes.csv: {len(csv_locations)}')
+print(f'Total locations in campus.dot: {len(data.nodes)}')
+print(f'Total locations in nodes.csv: {len(data.coords)}')
 print(f'Missing from nodes.csv: {len(missing)}')
@@ -2,6 +2,7 @@ import React, { useState } from 'react';
 import { authAPI } from '../../services/api';
 import { useAuth } from '../../contexts/AuthContext';
 import type { AuthResponse } from '../../types/index';
+import { setToken } from '../../utils/localStorage';
 import '../../styles/components.css';
 
 interface LoginFormProps {
@@ -29,6 +30,11 @@ export const LoginForm: React.FC<LoginFormProps> = ({ onSuccess }) => {
       const response = await authAPI.login({ email, password });
       const data = response.data as AuthResponse;
 
+      // session token for authorized requests (sent as Authorization: Bearer by the api client)
+      if (data.token) {
+        setToken(data.token);
+      }
+
       setUser({
         user_id: data.user_id,
         name: data.name,
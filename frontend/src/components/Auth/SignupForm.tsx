@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { authAPI, scheduleAPI } from '../../services/api';
 import { useAuth } from '../../contexts/AuthContext';
 import type { AuthResponse } from '../../types/index';
+import { setToken } from '../../utils/localStorage';
 import '../../styles/components.css';
 
 interface SignupFormProps {
@@ -77,6 +78,11 @@ export const SignupForm: React.FC<SignupFormProps> = ({ onSuccess }) => {
       });
       const data = response.data as AuthResponse;
 
+      // session token for authorized requests (sent as Authorization: Bearer by the api client)
+      if (data.token) {
+        setToken(data.token);
+      }
+
       setUser({
         user_id: data.user_id,
         name: data.name,
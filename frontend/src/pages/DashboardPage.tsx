@@ -1,10 +1,10 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { DashboardHeader } from '../components/DashboardHeader';
 import { GroupsTab } from '../components/Dashboard/GroupsTab';
 import { ScheduleTab } from '../components/Schedule/ScheduleTab';
 import { MeetingVisualization } from '../components/Algorithm/MeetingVisualization';
 import { useAuth } from '../contexts/AuthContext';
-import { algorithmAPI } from '../services/api';
+import { algorithmAPI, subscribeToBestMeetingTimes } from '../services/api';
 import type { BestMeetingResult } from '../types/index';
 import '../styles/components.css';
 
@@ -33,6 +33,22 @@ export const DashboardPage: React.FC<DashboardPageProps> = ({ onLogout }) => {
   const [error, setError] = useState<string | null>(null);
   const [dayOfWeek, setDayOfWeek] = useState<number>(1); // Monday
   const [meetingDuration, setMeetingDuration] = useState<number>(30); // 30 minutes
+  const [resultDuration, setResultDuration] = useState<number>(30); // duration the shown result was calculated for
+
+  // once results are shown, keep them current: the server pushes a new result when a member's schedule changes
+  const liveGroupId = bestMeetingResult && selectedGroup ? selectedGroup.group_id : null;
+  const liveDay = bestMeetingResult?.day_of_week;
+  useEffect(() => {
+    if (!liveGroupId || liveDay === undefined) {
+      return;
+    }
+    return subscribeToBestMeetingTimes(liveGroupId, liveDay, resultDuration, (result) => {
+      setBestMeetingResult(result);
+      setSelectedSlot((previous: any) =>
+        result.slots.find((slot) => slot.start_seconds === previous?.start_seconds) ?? result.slots[0]
+      );
+    });
+  }, [liveGroupId, liveDay, resultDuration]);
 
   const handleCalculateBestMeeting = async () => {
     if (!selectedGroup) {
@@ -55,6 +71,7 @@ export const DashboardPage: React.FC<DashboardPageProps> = ({ onLogout }) => {
       );
       console.log('✅ Algorithm API response:', response.data);
       setBestMeetingResult(response.data);
+      setResultDuration(meetingDuration);
       setSelectedSlot(response.data.slots[0]);
       setActiveTab('results');
     } catch (err: any) {
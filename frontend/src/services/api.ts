@@ -8,6 +8,7 @@ import type {
   ScheduleSlot,
   AddScheduleSlot,
   BestMeetingResult,
+  DashboardMeetingTimesResult,
 } from '../types/index';
 
 const API_BASE_URL = 'http://localhost:8000';
@@ -77,16 +78,53 @@ export const scheduleAPI = {
 
   getLocationsList: () =>
     apiClient.get<{ locations: string[] }>('/graph/all_locations'),
+
+  getVenueTypes: () =>
+    apiClient.get<{ venue_types: { venue_type: string; locations: number; default: boolean }[] }>('/graph/venue_types'),
 };
 
 // ============ ALGORITHM ENDPOINTS ============
 export const algorithmAPI = {
-  getBestMeetingTimes: (groupId: string, dayOfWeek: number, meetingDuration: number) =>
+  // venueTypes limits the meeting locations to those categories (see /graph/venue_types); default: every meeting venue
+  getBestMeetingTimes: (groupId: string, dayOfWeek: number, meetingDuration: number, venueTypes?: string[]) =>
     apiClient.get<BestMeetingResult>(`/algorithm/group/${groupId}/best_meeting_times`, {
-      params: { day_of_week: dayOfWeek, meeting_duration: meetingDuration },
+      params: { day_of_week: dayOfWeek, meeting_duration: meetingDuration, venue_type: venueTypes },
+      paramsSerializer: { indexes: null },
+    }),
+
+  // best meeting times of all the user's groups in one request (every day of the week unless daysOfWeek is given)
+  getDashboardMeetingTimes: (userId: string, meetingDuration: number, daysOfWeek?: number[]) =>
+    apiClient.get<DashboardMeetingTimesResult>(`/algorithm/user/${userId}/dashboard_meeting_times`, {
+      params: { meeting_duration: meetingDuration, day_of_week: daysOfWeek },
+      paramsSerializer: { indexes: null },
     }),
 };
 
+// Live best meeting times for a group: onResult gets the current result right away and again whenever
+// a member's schedule or the group's membership changes it. Returns a function that closes the subscription.
+export const subscribeToBestMeetingTimes = (
+  groupId: string,
+  dayOfWeek: number,
+  meetingDuration: number,
+  onResult: (result: BestMeetingResult) => void
+): (() => void) => {
+  const params = new URLSearchParams({
+    day_of_week: String(dayOfWeek),
+    meeting_duration: String(meetingDuration),
+    token: getToken() ?? '',
+  });
+  const socket = new WebSocket(
+    `${API_BASE_URL.replace(/^http/, 'ws')}/algorithm/group/${groupId}/best_meeting_times/live?${params}`
+  );
+  socket.onmessage = (event) => {
+    const message = JSON.parse(event.data);
+    if (message.type === 'meeting_times') {
+      onResult(message.result);
+    }
+  };
+  return () => socket.close();
+};
+
 // ============ GRAPH ENDPOINTS ============
 export const graphAPI = {
   getGraph: () =>
@@ -69,6 +69,19 @@ export interface BestMeetingResult {
   slots: CommonSlot[];
 }
 
+export interface GroupDashboardMeetingTimes {
+  group_id: number;
+  group_name: string;
+  member_count: number;
+  days: BestMeetingResult[];
+}
+
+export interface DashboardMeetingTimesResult {
+  user_id: number;
+  meeting_duration: number;
+  groups: GroupDashboardMeetingTimes[];
+}
+
 export interface FreeInterval {
   start_time: string;
   end_time: string;